@@ -0,0 +1 @@
+"""Engine benchmarks; see benchmarks/run.py."""
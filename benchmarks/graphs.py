@@ -0,0 +1,220 @@
+"""
+Synthetic node setups for the engine benchmarks.
+
+Every generator returns `(node_setup, start_node_id)`: a node setup in the
+same JSON shape the editor exports (inline node code, variables, group
+connection fields), ready for generate_code_from_json, plus the node to
+start the mock run from. The node code is deliberately trivial, so the
+timings are those of the engine and not of the nodes.
+"""
+
+PASS_NODE = '''@node()
+class BenchPass(Node):
+    value = 0
+
+    def execute(self):
+        self.value = self.value + 1
+'''
+
+JOIN_NODE = '''@node()
+class BenchJoin(Node):
+    left = 0
+    right = 0
+    value = 0
+
+    def execute(self):
+        self.value = self.left + self.right
+'''
+
+BRANCH_NODE = '''@node()
+class BenchBranch(Node):
+    value = 0
+
+    def execute(self):
+        # Alternates between the paths, so half of every subtree gets killed
+        if self.value % 2 == 0:
+            self.true_path = self.value + 1
+            self.false_path = False
+        else:
+            self.true_path = False
+            self.false_path = self.value + 1
+'''
+
+LIST_LOOP_NODE = '''@node()
+class ListLoopBench(Node):
+    items = []
+    item = None
+    index = 0
+
+    async def execute(self):
+        body, end_node = self.find_nodes_in_loop()
+        first = [c.get_target_node() for c in self.get_out_connections()]
+
+        for index, item in enumerate(self.items):
+            self.index = index
+            self.item = item
+            for node in body:
+                node.resurrect()
+            if end_node is not None:
+                end_node.resurrect()
+            for node in first:
+                await self.flow.execute_node(node)
+'''
+
+LOOP_END_NODE = '''@node()
+class LoopEndBench(Node):
+    value = 0
+    results = []
+
+    def execute(self):
+        self.results = self.results + [self.value]
+'''
+
+NODE_CODE = {
+    "BenchPass": PASS_NODE,
+    "BenchJoin": JOIN_NODE,
+    "BenchBranch": BRANCH_NODE,
+    "ListLoopBench": LIST_LOOP_NODE,
+    "LoopEndBench": LOOP_END_NODE,
+}
+
+
+def _node(node_id: str, class_name: str, variables: list = None) -> dict:
+    return {
+        "id": node_id,
+        "handle": node_id.replace("-", "_"),
+        "path": f"benchmarks.nodes.{class_name}",
+        "type": class_name.lower(),
+        "category": "logic",
+        "version": 1.0,
+        "code": NODE_CODE[class_name],
+        "variables": variables or [],
+    }
+
+
+def _group(group_id: str) -> dict:
+    return {
+        "id": group_id,
+        "handle": group_id.replace("-", "_"),
+        "type": "group",
+        "category": "group",
+    }
+
+
+def _connection(source: str, source_handle: str, target: str, target_handle: str = "value", **fields) -> dict:
+    connection = {
+        "id": f"{source}.{source_handle}->{target}.{target_handle}",
+        "sourceNodeId": source,
+        "sourceHandle": source_handle,
+        "targetNodeId": target,
+        "targetHandle": target_handle,
+    }
+    connection.update(fields)
+    return connection
+
+
+def chain(size: int) -> tuple[dict, str]:
+    """`size` nodes in series."""
+    nodes = [_node(f"chain-{i}", "BenchPass") for i in range(size)]
+    connections = [
+        _connection(f"chain-{i}", "value", f"chain-{i + 1}")
+        for i in range(size - 1)
+    ]
+    return {"nodes": nodes, "connections": connections}, "chain-0"
+
+
+def fan_out(size: int) -> tuple[dict, str]:
+    """One node feeding `size` leaves."""
+    nodes = [_node("root", "BenchPass")]
+    connections = []
+    for i in range(size):
+        nodes.append(_node(f"leaf-{i}", "BenchPass"))
+        connections.append(_connection("root", "value", f"leaf-{i}"))
+    return {"nodes": nodes, "connections": connections}, "root"
+
+
+def diamonds(size: int) -> tuple[dict, str]:
+    """`size` diamonds in series: split in two, joined again by the next node."""
+    nodes = [_node("join-0", "BenchJoin")]
+    connections = []
+    for i in range(size):
+        left, right, join = f"left-{i}", f"right-{i}", f"join-{i + 1}"
+        nodes += [_node(left, "BenchPass"), _node(right, "BenchPass"), _node(join, "BenchJoin")]
+        connections += [
+            _connection(f"join-{i}", "value", left),
+            _connection(f"join-{i}", "value", right),
+            _connection(left, "value", join, "left"),
+            _connection(right, "value", join, "right"),
+        ]
+    return {"nodes": nodes, "connections": connections}, "join-0"
+
+
+def nested_groups(size: int) -> tuple[dict, str]:
+    """
+    `size` groups, each placed inside the previous one. Every group holds one
+    node whose output leaves the group through its boundary, so each level
+    adds a generated GroupNode and a rewritten connection.
+    """
+    nodes = [_node("seed", "BenchPass"), _node("sink", "BenchPass")]
+    connections = [_connection("seed", "value", "inner-0")]
+    for i in range(size):
+        group, inner = f"group-{i}", f"inner-{i}"
+        parent = f"group-{i - 1}" if i else None
+        target = f"inner-{i + 1}" if i + 1 < size else "sink"
+        nodes += [_group(group), _node(inner, "BenchPass")]
+        connections += [
+            _connection(inner, "value", group, targetGroupId=group, isInGroup=group),
+            _connection(inner, "value", target, sourceGroupId=group, targetGroupId=None, isInGroup=parent),
+        ]
+    return {"nodes": nodes, "connections": connections}, "seed"
+
+
+def list_loop(size: int, body: int = 5) -> tuple[dict, str]:
+    """A list loop over `size` items, with a chain of `body` nodes per iteration."""
+    loop = _node("loop", "ListLoopBench", [
+        {"handle": "items", "type": "list", "value": list(range(size))},
+    ])
+    nodes = [loop, _node("loop-end", "LoopEndBench")]
+    connections = [_connection("loop", "item", "body-0")]
+    for i in range(body):
+        nodes.append(_node(f"body-{i}", "BenchPass"))
+        target = f"body-{i + 1}" if i + 1 < body else "loop-end"
+        connections.append(_connection(f"body-{i}", "value", target))
+    return {"nodes": nodes, "connections": connections}, "loop"
+
+
+def branch_tree(depth: int) -> tuple[dict, str]:
+    """
+    A binary tree of branch nodes, `depth` levels deep. Every branch kills
+    the connection to one of its two subtrees, so only one path is run.
+    """
+    path_variables = [
+        {"handle": "true_path", "type": "true_path", "value": False},
+        {"handle": "false_path", "type": "false_path", "value": False},
+    ]
+    nodes = []
+    connections = []
+
+    def add(node_id: str, level: int):
+        if level == depth:
+            nodes.append(_node(node_id, "BenchPass"))
+            return
+        nodes.append(_node(node_id, "BenchBranch", path_variables))
+        for path in ("true_path", "false_path"):
+            child = f"{node_id}-{path[0]}"
+            connections.append(_connection(node_id, path, child))
+            add(child, level + 1)
+
+    add("branch", 0)
+    return {"nodes": nodes, "connections": connections}, "branch"
+
+
+# name -> (generator, default size)
+SCENARIOS = {
+    "chain": (chain, 200),
+    "fan_out": (fan_out, 200),
+    "diamonds": (diamonds, 60),
+    "nested_groups": (nested_groups, 20),
+    "list_loop": (list_loop, 50),
+    "branch_tree": (branch_tree, 7),
+}
@@ -0,0 +1,197 @@
+"""
+Engine benchmarks: synthetic node setups (see graphs.py) generated with
+generate_code_from_json and executed as a mock run against in-memory
+services (see stubs.py).
+
+Per scenario, the median over the repeats is reported, in milliseconds, for:
+- codegen:     generate_code_from_json
+- load:        compiling and importing the generated module
+- environment: create_execution_environment
+- execution:   running the flow, excluding the storage writes
+- persistence: storage writes (clearing the previous run, node and connection results)
+
+Usage:
+    python -m benchmarks.run [--scenario NAME ...] [--size N] [--repeat N]
+                             [--tolerance FACTOR] [--update-baseline]
+
+Timings are compared with benchmarks/baseline.json; a phase slower than
+`tolerance` times its baseline is a regression and makes the run exit 1.
+Baselines are machine specific: record them with --update-baseline on the
+machine the comparison runs on.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import statistics
+import sys
+import time
+import types
+import uuid
+from pathlib import Path
+
+from polysynergy_node_runner.execution_context.send_flow_event import flush_flow_events
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.utils.run_logging import PACKAGE_LOGGER
+
+from .graphs import SCENARIOS
+from .stubs import in_memory_services
+
+PHASES = ("codegen", "load", "environment", "execution", "persistence")
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 1.5
+# Phases faster than this (ms) are too noisy to compare
+NOISE_FLOOR_MS = 1.0
+
+
+def run_once(node_setup: dict, start_node_id: str) -> tuple[dict, int]:
+    """One full cycle. Returns the phase timings (ms) and the number of executed nodes."""
+    flow_id = f"bench-{uuid.uuid4()}"
+    run_id = str(uuid.uuid4())
+    timings = {}
+
+    # Code generation reports what it generates on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        started_at = time.perf_counter()
+        code = generate_code_from_json(node_setup, flow_id)
+        timings["codegen"] = time.perf_counter() - started_at
+
+    with in_memory_services() as services:
+        started_at = time.perf_counter()
+        module = types.ModuleType(f"bench_{flow_id.replace('-', '_')}")
+        exec(compile(code, f"<{flow_id}>", "exec"), module.__dict__)
+        timings["load"] = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        flow, execution_flow, state = module.create_execution_environment(
+            True, run_id=run_id, stage="mock", sub_stage="mock", trigger_node_id=start_node_id,
+        )
+        timings["environment"] = time.perf_counter() - started_at
+
+        node = state.get_node_by_id(start_node_id)
+        # Storage writes during the run are counted as persistence
+        services.storage.persist_seconds = 0.0
+        started_at = time.perf_counter()
+        asyncio.run(flow.execute_node(node))
+        services.storage.store_connections_result(
+            flow_id=flow_id,
+            run_id=run_id,
+            connections=[c.to_dict() for c in state.connections],
+        )
+        flush_flow_events()
+        elapsed = time.perf_counter() - started_at
+
+        timings["persistence"] = services.storage.persist_seconds
+        timings["execution"] = elapsed - services.storage.persist_seconds
+
+    return {phase: seconds * 1000 for phase, seconds in timings.items()}, len(execution_flow["nodes_order"])
+
+
+def run_scenario(name: str, size: int = None, repeat: int = DEFAULT_REPEAT) -> dict:
+    generator, default_size = SCENARIOS[name]
+    node_setup, start_node_id = generator(size or default_size)
+
+    samples = {phase: [] for phase in PHASES}
+    executed = 0
+    for _ in range(repeat):
+        timings, executed = run_once(node_setup, start_node_id)
+        for phase in PHASES:
+            samples[phase].append(timings[phase])
+
+    return {
+        "size": size or default_size,
+        "nodes": len(node_setup["nodes"]),
+        "executed": executed,
+        "phases": {phase: round(statistics.median(values), 3) for phase, values in samples.items()},
+    }
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> dict:
+    if not path.exists():
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Returns a line per phase more than `tolerance` times slower than its baseline, or per changed run."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        # Timings of a different graph size can't be compared
+        if not expected or expected.get("size") != result["size"]:
+            continue
+        # The same graph should always run the same nodes
+        if expected.get("executed") != result["executed"]:
+            regressions.append(f"{name}: executed {result['executed']} nodes, baseline {expected.get('executed')}")
+        for phase, ms in result["phases"].items():
+            baseline_ms = expected["phases"].get(phase)
+            if baseline_ms is None or max(ms, baseline_ms) < NOISE_FLOOR_MS:
+                continue
+            if ms > baseline_ms * tolerance:
+                regressions.append(f"{name}.{phase}: {ms:.2f}ms, baseline {baseline_ms:.2f}ms")
+    return regressions
+
+
+def format_results(results: dict, baseline: dict) -> str:
+    lines = [f"{'scenario':<16}{'nodes':>7}{'run':>6}" + "".join(f"{phase:>14}" for phase in PHASES)]
+    for name, result in results.items():
+        expected = (baseline.get(name) or {}).get("phases", {})
+        line = f"{name:<16}{result['nodes']:>7}{result['executed']:>6}"
+        for phase in PHASES:
+            ms = result["phases"][phase]
+            change = ""
+            if expected.get(phase):
+                change = f" {(ms / expected[phase] - 1) * 100:+.0f}%"
+            line += f"{f'{ms:.2f}{change}':>14}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark code generation and execution of synthetic flows.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--size", type=int, help="Graph size, instead of the scenario's default")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Slowdown factor against the baseline that counts as a regression")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write these results to the baseline instead of comparing")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    # The generated module configures the run logger; keep benchmark output readable
+    logging.getLogger(PACKAGE_LOGGER).disabled = True
+
+    results = {
+        name: run_scenario(name, args.size, args.repeat)
+        for name in (args.scenario or SCENARIOS)
+    }
+    baseline = load_baseline(args.baseline)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    print(json.dumps(results, indent=2) if args.json else format_results(results, baseline))
+
+    if args.update_baseline:
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+In-memory stand-ins for the services a generated flow talks to, so the
+benchmarks measure the engine and not DynamoDB, Redis or the network.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+
+from boto3.dynamodb.conditions import ConditionBase
+
+from polysynergy_node_runner.execution_context import flow_event_publisher, send_flow_event
+from polysynergy_node_runner.services import (
+    active_listeners_service,
+    env_var_manager,
+    execution_storage_service,
+    secrets_manager,
+)
+from polysynergy_node_runner.services.execution_storage_service import DynamoDbExecutionStorageService
+
+
+def _matches(item: dict, condition) -> bool:
+    """Evaluates the key conditions the storage service uses (=, begins_with, AND)."""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return all(_matches(item, value) for value in values)
+    value = item.get(values[0].name)
+    if operator == '=':
+        return value == values[1]
+    if operator == 'begins_with':
+        return isinstance(value, str) and value.startswith(values[1])
+    return True
+
+
+class InMemoryTable:
+    """The subset of a boto3 DynamoDB Table the execution storage uses."""
+
+    def __init__(self):
+        self.items: dict[tuple, dict] = {}
+
+    def put_item(self, Item: dict, **kwargs):
+        self.items[(Item['PK'], Item['SK'])] = Item
+        return {}
+
+    def get_item(self, Key: dict, **kwargs):
+        item = self.items.get((Key['PK'], Key['SK']))
+        return {'Item': item} if item is not None else {}
+
+    def delete_item(self, Key: dict, **kwargs):
+        self.items.pop((Key['PK'], Key['SK']), None)
+        return {}
+
+    def query(self, KeyConditionExpression: ConditionBase, **kwargs):
+        return {'Items': [item for item in self.items.values() if _matches(item, KeyConditionExpression)]}
+
+    def scan(self, ExpressionAttributeValues: dict = None, **kwargs):
+        # Every scan in the storage service filters on the partition key
+        values = list((ExpressionAttributeValues or {}).values())
+        items = [item for item in self.items.values() if not values or item['PK'] == values[0]]
+        return {'Items': items}
+
+    def batch_writer(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class InMemoryExecutionStorage(DynamoDbExecutionStorageService):
+    """
+    The real storage service on an in-memory table. Time spent in the
+    writes is added up in `persist_seconds`.
+    """
+
+    def __init__(self, table_name: str = "execution_storage"):
+        self.table_name = table_name
+        self.table = InMemoryTable()
+        self.persist_seconds = 0.0
+
+    def _timed(self, method, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.persist_seconds += time.perf_counter() - started_at
+
+    def clear_previous_execution(self, *args, **kwargs):
+        return self._timed(super().clear_previous_execution, *args, **kwargs)
+
+    def store_node_result(self, *args, **kwargs):
+        return self._timed(super().store_node_result, *args, **kwargs)
+
+    def store_connections_result(self, *args, **kwargs):
+        return self._timed(super().store_connections_result, *args, **kwargs)
+
+
+class InMemoryListenersService:
+    def __init__(self, listening: bool = True):
+        self.listening = listening
+
+    def has_listener(self, node_setup_version_id: str, *args, **kwargs) -> bool:
+        return self.listening
+
+    def set_listener(self, node_setup_version_id: str, stage: str = "mock"):
+        self.listening = True
+
+    def clear_listeners(self, node_setup_version_id: str):
+        self.listening = False
+
+
+class InMemorySecretsManager:
+    def __init__(self, secrets: dict = None):
+        self.secrets = secrets or {}
+
+    def get_secret_by_key(self, key: str, project_id: str, stage: str) -> dict:
+        return {'SecretString': self.secrets.get(key, '')}
+
+    def prefetch_secrets_by_keys(self, keys: list[str], project_id: str, stage: str) -> dict:
+        return {key: self.secrets[key] for key in keys if key in self.secrets}
+
+
+class InMemoryEnvVarManager:
+    def __init__(self, variables: dict = None):
+        self.variables = variables or {}
+
+    def load_stage(self, project_id, stage):
+        return dict(self.variables)
+
+    def get_var(self, project_id, stage, key):
+        return self.variables.get(key)
+
+
+class InMemoryPipeline:
+    def __init__(self, redis: "InMemoryRedis"):
+        self.redis = redis
+        self.commands = []
+
+    def publish(self, channel, data):
+        self.commands.append(('publish', channel, data))
+
+    def xadd(self, key, fields, *args, **kwargs):
+        self.commands.append(('xadd', key, fields))
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        for command in self.commands:
+            self.redis.messages.append(command)
+        results = [0] * len(self.commands)
+        self.commands = []
+        return results
+
+
+class InMemoryRedis:
+    """Records flow events instead of publishing them."""
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, data):
+        self.messages.append(('publish', channel, data))
+        return 0
+
+    def pipeline(self, transaction: bool = True):
+        return InMemoryPipeline(self)
+
+
+class InMemoryServices:
+    def __init__(self, listening: bool = True):
+        self.storage = InMemoryExecutionStorage()
+        self.listeners = InMemoryListenersService(listening)
+        self.secrets = InMemorySecretsManager()
+        self.env_vars = InMemoryEnvVarManager()
+        self.redis = InMemoryRedis()
+
+
+@contextmanager
+def in_memory_services(listening: bool = True):
+    """
+    Route the service factories the generated code calls, and the flow
+    event transport, to in-memory stubs. Generated code has to be loaded
+    inside the block, since it looks the factories up at import.
+    """
+    services = InMemoryServices(listening)
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(
+            execution_storage_service, 'get_execution_storage_service', lambda *a, **kw: services.storage))
+        stack.enter_context(patch.object(
+            active_listeners_service, 'get_active_listeners_service', lambda *a, **kw: services.listeners))
+        stack.enter_context(patch.object(secrets_manager, 'get_secrets_manager', lambda *a, **kw: services.secrets))
+        stack.enter_context(patch.object(env_var_manager, 'get_env_var_manager', lambda *a, **kw: services.env_vars))
+        stack.enter_context(patch.object(send_flow_event, '_redis', services.redis))
+        # A fresh publisher, so no events of an earlier run end up in the stub
+        stack.enter_context(patch.object(flow_event_publisher, '_publisher', None))
+        yield services
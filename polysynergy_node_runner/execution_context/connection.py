@@ -1,4 +1,10 @@
+import logging
+
 from polysynergy_node_runner.execution_context.connection_context import ConnectionContext
+from polysynergy_node_runner.execution_context.utils.handle_access import HandleGetter, HandleSetter, \
+    get_handle_getter, get_handle_setter
+
+logger = logging.getLogger(__name__)
 
 
 class Connection:
@@ -19,14 +25,24 @@ class Connection:
         self._touched: bool = False
         self._killer: bool = False
         self.context = context
+        # What applying the connection does with its handles, built once per handle
+        self.source_getter: HandleGetter = get_handle_getter(source_handle)
+        self.target_setter: HandleSetter = get_handle_setter(target_handle)
 
     def touch(self):
         self._touched = True
 
     def make_killer(self):
-        source = self.get_source_node()
-        target = self.get_target_node()
-        print(f"Making killer {self.uuid}: {source.handle if source else '?'}.{self.source_handle} -> {target.handle if target else '?'}.{self.target_handle}")
+        # The node lookups are only worth doing when the record is emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            source = self.get_source_node()
+            target = self.get_target_node()
+            logger.debug(
+                "Making killer %s: %s.%s -> %s.%s",
+                self.uuid,
+                source.handle if source else '?', self.source_handle,
+                target.handle if target else '?', self.target_handle,
+            )
         self._killer = True
 
     def resurrect(self):
@@ -1,12 +1,19 @@
+import asyncio
 import contextvars
+import logging
+import os
+from typing import Callable
 
 from polysynergy_node_runner.execution_context.execution_state import ExecutionState
 from polysynergy_node_runner.execution_context.flow import Flow
+from polysynergy_node_runner.execution_context.instrumentation import Instrumentation, NodeTimings
 from polysynergy_node_runner.services.active_listeners_service import ActiveListenersService
 from polysynergy_node_runner.services.env_var_manager import EnvVarManager
 from polysynergy_node_runner.services.execution_storage_service import DynamoDbExecutionStorageService
 from polysynergy_node_runner.services.secrets_manager import SecretsManager
 
+logger = logging.getLogger(__name__)
+
 current_session_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
     'current_session_id', default=None
 )
@@ -14,6 +21,8 @@ current_session_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
 
 class Context:
     run_id: str = None
+    # Whether a UI is listening, decided once per run (see resolve_listener)
+    has_listener: bool = False
 
     def __init__(
         self,
@@ -48,9 +57,98 @@ class Context:
         # (and the secret does not get exposed)
         self.secrets_map = {}
 
+        self._listener_refresh_task: asyncio.Task | None = None
+
+        self.instrumentation = Instrumentation()
+
     def get_effective_stage(self):
         return (
             self.sub_stage
             if self.stage == "mock" and self.sub_stage != "mock"
             else self.stage
         )
+
+    def on_node_timings(self, hook: Callable[[NodeTimings], None]):
+        """
+        Call `hook` with the NodeTimings of every node executed in this run.
+        Registering a hook turns instrumentation on; the timings are also
+        attached to the stored node results and the end_node flow events.
+        """
+        self.instrumentation.add_hook(hook)
+
+    def remove_node_timings_hook(self, hook: Callable[[NodeTimings], None]):
+        self.instrumentation.remove_hook(hook)
+
+    def resolve_listener(self, has_listener: bool = None):
+        # Nodes read self.has_listener instead of checking the service per node;
+        # `has_listener` is the answer when the run start already checked
+        if has_listener is not None:
+            self.has_listener = bool(has_listener)
+            return
+        try:
+            self.has_listener = bool(self.active_listeners.has_listener(self.node_setup_version_id, first_run=True))
+        except Exception as e:
+            logger.warning(f"Listener check failed, running without flow events: {e}")
+            self.has_listener = False
+
+    def start_listener_refresh(self, interval: float = None):
+        """
+        Re-check for a listener every `interval` seconds (LISTENER_REFRESH_INTERVAL)
+        while none is attached, so a UI that connects mid-run starts receiving
+        events. Only upgrades; a run never stops sending events once started.
+        """
+        if interval is None:
+            interval = float(os.getenv("LISTENER_REFRESH_INTERVAL", "0") or 0)
+        if self.has_listener or interval <= 0 or self._listener_refresh_task is not None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._listener_refresh_task = loop.create_task(self._refresh_listener(interval))
+
+    async def _refresh_listener(self, interval: float):
+        while not self.has_listener:
+            await asyncio.sleep(interval)
+            try:
+                if await asyncio.to_thread(self.active_listeners.has_listener, self.node_setup_version_id):
+                    self.has_listener = True
+            except Exception as e:
+                logger.warning(f"Listener refresh failed: {e}")
+
+    def stop_listener_refresh(self):
+        if self._listener_refresh_task is not None:
+            self._listener_refresh_task.cancel()
+            self._listener_refresh_task = None
+
+    def prefetch_secrets(self, secret_keys: list[str]):
+        # Secrets referenced statically in the flow are fetched in a single
+        # batch, so resolving them during execution is an in-memory lookup
+        if not secret_keys:
+            return
+
+        project_id = os.getenv("PROJECT_ID")
+        if not project_id:
+            return
+
+        try:
+            self.secrets.prefetch_secrets_by_keys(secret_keys, project_id, self.get_effective_stage())
+        except Exception as e:
+            logger.warning(f"Secret prefetch failed, falling back to per-key reads: {e}")
+
+    def prefetch_environment_variables(self, environment_keys: list[str]):
+        # When the flow references environment variables, the whole stage is
+        # loaded with one query instead of one get_item per key
+        if not environment_keys:
+            return
+
+        project_id = os.getenv("PROJECT_ID")
+        if not project_id:
+            return
+
+        try:
+            self.env_vars.load_stage(project_id, self.get_effective_stage())
+        except Exception as e:
+            logger.warning(f"Environment variable prefetch failed, falling back to per-key reads: {e}")
@@ -0,0 +1,163 @@
+"""
+Builds the execution environment from the data tables emitted by table mode
+codegen (CODEGEN_MODE=table), instead of a generated factory per node.
+
+CONNECTION_TABLE rows:
+    (uuid, source_node_id, source_handle, target_node_id, target_handle, source_category)
+NODE_TABLE rows:
+    (id, handle, class_name, stateful, path, category, flow_state_name or None, {attribute: value})
+"""
+import copy
+import functools
+import logging
+from collections import defaultdict
+
+from polysynergy_node_runner.execution_context.connection import Connection
+from polysynergy_node_runner.execution_context.connection_context import ConnectionContext
+from polysynergy_node_runner.execution_context.context import Context
+from polysynergy_node_runner.execution_context.flow_state import FlowState
+
+logger = logging.getLogger(__name__)
+
+# Row layout of NODE_TABLE
+NODE_ID, NODE_HANDLE, NODE_CLASS, NODE_STATEFUL, NODE_PATH, NODE_CATEGORY, NODE_FLOW_STATE, NODE_ATTRIBUTES = range(8)
+
+_IMMUTABLE = (str, int, float, bool, type(None), FlowState)
+
+
+def build_connections(connection_table: tuple, mock: bool, connection_context: ConnectionContext) -> list[Connection]:
+    return [
+        Connection(
+            uuid=uuid,
+            source_node_id=source_node_id,
+            source_handle=source_handle,
+            target_node_id=target_node_id,
+            target_handle=target_handle,
+            context=connection_context,
+        )
+        for uuid, source_node_id, source_handle, target_node_id, target_handle, source_category in connection_table
+        if mock or source_category != 'mock'
+    ]
+
+
+def connected_component(start_node_id: str, connections: list[Connection]) -> set:
+    """Same set as traversal.find_connected_component, from an adjacency map."""
+    neighbours = defaultdict(list)
+    for connection in connections:
+        neighbours[connection.source_node_id].append(connection.target_node_id)
+        neighbours[connection.target_node_id].append(connection.source_node_id)
+
+    connected = {start_node_id}
+    to_visit = [start_node_id]
+    while to_visit:
+        for node_id in neighbours[to_visit.pop()]:
+            if node_id not in connected:
+                connected.add(node_id)
+                to_visit.append(node_id)
+    return connected
+
+
+@functools.lru_cache(maxsize=None)
+def _data_descriptors(node_class: type) -> frozenset:
+    """Names of properties (and other data descriptors) defined on a node class."""
+    return frozenset(
+        name
+        for klass in node_class.__mro__
+        for name, attribute in vars(klass).items()
+        if hasattr(type(attribute), "__set__")
+    )
+
+
+class _NodeTemplate:
+    """A NODE_TABLE row resolved against the generated module, instantiated once per (re)creation."""
+
+    __slots__ = ('row', 'node_class', 'fixed', 'mutable', 'batch', 'driving', 'incoming', 'outgoing')
+
+    def __init__(self, row: tuple, node_class: type, driving: list, incoming: list, outgoing: list):
+        self.row = row
+        self.node_class = node_class
+        attributes = dict(row[NODE_ATTRIBUTES])
+        attributes["path"] = row[NODE_PATH]
+        if row[NODE_FLOW_STATE] is not None:
+            attributes["flow_state"] = FlowState[row[NODE_FLOW_STATE]]
+        # Every instance gets its own copy of list and dict values, like
+        # re-evaluating a literal does
+        self.fixed = {k: v for k, v in attributes.items() if isinstance(v, _IMMUTABLE)}
+        self.mutable = {k: v for k, v in attributes.items() if k not in self.fixed}
+        # Attributes backed by a property have to go through setattr
+        self.batch = _data_descriptors(node_class).isdisjoint(attributes)
+        self.driving = driving
+        self.incoming = incoming
+        self.outgoing = outgoing
+
+    def create(self, node_context: Context):
+        row = self.row
+        node = self.node_class(
+            id=row[NODE_ID], handle=row[NODE_HANDLE], stateful=row[NODE_STATEFUL], context=node_context
+        )
+        node.factory = lambda: self.create(node_context)
+
+        attributes = self.fixed
+        if self.mutable:
+            attributes = {**attributes, **copy.deepcopy(self.mutable)}
+        if self.batch:
+            node.__dict__.update(attributes)
+        else:
+            for name, value in attributes.items():
+                setattr(node, name, value)
+
+        node.set_driving_connections(list(self.driving))
+        node.set_in_connections(list(self.incoming))
+        node.set_out_connections(list(self.outgoing))
+        return node
+
+
+def register_nodes(
+    node_table: tuple,
+    namespace: dict,
+    connections: list[Connection],
+    node_context: Context,
+    mock: bool = False,
+    trigger_node_id: str = None,
+):
+    """
+    Instantiates and registers the nodes of `node_table` with the context's
+    state. Node classes are looked up by name in `namespace` (the generated
+    module's globals). Like generated code, mock category nodes are only
+    registered for mock runs, and with a trigger node only the nodes
+    connected to it.
+    """
+    connected_node_ids = connected_component(trigger_node_id, connections) if trigger_node_id else None
+
+    logger.debug('[RUNTIME] trigger_node_id: %s', trigger_node_id)
+    logger.debug('[RUNTIME] Total connections built: %d', len(connections))
+    logger.debug('[RUNTIME] connected_node_ids: %s', connected_node_ids)
+
+    driving = defaultdict(list)
+    incoming = defaultdict(list)
+    outgoing = defaultdict(list)
+    for connection in connections:
+        # `in "node"`, as in utils.connections
+        if connection.target_handle in "node":
+            driving[connection.target_node_id].append(connection)
+        else:
+            incoming[connection.target_node_id].append(connection)
+        outgoing[connection.source_node_id].append(connection)
+
+    state = node_context.state
+    empty = []
+    for row in node_table:
+        node_id = row[NODE_ID]
+        if not mock and row[NODE_CATEGORY] == 'mock':
+            continue
+        if connected_node_ids is not None and node_id not in connected_node_ids:
+            continue
+
+        template = _NodeTemplate(
+            row,
+            namespace[row[NODE_CLASS]],
+            driving.get(node_id, empty),
+            incoming.get(node_id, empty),
+            outgoing.get(node_id, empty),
+        )
+        state.register_node(template.create(node_context))
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from typing import Callable
+
+# Run lifecycle events are never coalesced or rate limited
+LIFECYCLE_EVENTS = {'run_start', 'run_end', 'resume_start', 'resume_end'}
+RUN_CLOSING_EVENTS = {'run_end', 'resume_end'}
+NODE_EVENTS = {'start_node', 'end_node'}
+
+# Opt-in: coalescing replaces start/end events with node_progress summaries
+DEFAULT_COALESCE_AFTER = 0
+DEFAULT_PROGRESS_INTERVAL_MS = 250
+# Runs that never send run_end are dropped after this many newer runs
+MAX_TRACKED_RUNS = 1024
+
+
+class _NodeProgress:
+    __slots__ = ('started', 'finished', 'statuses', 'order', 'status', 'dirty', 'last_summary_at')
+
+    def __init__(self):
+        self.started = 0
+        self.finished = 0
+        self.statuses: dict[str, int] = {}
+        self.order = -1
+        self.status = 'running'
+        self.dirty = False
+        self.last_summary_at = 0.0
+
+
+class _RunState:
+    def __init__(self, max_rate: float, now: float):
+        self.nodes: dict[str, _NodeProgress] = {}
+        self.tokens = max_rate
+        self.refilled_at = now
+
+
+class EventCoalescer:
+    """
+    Reduces the flow events of chatty runs (e.g. nodes inside a ListLoop body):
+
+    - after `coalesce_after` start_node events for the same node in a run, its
+      start/end events are folded into a `node_progress` summary with running
+      counts, sent at most every `progress_interval` seconds per node;
+    - `max_rate` caps the node events per second per run (token bucket, 0 is
+      unlimited); events over the budget are folded into the summary as well.
+
+    Summaries are cumulative, so a subscriber only needs the latest one. Any
+    pending summaries are returned by finish_run, before run_end is sent.
+    """
+
+    def __init__(
+        self,
+        coalesce_after: int = DEFAULT_COALESCE_AFTER,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL_MS / 1000,
+        max_rate: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.coalesce_after = coalesce_after
+        self.progress_interval = progress_interval
+        self.max_rate = max_rate
+        self.clock = clock
+        self._runs: dict[str, _RunState] = {}
+        self._lock = threading.Lock()
+
+    def process(self, message: dict) -> list[dict]:
+        """Returns the events to publish now for `message` (possibly none)."""
+        event_type = message.get('event')
+        if event_type in LIFECYCLE_EVENTS or event_type not in NODE_EVENTS or not message.get('node_id'):
+            return [message]
+
+        with self._lock:
+            now = self.clock()
+            run = self._get_run(message['run_id'], now)
+            progress = run.nodes.setdefault(message['node_id'], _NodeProgress())
+            self._count(progress, message)
+
+            coalescing = self.coalesce_after > 0 and progress.started > self.coalesce_after
+            if not coalescing and self._take_token(run, now):
+                return [message]
+
+            progress.dirty = True
+            if now - progress.last_summary_at < self.progress_interval or not self._take_token(run, now):
+                return []
+
+            progress.last_summary_at = now
+            return [self._summary(message, progress)]
+
+    def finish_run(self, message: dict) -> list[dict]:
+        """Pending summaries of the run that `message` (run_end/resume_end) closes."""
+        with self._lock:
+            run = self._runs.pop(message.get('run_id'), None)
+            if run is None:
+                return []
+
+            return [
+                self._summary(message, progress, node_id=node_id)
+                for node_id, progress in run.nodes.items()
+                if progress.dirty
+            ]
+
+    def _get_run(self, run_id: str, now: float) -> _RunState:
+        run = self._runs.get(run_id)
+        if run is None:
+            if len(self._runs) >= MAX_TRACKED_RUNS:
+                del self._runs[next(iter(self._runs))]
+            run = _RunState(self.max_rate, now)
+            self._runs[run_id] = run
+        return run
+
+    def _count(self, progress: _NodeProgress, message: dict):
+        progress.order = message.get('order', progress.order)
+        if message['event'] == 'start_node':
+            progress.started += 1
+            progress.status = 'running'
+        else:
+            status = message.get('status', 'success')
+            progress.finished += 1
+            progress.statuses[status] = progress.statuses.get(status, 0) + 1
+            progress.status = status
+
+    def _take_token(self, run: _RunState, now: float) -> bool:
+        if self.max_rate <= 0:
+            return True
+
+        run.tokens = min(self.max_rate, run.tokens + (now - run.refilled_at) * self.max_rate)
+        run.refilled_at = now
+        if run.tokens < 1:
+            return False
+        run.tokens -= 1
+        return True
+
+    def _summary(self, message: dict, progress: _NodeProgress, node_id: str = None) -> dict:
+        progress.dirty = False
+        return {
+            'flow_id': message.get('flow_id'),
+            'run_id': message.get('run_id'),
+            'node_id': node_id or message.get('node_id'),
+            'event': 'node_progress',
+            'order': progress.order,
+            'status': progress.status,
+            'data': {
+                'started': progress.started,
+                'finished': progress.finished,
+                'statuses': dict(progress.statuses),
+            },
+        }
+
+
+_coalescer: EventCoalescer | None = None
+
+
+def get_event_coalescer() -> EventCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = EventCoalescer(
+            coalesce_after=int(os.getenv("FLOW_EVENTS_COALESCE_AFTER", DEFAULT_COALESCE_AFTER)),
+            progress_interval=float(os.getenv("FLOW_EVENTS_PROGRESS_INTERVAL_MS", DEFAULT_PROGRESS_INTERVAL_MS)) / 1000,
+            max_rate=float(os.getenv("FLOW_EVENTS_MAX_RATE", 0)),
+        )
+    return _coalescer
@@ -0,0 +1,189 @@
+import json
+import os
+import secrets
+import threading
+
+# How flow and interaction events are serialised (FLOW_EVENTS_ENCODING):
+# - json:    one JSON object per event on the plain channel (default)
+# - compact: positional arrays as compact JSON on a versioned channel suffix.
+#            Flow and run ids are sent once per run in a header event and
+#            referenced by a random run_ref.
+ENCODING_JSON = "json"
+ENCODING_COMPACT = "compact"
+
+COMPACT_VERSION = 1
+# Subscribers pick the format by channel: <channel>:c1 carries JSON arrays
+COMPACT_JSON_SUFFIX = f":c{COMPACT_VERSION}"
+
+# First element of every compact array
+KIND_HEADER = 0
+KIND_FLOW_EVENT = 1
+KIND_INTERACTION_EVENT = 2
+
+EVENT_CODES = {
+    'run_start': 0,
+    'run_end': 1,
+    'start_node': 2,
+    'end_node': 3,
+    'resume_start': 4,
+    'resume_end': 5,
+    'node_progress': 6,
+}
+STATUS_CODES = {
+    'running': 0,
+    'success': 1,
+    'error': 2,
+    'killed': 3,
+    'provided': 4,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# Run refs are random, so runs published by different processes on the same
+# channel don't collide; 53 bits stay exact as JavaScript numbers
+RUN_REF_BITS = 53
+
+# The header is repeated now and then, so subscribers that join mid-run can decode
+HEADER_REPEAT_INTERVAL = 100
+
+RUN_CLOSING_EVENTS = {'run_end', 'resume_end'}
+# Interaction channels never see run_end, so the bookkeeping is bounded
+MAX_TRACKED_RUNS = 1024
+
+
+def get_encoding() -> str:
+    encoding = os.getenv("FLOW_EVENTS_ENCODING", ENCODING_JSON).lower()
+    return encoding if encoding in (ENCODING_JSON, ENCODING_COMPACT) else ENCODING_JSON
+
+
+def compact_channel(channel: str) -> str:
+    return channel + COMPACT_JSON_SUFFIX
+
+
+def _pack(values: list) -> str:
+    return json.dumps(values, separators=(',', ':'))
+
+
+class CompactEventEncoder:
+    """Keeps the per-run state (run_ref, header bookkeeping) of the compact encoding."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (channel, run_id) -> [run_ref, events since last header]
+        self._runs: dict[tuple[str, str], list[int]] = {}
+
+    def encode(self, channel: str, message: dict) -> list:
+        run_key = (channel, message.get('run_id'))
+        event_type = message.get('event')
+
+        payloads = []
+        with self._lock:
+            run = self._runs.get(run_key)
+            if run is None:
+                if len(self._runs) >= MAX_TRACKED_RUNS:
+                    del self._runs[next(iter(self._runs))]
+                run = [secrets.randbits(RUN_REF_BITS), HEADER_REPEAT_INTERVAL]
+                self._runs[run_key] = run
+
+            if run[1] >= HEADER_REPEAT_INTERVAL:
+                payloads.append(_pack([KIND_HEADER, COMPACT_VERSION, run[0], message.get('flow_id'), message.get('run_id')]))
+                run[1] = 0
+            run[1] += 1
+            run_ref = run[0]
+
+            if event_type in RUN_CLOSING_EVENTS:
+                del self._runs[run_key]
+
+        if message.get('type') == 'interaction_event':
+            values = [
+                KIND_INTERACTION_EVENT, run_ref, message.get('node_id'), message.get('interaction_type'),
+                message.get('data'), message.get('tenant_id'), message.get('user_id'),
+            ]
+        else:
+            status = message.get('status')
+            values = [
+                KIND_FLOW_EVENT, run_ref, message.get('node_id'), EVENT_CODES.get(event_type, event_type),
+                message.get('order', -1), STATUS_CODES.get(status, status),
+            ]
+            if 'data' in message:
+                values.append(message['data'])
+
+        payloads.append(_pack(values))
+        return payloads
+
+    def repeat_headers(self):
+        """Send the header again with the next event of every run, e.g. after a publish failed."""
+        with self._lock:
+            for run in self._runs.values():
+                run[1] = HEADER_REPEAT_INTERVAL
+
+
+class CompactEventDecoder:
+    """Turns compact payloads back into the dicts of the JSON encoding."""
+
+    def __init__(self):
+        self._runs: dict[int, tuple[str, str]] = {}
+
+    def decode(self, payload) -> dict | None:
+        """Returns the event, or None for headers and events of unknown runs."""
+        values = json.loads(payload)
+        kind = values[0]
+
+        if kind == KIND_HEADER:
+            _, _version, run_ref, flow_id, run_id = values
+            self._runs[run_ref] = (flow_id, run_id)
+            return None
+
+        ids = self._runs.get(values[1])
+        if ids is None:
+            return None
+        flow_id, run_id = ids
+
+        if kind == KIND_INTERACTION_EVENT:
+            _, _, node_id, interaction_type, data, tenant_id, user_id = values
+            return {
+                'type': 'interaction_event',
+                'flow_id': flow_id,
+                'run_id': run_id,
+                'node_id': node_id,
+                'interaction_type': interaction_type,
+                'data': data,
+                'tenant_id': tenant_id,
+                'user_id': user_id,
+            }
+
+        event_code, order, status_code = values[3], values[4], values[5]
+        event = {
+            'flow_id': flow_id,
+            'run_id': run_id,
+            'node_id': values[2],
+            'event': EVENT_NAMES.get(event_code, event_code),
+            'order': order,
+            'status': STATUS_NAMES.get(status_code, status_code),
+        }
+        if len(values) > 6:
+            event['data'] = values[6]
+        return event
+
+
+_encoder = CompactEventEncoder()
+
+
+def repeat_compact_headers():
+    _encoder.repeat_headers()
+
+
+def is_compact_channel(channel: str) -> bool:
+    return channel.endswith(COMPACT_JSON_SUFFIX)
+
+
+def encode_event(channel: str, message: dict) -> list[tuple[str, object]]:
+    """
+    Serialise an event for publishing. Returns the (channel, payload) pairs
+    to send, in order: one for JSON, a header plus the event for compact.
+    """
+    if get_encoding() == ENCODING_JSON:
+        return [(channel, json.dumps(message))]
+
+    target = compact_channel(channel)
+    return [(target, payload) for payload in _encoder.encode(channel, message)]
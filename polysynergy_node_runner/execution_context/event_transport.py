@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+
+from polysynergy_node_runner.execution_context.event_encoding import (
+    CompactEventDecoder,
+    is_compact_channel,
+    repeat_compact_headers,
+)
+
+logger = logging.getLogger(__name__)
+
+# How execution updates reach subscribers (FLOW_EVENTS_TRANSPORT):
+# - pubsub:  PUBLISH on the channel (default, fire and forget)
+# - streams: XADD to a capped stream per channel, so late consumers can
+#            read from an offset and backfill missed events
+# - both:    both of the above, for migrating consumers
+TRANSPORT_PUBSUB = "pubsub"
+TRANSPORT_STREAMS = "streams"
+TRANSPORT_BOTH = "both"
+
+DEFAULT_STREAM_MAXLEN = 1000
+DEFAULT_STREAM_TTL_SECONDS = 3600
+
+
+def get_transport() -> str:
+    transport = os.getenv("FLOW_EVENTS_TRANSPORT", TRANSPORT_PUBSUB).lower()
+    if transport not in (TRANSPORT_PUBSUB, TRANSPORT_STREAMS, TRANSPORT_BOTH):
+        return TRANSPORT_PUBSUB
+    return transport
+
+
+def uses_pubsub(transport: str) -> bool:
+    return transport in (TRANSPORT_PUBSUB, TRANSPORT_BOTH)
+
+
+def uses_streams(transport: str) -> bool:
+    return transport in (TRANSPORT_STREAMS, TRANSPORT_BOTH)
+
+
+def stream_key(channel: str) -> str:
+    return f"{channel}:stream"
+
+
+def add_event_to_pipeline(pipeline, channel: str, data: str, transport: str = None):
+    """
+    Queue the commands that deliver one serialised event on `channel` on a
+    (sync or async) Redis pipeline.
+    """
+    transport = transport or get_transport()
+
+    if uses_pubsub(transport):
+        pipeline.publish(channel, data)
+
+    if uses_streams(transport):
+        key = stream_key(channel)
+        # Approximate trimming (MAXLEN ~) lets Redis trim whole nodes, which is cheap
+        pipeline.xadd(
+            key,
+            {"data": data},
+            maxlen=int(os.getenv("FLOW_EVENTS_STREAM_MAXLEN", DEFAULT_STREAM_MAXLEN)),
+            approximate=True,
+        )
+        pipeline.expire(key, int(os.getenv("FLOW_EVENTS_STREAM_TTL", DEFAULT_STREAM_TTL_SECONDS)))
+
+
+def publish_event(redis_conn, channel: str, data: str):
+    transport = get_transport()
+    if transport == TRANSPORT_PUBSUB:
+        return redis_conn.publish(channel, data)
+
+    pipeline = redis_conn.pipeline(transaction=False)
+    add_event_to_pipeline(pipeline, channel, data, transport)
+    return pipeline.execute()
+
+
+async def publish_events_async(redis_conn, events: list[tuple[str, str]]):
+    """
+    Send (channel, data) pairs in order, in one pipeline: a compact header
+    must reach subscribers before the event that refers to it. Meant to run
+    as a fire and forget task, so failures are logged instead of raised, and
+    the compact headers are sent again with the next events.
+    """
+    try:
+        transport = get_transport()
+        pipeline = redis_conn.pipeline(transaction=False)
+        for channel, data in events:
+            add_event_to_pipeline(pipeline, channel, data, transport)
+        return await pipeline.execute()
+    except Exception as e:
+        logger.warning(f"[Redis] async publish failed (ignored): {e}")
+        repeat_compact_headers()
+
+
+def read_stream_events(redis_conn, channel: str, last_id: str = "0-0", count: int = 500,
+                       decoder: CompactEventDecoder = None) -> list[tuple[str, dict]]:
+    """
+    Read events of `channel` that were added after `last_id`, oldest first.
+    Returns (entry_id, message) tuples; pass the last entry_id back in to
+    continue reading from that offset.
+
+    Compact channels (see event_encoding) are decoded with `decoder`; pass
+    the same decoder back in with the offset, so runs whose header was read
+    before stay decodable. Headers themselves, and events of runs whose
+    header wasn't seen (yet), are left out.
+    """
+    entries = redis_conn.xrange(stream_key(channel), min=f"({last_id}", max="+", count=count)
+    if is_compact_channel(channel) and decoder is None:
+        decoder = CompactEventDecoder()
+
+    events = []
+    for entry_id, fields in entries:
+        data = fields.get("data") if isinstance(fields, dict) else None
+        if data is None:
+            continue
+        if decoder is not None:
+            event = decoder.decode(data)
+            if event is not None:
+                events.append((entry_id, event))
+        else:
+            events.append((entry_id, json.loads(data)))
+    return events
@@ -5,17 +5,20 @@ from polysynergy_node_runner.execution_context.mixins.connection_logic_mixin imp
 from polysynergy_node_runner.execution_context.mixins.flow_execution_mixin import FlowExecutionMixin
 from polysynergy_node_runner.execution_context.mixins.resolve_environment_variable_mixin import \
     ResolveEnvironmentVariableMixin
+from polysynergy_node_runner.execution_context.mixins.resolve_placeholders_mixin import ResolvePlaceholdersMixin
 from polysynergy_node_runner.execution_context.mixins.resolve_secret_mixin import ResolveSecretMixin
 from polysynergy_node_runner.execution_context.mixins.resurrect_mixin import ResurrectMixin
 from polysynergy_node_runner.execution_context.mixins.state_lifecyclye_mixin import StateLifecycleMixin
 from polysynergy_node_runner.execution_context.mixins.traversal_mixin import TraversalMixin
 from polysynergy_node_runner.execution_context.utils.make_serializable import make_json_serializable
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import get_public_attributes
 
 class ExecutableNode(
     ConnectionLogicMixin,
     StateLifecycleMixin,
     ResolveEnvironmentVariableMixin,
     ResolveSecretMixin,
+    ResolvePlaceholdersMixin,
     FlowExecutionMixin,
     ResurrectMixin,
     TraversalMixin,
@@ -66,10 +69,9 @@ class ExecutableNode(
     def to_dict(self):
         vars_dict = {}
 
-        for a in type(self).__annotations__:
-            if not a.startswith("_"):
-                raw_value = getattr(self, a, None)
-                vars_dict[a] = make_json_serializable(raw_value)
+        for a in get_public_attributes(type(self)):
+            raw_value = getattr(self, a, None)
+            vars_dict[a] = make_json_serializable(raw_value)
         return vars_dict
 
 
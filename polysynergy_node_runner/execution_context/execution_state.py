@@ -4,6 +4,8 @@ class ExecutionState:
         self.nodes_by_handle = {}
         self.nodes: list = []
         self.connections: list = []
+        # Set by generated code, see build_template_sources
+        self.template_sources: dict = {}
 
     def register_node(self, node):
         self.nodes_by_id[node.id] = node
@@ -16,21 +18,16 @@ class ExecutionState:
     def get_node_by_handle(self, handle):
         return self.nodes_by_handle.get(handle)
 
-    def get_connection_source_variable(self, connection):
-        source_node = self.get_node_by_id(connection.source_node_id)
-        path_parts = connection.source_handle.split(".")
-
-        current = source_node
-        for part in path_parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            else:
-                current = getattr(current, part, None)
+    def get_template_sources(self, node_id, template_str: str):
+        """
+        {handle: upstream node id} for a template of a node that was analysed
+        at code generation time, or None for templates that were not.
+        """
+        sources = self.template_sources.get(node_id)
+        return sources.get(template_str) if sources else None
 
-            if current is None:
-                break
-
-        return current
+    def get_connection_source_variable(self, connection):
+        return connection.source_getter(self.nodes_by_id.get(connection.source_node_id))
 
 def get_execution_state():
     return ExecutionState()
\ No newline at end of file
@@ -1,22 +1,30 @@
 from __future__ import annotations
+
+import logging
 from typing import TYPE_CHECKING
 
+from polysynergy_node_runner.utils.profiling import enter_node, exit_node
+from polysynergy_node_runner.utils.run_logging import current_node_id
+from polysynergy_node_runner.utils.tracing import get_tracer
+
 if TYPE_CHECKING:
     from polysynergy_node_runner.execution_context.executable_node import ExecutableNode
 
+logger = logging.getLogger(__name__)
+
 class Flow:
 
     async def execute_node(self, node):
         if node.is_blocking():
-            print('Is blocking:', node.id, node.handle, node.__class__.__name__)
+            logger.debug('Is blocking: %s %s %s', node.id, node.handle, type(node).__name__)
             return
 
         if node.is_pending():
-            print('Is pending:', node.id, node.handle, node.__class__.__name__)
+            logger.debug('Is pending: %s %s %s', node.id, node.handle, type(node).__name__)
             return
 
         if not node.is_killed() and self.should_kill_node(node):
-            print('Killing node:', node.handle, node.__class__.__name__)
+            logger.debug('Killing node: %s %s', node.handle, type(node).__name__)
             node.kill()
             return
 
@@ -39,8 +47,17 @@ class Flow:
             for conn in node.get_alive_in_connections():
                 node.apply_from_incoming_connection(conn)
 
-            print('Executing:', node.id, node.handle, node.__class__.__name__)
-            await node.state_execute()
+            logger.debug('Executing: %s %s %s', node.id, node.handle, type(node).__name__)
+            node_token = current_node_id.set(node.id)
+            span = self._start_node_span(node)
+            profiling_depth = enter_node(node)
+            try:
+                await node.state_execute()
+            finally:
+                current_node_id.reset(node_token)
+                self._end_node_span(span, node)
+                if profiling_depth is not None:
+                    exit_node(profiling_depth)
 
         await self.traverse_forward(node)
 
@@ -51,11 +68,10 @@ class Flow:
             source_node = conn.get_source_node()
             conn.touch()
 
-            print(
-                'Traversing backward:',
-                source_node.handle, source_node.__class__.__name__,
-                '->',
-                node.handle, node.__class__.__name__,
+            logger.debug(
+                'Traversing backward: %s %s -> %s %s',
+                source_node.handle, type(source_node).__name__,
+                node.handle, type(node).__name__,
             )
 
             if conn.is_killer() or node.was_found_by(conn.uuid):
@@ -74,21 +90,57 @@ class Flow:
                 continue
 
             if not target_node.is_processed() and not target_node.is_killed():
-                print(
-                    'Traversing forward:',
-                    node.handle, node.__class__.__name__,
-                    '->',
-                    target_node.handle, target_node.__class__.__name__
+                logger.debug(
+                    'Traversing forward: %s %s -> %s %s',
+                    node.handle, type(node).__name__,
+                    target_node.handle, type(target_node).__name__,
                 )
                 target_node.add_found_by(conn.uuid)
                 if self.should_kill_node(target_node):
-                    print('Killing node:', target_node.handle, target_node.__class__.__name__)
+                    logger.debug('Killing node: %s %s', target_node.handle, type(target_node).__name__)
                     target_node.kill()
                     continue
                 if node.is_in_loop():
                     target_node.set_in_loop(node.is_in_loop())
                 await self.execute_node(target_node)
 
+    def _start_node_span(self, node):
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return None
+
+        # Spans follow the flow graph: a node reached forward is a child of
+        # the node whose connection found it, otherwise of the current span
+        parent = None
+        found_by = getattr(node, '_found_by', None)
+        if found_by:
+            for conn in node.get_driving_connections() + node.get_in_connections():
+                if conn.uuid in found_by:
+                    parent = getattr(conn.get_source_node(), '_trace_span', None)
+                    if parent is not None:
+                        break
+
+        span = tracer.start_span(
+            f"node {node.handle}",
+            attributes={
+                'node.id': node.id,
+                'node.handle': node.handle,
+                'node.type': type(node).__name__,
+            },
+            parent=parent,
+        ).activate()
+        node._trace_span = span
+        return span
+
+    def _end_node_span(self, span, node):
+        if span is None:
+            return
+        if node.is_killed():
+            span.set_attribute('node.status', 'killed')
+        elif node.get_exception():
+            span.record_exception(node.get_exception())
+        span.end()
+
     def should_kill_node(self, node):
         driving_connections = node.get_driving_connections()
         if driving_connections and all(conn.is_killer() for conn in driving_connections):
@@ -117,14 +169,14 @@ class Flow:
                 for handle, conns in handle_groups.items()
             )
             if all_groups_killed:
-                print('Killing node, ALL HANDLE GROUPS ARE KILLERS:', node.handle, node.__class__.__name__)
+                logger.debug('Killing node, ALL HANDLE GROUPS ARE KILLERS: %s %s', node.handle, type(node).__name__)
                 return True
         else:
             # For regular nodes: kill if ANY handle group has all killers
             # This prevents execution when any required input is missing
             for handle, conns in handle_groups.items():
                 if all(conn.is_killer() for conn in conns):
-                    print('Killing node, ALL IN CONS ARE KILLER:', node.handle, node.__class__.__name__)
+                    logger.debug('Killing node, ALL IN CONS ARE KILLER: %s %s', node.handle, type(node).__name__)
                     return True
 
         return False
@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+from collections import deque
+from typing import Callable
+
+from polysynergy_node_runner.execution_context.event_encoding import encode_event, repeat_compact_headers
+from polysynergy_node_runner.execution_context.event_transport import add_event_to_pipeline, get_transport
+from polysynergy_node_runner.utils.tracing import KIND_CLIENT, get_tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL_MS = 5
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+
+class FlowEventPublisher:
+    """
+    Queues flow events in memory and publishes them to Redis in pipelined
+    batches from a background thread, so nodes don't wait for a network round
+    trip per event.
+
+    A batch is flushed when `batch_size` events are queued or `flush_interval`
+    seconds have passed. The queue is bounded; when it is full the oldest
+    queued event is dropped. Events are encoded when they are flushed, so a
+    dropped event never takes a compact header with it; when a batch fails
+    to publish, the headers are sent again with the next events. Call flush() to publish everything synchronously
+    (at run_end, and before the process may be frozen).
+    """
+
+    def __init__(
+        self,
+        redis_factory: Callable,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_MS / 1000,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+    ):
+        self.redis_factory = redis_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+
+        self._queue: deque[tuple[str, dict]] = deque()
+        self._condition = threading.Condition()
+        # Only one flush at a time, so batches reach Redis in order
+        self._flush_lock = threading.Lock()
+        self._dropped = 0
+        self._thread: threading.Thread | None = None
+
+    def publish(self, channel: str, message: dict):
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                self._queue.popleft()
+                self._dropped += 1
+            self._queue.append((channel, message))
+
+            # Wake the flusher for the first event (starts the interval) and
+            # when a full batch is ready
+            if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                self._condition.notify()
+
+        self._ensure_thread()
+
+    def flush(self) -> int:
+        """Publish all queued events now. Returns the number of events sent."""
+        with self._flush_lock:
+            with self._condition:
+                batch = list(self._queue)
+                self._queue.clear()
+                dropped, self._dropped = self._dropped, 0
+
+            if dropped:
+                logger.warning(f"[Redis] flow event queue full, dropped {dropped} event(s)")
+
+            if not batch:
+                return 0
+
+            try:
+                # Runs on the flusher thread, so this is a root span of its own
+                with get_tracer().span("redis.publish_batch", KIND_CLIENT, {'db.system': 'redis', 'messaging.batch.message_count': len(batch)}):
+                    transport = get_transport()
+                    pipeline = self.redis_factory().pipeline(transaction=False)
+                    for channel, message in batch:
+                        # Serialised here, off the node's execution path
+                        for target, payload in encode_event(channel, message):
+                            add_event_to_pipeline(pipeline, target, payload, transport)
+                    pipeline.execute()
+            except Exception as e:
+                logger.warning(f"[Redis] batched publish of {len(batch)} event(s) failed (ignored): {e}")
+                # The failed batch may have held the only header of a run
+                repeat_compact_headers()
+                return 0
+
+            return len(batch)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="flow-event-publisher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                if len(self._queue) < self.batch_size:
+                    self._condition.wait(timeout=self.flush_interval)
+            self.flush()
+
+
+_publisher: FlowEventPublisher | None = None
+_publisher_lock = threading.Lock()
+
+
+def is_batching_enabled() -> bool:
+    return os.getenv("FLOW_EVENTS_BATCHING", "true").lower() not in ("false", "0", "no")
+
+
+def get_flow_event_publisher(redis_factory: Callable) -> FlowEventPublisher:
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = FlowEventPublisher(
+                    redis_factory=redis_factory,
+                    batch_size=int(os.getenv("FLOW_EVENTS_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+                    flush_interval=float(os.getenv("FLOW_EVENTS_FLUSH_INTERVAL_MS", DEFAULT_FLUSH_INTERVAL_MS)) / 1000,
+                    max_queue_size=int(os.getenv("FLOW_EVENTS_MAX_QUEUE_SIZE", DEFAULT_MAX_QUEUE_SIZE)),
+                )
+    return _publisher
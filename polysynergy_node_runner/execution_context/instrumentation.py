@@ -0,0 +1,135 @@
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("true", "1", "yes")
+
+
+class NodeTimings:
+    """
+    Where the time of one node execution went. Phases are in milliseconds:
+    resolve (placeholders, secrets, environment variables), execute (the
+    node's own code) and persist (writing the node result). `wall_ms` covers
+    state_execute up to the end_node flow event, which carries these timings.
+    """
+    __slots__ = (
+        'node_id', 'handle', 'order',
+        'resolve_ms', 'execute_ms', 'persist_ms', 'wall_ms', 'cpu_ms',
+        'allocated_bytes', 'peak_allocated_bytes', 'bytes_written',
+    )
+
+    def __init__(self, node_id: str, handle: str, order: int):
+        self.node_id = node_id
+        self.handle = handle
+        self.order = order
+        self.resolve_ms = 0.0
+        self.execute_ms = 0.0
+        self.persist_ms = 0.0
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        # Only measured when allocation tracking is on
+        self.allocated_bytes: int | None = None
+        self.peak_allocated_bytes: int | None = None
+        self.bytes_written = 0
+
+    def to_dict(self, complete: bool = True) -> dict:
+        """`complete=False` leaves out what is only known after persisting."""
+        data = {
+            'resolve_ms': round(self.resolve_ms, 3),
+            'execute_ms': round(self.execute_ms, 3),
+            'cpu_ms': round(self.cpu_ms, 3),
+        }
+        if complete:
+            data['persist_ms'] = round(self.persist_ms, 3)
+            data['wall_ms'] = round(self.wall_ms, 3)
+            data['bytes_written'] = self.bytes_written
+        if self.allocated_bytes is not None:
+            data['allocated_bytes'] = self.allocated_bytes
+            data['peak_allocated_bytes'] = self.peak_allocated_bytes
+        return data
+
+
+class NodeTimer:
+    """Measures the phases of one node execution; see Instrumentation.start_node."""
+
+    def __init__(self, instrumentation: "Instrumentation", timings: NodeTimings):
+        self.instrumentation = instrumentation
+        self.timings = timings
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.thread_time()
+        self._phase_started_at = self._started_at
+
+        self._tracing_allocations = instrumentation.trace_allocations
+        if self._tracing_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._allocated_at_start = tracemalloc.get_traced_memory()[0]
+
+    def phase(self, name: str):
+        """Ends the current phase, attributing the time since the previous one to `name`."""
+        now = time.perf_counter()
+        setattr(self.timings, f'{name}_ms', (now - self._phase_started_at) * 1000)
+        self._phase_started_at = now
+
+    def skip(self):
+        """Starts the next phase without attributing the time since the previous one."""
+        self._phase_started_at = time.perf_counter()
+
+    def stop_cpu(self):
+        # Before persisting, so CPU time and allocations are the node's own
+        self.timings.cpu_ms = (time.thread_time() - self._cpu_started_at) * 1000
+        if self._tracing_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.timings.allocated_bytes = current - self._allocated_at_start
+            self.timings.peak_allocated_bytes = peak - self._allocated_at_start
+
+    def finish(self) -> NodeTimings:
+        self.timings.wall_ms = (time.perf_counter() - self._started_at) * 1000
+        self.instrumentation.emit(self.timings)
+        return self.timings
+
+
+class Instrumentation:
+    """
+    Per-run node instrumentation. Off unless a hook is registered or
+    NODE_RUNNER_INSTRUMENTATION is set, so uninstrumented runs pay a single
+    attribute check per node. Allocation tracking (tracemalloc) slows
+    execution down considerably and is separately opt-in through
+    NODE_RUNNER_TRACE_ALLOCATIONS.
+    """
+
+    def __init__(self, enabled: bool = None, trace_allocations: bool = None):
+        self._hooks: list[Callable[[NodeTimings], None]] = []
+        self._enabled = _env_flag("NODE_RUNNER_INSTRUMENTATION") if enabled is None else enabled
+        self.trace_allocations = (
+            _env_flag("NODE_RUNNER_TRACE_ALLOCATIONS") if trace_allocations is None else trace_allocations
+        )
+        self.enabled = self._enabled or self.trace_allocations
+
+    def add_hook(self, hook: Callable[[NodeTimings], None]):
+        self._hooks.append(hook)
+        self.enabled = True
+
+    def remove_hook(self, hook: Callable[[NodeTimings], None]):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+        self.enabled = self._enabled or self.trace_allocations or bool(self._hooks)
+
+    def start_node(self, node_id: str, handle: str, order: int) -> NodeTimer | None:
+        if not self.enabled:
+            return None
+        return NodeTimer(self, NodeTimings(node_id, handle, order))
+
+    def emit(self, timings: NodeTimings):
+        for hook in list(self._hooks):
+            try:
+                hook(timings)
+            except Exception as e:
+                logger.warning("Instrumentation hook failed (ignored): %s", e)
@@ -1,5 +1,6 @@
 from polysynergy_node_runner.execution_context.context import Context
 from polysynergy_node_runner.execution_context.flow_state import FlowState
+from polysynergy_node_runner.execution_context.utils.handle_access import get_handle_setter
 
 
 class ApplyFromConnectionMixin:
@@ -25,19 +26,8 @@ class ApplyFromConnectionMixin:
                 setattr(self, attr, getattr(source_node, attr))
 
     def apply_from_incoming_connection(self, connection):
-        var = self.context.state.get_connection_source_variable(connection)
-        self._apply_attribute(connection.target_handle, var)
+        source_node = self.context.state.get_node_by_id(connection.source_node_id)
+        connection.target_setter(self, connection.source_getter(source_node))
 
     def _apply_attribute(self, property_name, value):
-        if "." in property_name:
-            parent_attr, sub_key = property_name.split(".", 1)
-            parent_dict = getattr(self, parent_attr, {})
-
-            if not isinstance(parent_dict, dict):
-                raise TypeError(
-                    f"Can't configure: '{parent_attr}' existing type is: {type(parent_dict).__name__}, not a dict!")
-
-            parent_dict[sub_key] = value
-            setattr(self, parent_attr, parent_dict)
-        else:
-            setattr(self, property_name, value)
\ No newline at end of file
+        get_handle_setter(property_name)(self, value)
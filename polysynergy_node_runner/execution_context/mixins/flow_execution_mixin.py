@@ -1,6 +1,5 @@
 import inspect
-import sys
-import traceback
+import logging
 from typing import Optional, TYPE_CHECKING
 
 from polysynergy_node_runner.execution_context.context import Context
@@ -9,6 +8,8 @@ from polysynergy_node_runner.execution_context.send_flow_event import send_flow_
 if TYPE_CHECKING:
     from polysynergy_node_runner.execution_context.executable_node import ExecutableNode
 
+logger = logging.getLogger(__name__)
+
 class FlowExecutionMixin:
 
     context: Context
@@ -25,8 +26,7 @@ class FlowExecutionMixin:
     _in_connections: list = []
     _driving_connections: list = []
 
-    _resolve_secret: callable
-    _resolve_environment_variable: callable
+    _resolve_placeholders: callable
     get_out_connections_on_true_path: callable
     get_out_connections_on_false_path: callable
     get_out_connections_except_on_false_path: callable
@@ -41,7 +41,7 @@ class FlowExecutionMixin:
 
     def snipe(self, execution_flow: dict[str, any]):
         self._killed = True
-        print('Sniped:', self.handle, self.id, self.__class__.__name__)
+        logger.debug('Sniped: %s %s %s', self.handle, self.id, type(self).__name__)
 
         for node_order in execution_flow['nodes_order']:
             if node_order['id'] == self.id:
@@ -52,7 +52,7 @@ class FlowExecutionMixin:
 
     def kill(self):
         self._killed = True
-        print('Killed:', self.handle, self.id, self.__class__.__name__)
+        logger.debug('Killed: %s %s %s', self.handle, self.id, type(self).__name__)
 
         for node_order in self.context.execution_flow['nodes_order']:
             if node_order['id'] == self.id:
@@ -70,12 +70,13 @@ class FlowExecutionMixin:
         raise NotImplementedError()
 
     async def state_execute(self):
-        has_listener = self.context.active_listeners.has_listener(
-            self.context.node_setup_version_id
-        )
+        # Resolved once per run; read once here so start and end events pair up
+        has_listener = self.context.has_listener
 
         self._processed = True
         order = len(self.context.execution_flow['nodes_order'])
+        # None unless instrumentation is on for this run
+        timer = self.context.instrumentation.start_node(self.id, self.handle, order)
 
         if has_listener:
             send_flow_event(
@@ -92,10 +93,13 @@ class FlowExecutionMixin:
         is_service_node = hasattr(self, 'provide_instance') and callable(getattr(self, 'provide_instance'))
         # Track if this service node provided an instance (no execute method)
         is_service_node_provided = False
-        
+
+        if timer:
+            timer.skip()
         try:
-            self._resolve_secret()
-            self._resolve_environment_variable()
+            self._resolve_placeholders()
+            if timer:
+                timer.phase('resolve')
             if inspect.iscoroutinefunction(type(self).execute):
                 await self.execute()
             else:
@@ -104,26 +108,36 @@ class FlowExecutionMixin:
         except NotImplementedError as e:
             # For ServiceNodes, not implementing execute() is expected behavior
             if is_service_node:
-                print(f"ServiceNode {self.handle} successfully provides instance (no execute method needed)")
+                logger.debug("ServiceNode %s successfully provides instance (no execute method needed)", self.handle)
                 is_service_node_provided = True
                 # Don't set exception for ServiceNodes
             else:
-                print(f"Node {self.handle} does not implement execute method")
+                logger.warning("Node %s does not implement execute method", self.handle)
                 self._exception = e
         except Exception as e:
-            print(f"Unhandled exception in node {self.handle}: {e}", file=sys.stderr)
-            traceback.print_exc()
+            logger.exception("Unhandled exception in node %s: %s", self.handle, e)
             self._exception = e
 
-        self.context.storage.store_node_result(
+        if timer:
+            timer.phase('execute')
+            timer.stop_cpu()
+
+        # Persist time and bytes written are only known afterwards; they are
+        # part of the end_node event and the hooks, not the stored result
+        bytes_written = self.context.storage.store_node_result(
             node=self,
             flow_id=self.context.node_setup_version_id,
             run_id=self.context.run_id,
             order=order,
             stage= self.context.stage,
-            sub_stage=self.context.sub_stage
+            sub_stage=self.context.sub_stage,
+            timings=timer.timings.to_dict(complete=False) if timer else None,
         )
 
+        if timer:
+            timer.phase('persist')
+            timer.timings.bytes_written = bytes_written or 0
+
         if hasattr(self, 'true_path') and self.true_path is False:
             for connection in self.get_out_connections_on_true_path():
                 connection.make_killer()
@@ -136,8 +150,9 @@ class FlowExecutionMixin:
             for connection in self.get_out_connections_except_on_false_path():
                 connection.make_killer()
 
+        timings = timer.finish() if timer else None
+
         if has_listener:
-            print(f"Sending flow event for node {self.handle} with status")
             # Determine the status based on node type and execution result
             status = 'killed'
             if not self.is_killed():
@@ -157,4 +172,5 @@ class FlowExecutionMixin:
                 event_type='end_node',
                 order=order,
                 status=status,
+                data={'timings': timings.to_dict()} if timings else None,
             )
\ No newline at end of file
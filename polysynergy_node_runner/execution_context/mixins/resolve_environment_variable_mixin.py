@@ -2,6 +2,13 @@ import os
 import re
 
 from polysynergy_node_runner.execution_context.context import Context
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import get_public_attributes
+
+ENV_PATTERN = re.compile(r"<(?:environment|env):([a-zA-Z0-9_\-]+)>")
+
+
+def has_environment_placeholder(value: str) -> bool:
+    return "<environment:" in value or "<env:" in value
 
 
 class ResolveEnvironmentVariableMixin:
@@ -10,8 +17,6 @@ class ResolveEnvironmentVariableMixin:
 
     def _replace_environment_placeholders(self, data: str) -> str:
 
-        ENV_PATTERN = re.compile(r"<(?:environment|env):([a-zA-Z0-9_\-]+)>")
-
         def replacer(match):
             env_key = match.group(1)
             project_id = os.getenv("PROJECT_ID")
@@ -28,18 +33,22 @@ class ResolveEnvironmentVariableMixin:
 
         return ENV_PATTERN.sub(replacer, data)
 
+    def _resolve_environment_variable_in_value(self, val):
+        # Only string attributes may contain <environment:key> or <env:key>
+        if not isinstance(val, str) or not has_environment_placeholder(val):
+            return val
+        return self._replace_environment_placeholders(data=val)
+
     def _resolve_environment_variable(self):
-        # Handle string attributes that may contain <environment:key> or <env:key> pattern
-        for attr_name in getattr(type(self), '__annotations__', {}):
-            if attr_name.startswith("_"):
-                continue
+        for attr_name in get_public_attributes(type(self)):
             val = getattr(self, attr_name, None)
-            if isinstance(val, str):
-                if "<environment:" not in val and "<env:" not in val:
-                    continue
-                replaced = self._replace_environment_placeholders(data=val)
+            replaced = self._resolve_environment_variable_in_value(val)
+            if replaced is not val:
                 setattr(self, attr_name, replaced)
 
+        self._resolve_environment_variable_node()
+
+    def _resolve_environment_variable_node(self):
         # Handle VariableEnvironment nodes (existing functionality)
         if not self.__class__.__name__.startswith("VariableEnvironment"):
             return
@@ -58,4 +67,4 @@ class ResolveEnvironmentVariableMixin:
         if not value:
             value = '<ENV_VAR::NOT::FOUND>'
 
-        setattr(self, "true_path", value)
\ No newline at end of file
+        setattr(self, "true_path", value)
@@ -0,0 +1,25 @@
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import get_public_attributes
+
+
+class ResolvePlaceholdersMixin:
+    """
+    Resolves secret and environment placeholders of a node in a single pass
+    over its attributes. Combines ResolveSecretMixin and
+    ResolveEnvironmentVariableMixin, in that order.
+    """
+
+    _resolve_secret_in_value: callable
+    _resolve_environment_variable_in_value: callable
+    _resolve_secret_variable_node: callable
+    _resolve_environment_variable_node: callable
+
+    def _resolve_placeholders(self):
+        for attr_name in get_public_attributes(type(self)):
+            val = getattr(self, attr_name, None)
+            replaced = self._resolve_secret_in_value(val)
+            replaced = self._resolve_environment_variable_in_value(replaced)
+            if replaced is not val:
+                setattr(self, attr_name, replaced)
+
+        self._resolve_secret_variable_node()
+        self._resolve_environment_variable_node()
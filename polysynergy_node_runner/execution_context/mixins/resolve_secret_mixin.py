@@ -2,6 +2,14 @@ import os
 import re
 
 from polysynergy_node_runner.execution_context.context import Context
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import get_public_attributes
+
+# Support both <secret:...> and <sec:...> patterns
+SECRET_PATTERN = re.compile(r"<sec(?:ret)?:([a-zA-Z0-9_\-]+)>")
+
+
+def has_secret_placeholder(value: str) -> bool:
+    return "<secret:" in value or "<sec:" in value
 
 
 class ResolveSecretMixin:
@@ -9,9 +17,6 @@ class ResolveSecretMixin:
 
     def _replace_secret_placeholders(self, data: str) -> str:
 
-        # Support both <secret:...> and <sec:...> patterns
-        SECRET_PATTERN = re.compile(r"<sec(?:ret)?:([a-zA-Z0-9_\-]+)>")
-
         def replacer(match):
             secret_key = match.group(1)
             project_id = os.getenv("PROJECT_ID")
@@ -31,23 +36,30 @@ class ResolveSecretMixin:
 
         return SECRET_PATTERN.sub(replacer, data)
 
+    def _resolve_secret_in_value(self, val):
+        if isinstance(val, str):
+            if not has_secret_placeholder(val):
+                return val
+            return self._replace_secret_placeholders(data=val)
+
+        if isinstance(val, dict):
+            # Process dict values for secrets (mutate in place)
+            for k, v in val.items():
+                if isinstance(v, str) and has_secret_placeholder(v):
+                    val[k] = self._replace_secret_placeholders(v)
+
+        return val
+
     def _resolve_secret(self):
-        for attr_name in getattr(type(self), '__annotations__', {}):
-            if attr_name.startswith("_"):
-                continue
+        for attr_name in get_public_attributes(type(self)):
             val = getattr(self, attr_name, None)
-            if isinstance(val, str):
-                # Check for both <secret:...> and <sec:...> patterns
-                if "<secret:" not in val and "<sec:" not in val:
-                    continue
-                replaced = self._replace_secret_placeholders(data=val)
+            replaced = self._resolve_secret_in_value(val)
+            if replaced is not val:
                 setattr(self, attr_name, replaced)
-            elif isinstance(val, dict):
-                # Process dict values for secrets (mutate in place)
-                for k, v in val.items():
-                    if isinstance(v, str) and ("<secret:" in v or "<sec:" in v):
-                        val[k] = self._replace_secret_placeholders(v)
 
+        self._resolve_secret_variable_node()
+
+    def _resolve_secret_variable_node(self):
         if not self.__class__.__name__.startswith("VariableSecret"):
             return
 
@@ -66,4 +78,4 @@ class ResolveSecretMixin:
             secret = '<SECRET::NOT::FOUND>'
 
         self.context.secrets_map[secret_key] = secret
-        setattr(self, "true_path", secret.get("value"))
\ No newline at end of file
+        setattr(self, "true_path", secret.get("value"))
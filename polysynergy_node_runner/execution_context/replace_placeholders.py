@@ -1,11 +1,24 @@
 import json
+import logging
 import re
+
+import jinja2
 from jinja2 import Environment, StrictUndefined, BaseLoader, TemplateNotFound
 from polysynergy_node_runner.execution_context.utils.traversal import find_node_by_handle_backwards
+from polysynergy_node_runner.utils.tracing import KIND_CLIENT, STATUS_ERROR, get_tracer, inject_traceparent
+
+logger = logging.getLogger(__name__)
 
 # Global project templates dict (set at code generation time)
 _project_templates: dict = {}
 
+# Templates compiled at code generation time, as factories returning the
+# compiled module's namespace: project templates by name, inline templates
+# by source. Template objects are made on first use.
+_precompiled_project: dict = {}
+_precompiled_inline: dict = {}
+_inline_templates: dict = {}
+
 def set_project_templates(templates: dict):
     """Set the project templates for Jinja extends support.
 
@@ -15,9 +28,41 @@ def set_project_templates(templates: dict):
     _project_templates = templates or {}
 
 
+def register_precompiled_templates(jinja_version: str, project: dict = None, inline: dict = None):
+    """Register templates precompiled by codegen (see steps.precompile_templates).
+
+    Compiled template code is specific to the Jinja version that produced it;
+    with another version installed the templates are parsed from source as
+    before.
+    """
+    global _precompiled_project, _precompiled_inline, _inline_templates
+    if jinja_version != jinja2.__version__:
+        logger.info(f"Templates were precompiled with Jinja {jinja_version}, running {jinja2.__version__}; "
+                    f"compiling them from source")
+        return
+    _precompiled_project = dict(project or {})
+    _precompiled_inline = dict(inline or {})
+    _inline_templates = {}
+    # Project templates loaded before are cached by name
+    if jinja_env.cache is not None:
+        jinja_env.cache.clear()
+
+
+def _template_from_factory(environment, factory, name, globals):
+    namespace = factory(environment)
+    namespace["__file__"] = name or "<template>"
+    return environment.template_class.from_module_dict(environment, namespace, globals)
+
+
 class ProjectTemplateLoader(BaseLoader):
     """Custom Jinja loader that loads templates from the project templates dict."""
 
+    def load(self, environment, name, globals=None):
+        factory = _precompiled_project.get(name)
+        if factory is not None:
+            return _template_from_factory(environment, factory, name, globals if globals is not None else {})
+        return super().load(environment, name, globals)
+
     def get_source(self, environment, template):
         if template in _project_templates:
             source = _project_templates[template]
@@ -124,7 +169,6 @@ def flow(path: str, method: str = "GET", **kwargs) -> dict:
         - error: Error message if failed
     """
     import os
-    import json as json_module
 
     # Get context
     stage = _template_context.get('stage') or os.getenv('STAGE', 'mock')
@@ -154,6 +198,23 @@ def flow(path: str, method: str = "GET", **kwargs) -> dict:
         from urllib.parse import urlencode
         full_url += '?' + urlencode(query)
 
+    with get_tracer().span(f"flow {method.upper()} /{clean_path}", KIND_CLIENT, {
+        'http.request.method': method.upper(),
+        # Without the query string, which may carry user data
+        'url.path': f"/{project_id}/{stage}/{clean_path}",
+    }) as span:
+        # The called route continues this trace
+        headers = inject_traceparent(dict(headers))
+        response = _flow_request(full_url, method, body, headers)
+        span.set_attribute('http.response.status_code', response['status'])
+        if not response['is_valid']:
+            span.set_status(STATUS_ERROR, response['error'])
+        return response
+
+
+def _flow_request(full_url: str, method: str, body, headers: dict) -> dict:
+    import json as json_module
+
     # Make synchronous HTTP request
     try:
         import urllib.request
@@ -261,6 +322,13 @@ jinja_env.globals['component'] = component
 jinja_env.globals['flow'] = flow
 
 
+def _add_backwards_node(context: dict, handle: str, node):
+    node_dict = node.to_dict()
+    node_dict.setdefault("true_path", getattr(node, "true_path", None))
+    context[handle] = node_dict
+    context[handle + "__default__"] = getattr(node, "true_path", None)
+
+
 def replace_placeholders(data, values: dict = None, state=None, current_node=None, components: dict = None):
     """
     data: string, dict of list met {{ placeholders }}
@@ -287,22 +355,30 @@ def replace_placeholders(data, values: dict = None, state=None, current_node=Non
 
             # If we have current_node, try to pre-populate missing handles via backwards lookup
             if current_node:
-                missing_handles = _find_missing_handles_in_template(data, context)
-                for missing_handle in missing_handles:
-                    try:
-                        found_node = find_node_by_handle_backwards(
-                            start_node=current_node,
-                            target_handle=missing_handle,
-                            get_node_by_id=state.get_node_by_id
-                        )
-                        if found_node and found_node != current_node:  # Don't use self as source
-                            node_dict = found_node.to_dict()
-                            node_dict.setdefault("true_path", getattr(found_node, "true_path", None))
-                            context[missing_handle] = node_dict
-                            context[missing_handle + "__default__"] = getattr(found_node, "true_path", None)
-                    except Exception:
-                        # If backwards lookup fails, skip this handle (will cause template error as expected)
-                        pass
+                template_str = data if isinstance(data, str) else json.dumps(data)
+                template_sources = state.get_template_sources(current_node.id, template_str)
+                if template_sources is not None:
+                    # Static template: its handles were resolved at code generation time
+                    for handle, node_id in template_sources.items():
+                        if handle in context:
+                            continue
+                        found_node = state.get_node_by_id(node_id)
+                        if found_node is not None:
+                            _add_backwards_node(context, handle, found_node)
+                else:
+                    missing_handles = _find_missing_handles_in_template(template_str, context)
+                    for missing_handle in missing_handles:
+                        try:
+                            found_node = find_node_by_handle_backwards(
+                                start_node=current_node,
+                                target_handle=missing_handle,
+                                get_node_by_id=state.get_node_by_id
+                            )
+                            if found_node and found_node != current_node:  # Don't use self as source
+                                _add_backwards_node(context, missing_handle, found_node)
+                        except Exception:
+                            # If backwards lookup fails, skip this handle (will cause template error as expected)
+                            pass
 
         # Als het al een string is: direct renderen
         if isinstance(data, str):
@@ -320,5 +396,12 @@ def replace_placeholders(data, values: dict = None, state=None, current_node=Non
         clear_template_context()
 
 def _render_template_string(template_str: str, context: dict) -> str:
-    template = jinja_env.from_string(template_str)
+    template = _inline_templates.get(template_str)
+    if template is None:
+        factory = _precompiled_inline.get(template_str)
+        if factory is not None:
+            template = _template_from_factory(jinja_env, factory, None, jinja_env.make_globals(None))
+            _inline_templates[template_str] = template
+        else:
+            template = jinja_env.from_string(template_str)
     return template.render(context)
\ No newline at end of file
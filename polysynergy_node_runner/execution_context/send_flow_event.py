@@ -1,17 +1,39 @@
 import os
-import json
 import asyncio
 import logging
 import redis
 import redis.asyncio as redis_async
 
 from polysynergy_node_runner.execution_context.context import current_session_id
+from polysynergy_node_runner.execution_context.event_coalescer import get_event_coalescer
+from polysynergy_node_runner.execution_context.event_encoding import (
+    CompactEventDecoder,
+    ENCODING_COMPACT,
+    compact_channel,
+    encode_event,
+    get_encoding,
+    repeat_compact_headers,
+)
+from polysynergy_node_runner.execution_context.event_transport import (
+    publish_event,
+    publish_events_async,
+    read_stream_events,
+)
+from polysynergy_node_runner.execution_context.flow_event_publisher import (
+    get_flow_event_publisher,
+    is_batching_enabled,
+)
+from polysynergy_node_runner.utils.tracing import KIND_CLIENT, get_tracer
 
 logger = logging.getLogger(__name__)
 
 _redis = None
 _async_redis = None
 
+# These close a run; everything queued before them must reach the
+# subscribers first, so the queue is flushed and they are sent directly
+FINAL_EVENTS = {'run_end', 'resume_end'}
+
 def get_redis():
     """Get synchronous Redis connection for backward compatibility."""
     redis_url = os.getenv('REDIS_URL', 'redis://redis:6379')
@@ -40,13 +62,44 @@ async def get_async_redis():
         )
     return _async_redis
 
+def _get_channel(flow_id: str, session_id: str = None) -> str:
+    session_id = session_id or current_session_id.get()
+    return f"execution_updates:{flow_id}:{session_id}" if session_id else f"execution_updates:{flow_id}"
+
+def read_flow_events(flow_id: str, session_id: str = None, last_id: str = "0-0", count: int = 500,
+                     decoder: CompactEventDecoder = None):
+    """
+    Backfill execution updates from the stream transport, e.g. for a UI that
+    subscribed late. Returns (entry_id, message) tuples after `last_id`.
+    With FLOW_EVENTS_ENCODING=compact the compact stream is read and decoded;
+    pass the same `decoder` to every call that continues from an offset.
+    """
+    channel = _get_channel(flow_id, session_id)
+    if get_encoding() == ENCODING_COMPACT:
+        channel = compact_channel(channel)
+    return read_stream_events(get_redis(), channel, last_id=last_id, count=count, decoder=decoder)
+
+def _coalesce(message: dict) -> list[dict]:
+    # Repeated node events are folded into progress summaries; pending
+    # summaries go out right before the event that closes the run
+    coalescer = get_event_coalescer()
+    if message['event'] in FINAL_EVENTS:
+        return coalescer.finish_run(message) + [message]
+    return coalescer.process(message)
+
+def flush_flow_events():
+    """Publish all queued flow events now."""
+    if is_batching_enabled():
+        get_flow_event_publisher(get_redis).flush()
+
 async def send_flow_event_async(
     flow_id: str,
     run_id: str,
     node_id: str | None,
     event_type: str,
     order: int = -1,
-    status='running'
+    status='running',
+    data: dict = None,
 ):
     """Async version of send_flow_event for non-blocking event sending."""
     message = {
@@ -57,17 +110,26 @@ async def send_flow_event_async(
         'order': order,
         'status': status,
     }
+    if data is not None:
+        message['data'] = data
+
+    logger.debug('Flow event (async): %s', message)
+
+    messages = _coalesce(message)
+    channel = _get_channel(flow_id)
+
+    if is_batching_enabled() and event_type not in FINAL_EVENTS:
+        publisher = get_flow_event_publisher(get_redis)
+        for m in messages:
+            publisher.publish(channel, m)
+        return
 
-    print('SEND FLOW EVENT (async)', message)
-    
     try:
+        await asyncio.to_thread(flush_flow_events)
         redis_conn = await get_async_redis()
-        session_id = current_session_id.get()
-        channel = f"execution_updates:{flow_id}:{session_id}" if session_id else f"execution_updates:{flow_id}"
-        # Fire and forget - don't await the publish
-        asyncio.create_task(
-            redis_conn.publish(channel, json.dumps(message))
-        )
+        events = [pair for m in messages for pair in encode_event(channel, m)]
+        # Fire and forget - don't await the publish; one task keeps the order
+        asyncio.create_task(publish_events_async(redis_conn, events))
     except Exception as e:
         logger.warning(f"[Redis] async publish failed (ignored): {e}")
 
@@ -77,7 +139,8 @@ def send_flow_event(
     node_id: str | None,
     event_type: str,
     order: int = -1,
-    status='running'
+    status='running',
+    data: dict = None,
 ):
     message = {
         'flow_id': flow_id,
@@ -87,15 +150,29 @@ def send_flow_event(
         'order': order,
         'status': status,
     }
+    if data is not None:
+        message['data'] = data
+
+    logger.debug('Flow event: %s', message)
+
+    messages = _coalesce(message)
+    channel = _get_channel(flow_id)
+
+    if is_batching_enabled() and event_type not in FINAL_EVENTS:
+        publisher = get_flow_event_publisher(get_redis)
+        for m in messages:
+            publisher.publish(channel, m)
+        return
 
-    print(f'[SEND_FLOW_EVENT] sync event: {message}')
     try:
+        flush_flow_events()
         redis_conn = get_redis()
-        session_id = current_session_id.get()
-        channel = f"execution_updates:{flow_id}:{session_id}" if session_id else f"execution_updates:{flow_id}"
-        print(f'[SEND_FLOW_EVENT] Publishing to channel: {channel}')
-        result = redis_conn.publish(channel, json.dumps(message))
-        print(f'[SEND_FLOW_EVENT] Published, subscribers: {result}')
+        result = None
+        with get_tracer().span("redis.publish", KIND_CLIENT, {'db.system': 'redis', 'flow.event': event_type}):
+            for m in messages:
+                for target, payload in encode_event(channel, m):
+                    result = publish_event(redis_conn, target, payload)
+        logger.debug('Published flow event to %s, subscribers: %s', channel, result)
     except Exception as e:
-        print(f'[SEND_FLOW_EVENT] FAILED: {e}')
         logger.warning(f"[Redis] publish failed (ignored): {e}")
+        repeat_compact_headers()
@@ -1,11 +1,12 @@
 import os
-import json
 import asyncio
 import logging
 import redis
 import redis.asyncio as redis_async
 
 from polysynergy_node_runner.execution_context.context import current_session_id
+from polysynergy_node_runner.execution_context.event_encoding import encode_event, repeat_compact_headers
+from polysynergy_node_runner.execution_context.event_transport import publish_event, publish_events_async
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +73,7 @@ async def send_interaction_event_async(
         'user_id': user_id,
     }
 
-    print('SEND INTERACTION EVENT (async)', message)
+    logger.debug('Interaction event (async): %s', message)
 
     try:
         redis_conn = await get_async_redis()
@@ -86,10 +87,8 @@ async def send_interaction_event_async(
         if session_id:
             channel = f"{channel}:{session_id}"
 
-        # Fire and forget - don't await the publish
-        asyncio.create_task(
-            redis_conn.publish(channel, json.dumps(message))
-        )
+        # Fire and forget - don't await the publish; one task keeps the order
+        asyncio.create_task(publish_events_async(redis_conn, encode_event(channel, message)))
     except Exception as e:
         logger.warning(f"[Redis] async interaction event publish failed (ignored): {e}")
 
@@ -128,6 +127,8 @@ def send_interaction_event(
         if session_id:
             channel = f"{channel}:{session_id}"
 
-        redis_conn.publish(channel, json.dumps(message))
+        for target, payload in encode_event(channel, message):
+            publish_event(redis_conn, target, payload)
     except Exception as e:
-        logger.warning(f"[Redis] interaction event publish failed (ignored): {e}")
\ No newline at end of file
+        logger.warning(f"[Redis] interaction event publish failed (ignored): {e}")
+        repeat_compact_headers()
\ No newline at end of file
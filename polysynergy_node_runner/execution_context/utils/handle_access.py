@@ -0,0 +1,75 @@
+import functools
+from typing import Any, Callable
+
+# Handles are fixed per connection, so their accessors are built once per
+# distinct handle instead of splitting the handle on every transfer
+HandleGetter = Callable[[Any], Any]
+HandleSetter = Callable[[Any, Any], None]
+
+
+def _step(value, part: str):
+    if isinstance(value, dict):
+        return value.get(part)
+    return getattr(value, part, None)
+
+
+@functools.lru_cache(maxsize=None)
+def get_handle_getter(handle: str) -> HandleGetter:
+    """
+    Reads a source handle from a node: `value` is the node's attribute,
+    `value.key` walks on through dict keys and attributes. None when a step
+    is missing or None.
+    """
+    parts = tuple(handle.split("."))
+
+    if len(parts) == 1:
+        name = parts[0]
+
+        def get(node):
+            return getattr(node, name, None)
+
+    elif len(parts) == 2:
+        name, key = parts
+
+        def get(node):
+            value = getattr(node, name, None)
+            return None if value is None else _step(value, key)
+
+    else:
+        def get(node):
+            value = node
+            for part in parts:
+                value = _step(value, part)
+                if value is None:
+                    break
+            return value
+
+    return get
+
+
+@functools.lru_cache(maxsize=None)
+def get_handle_setter(handle: str) -> HandleSetter:
+    """
+    Writes a target handle on a node: `value` sets the attribute,
+    `dict.key` sets a key of the node's dict attribute (the rest of the
+    handle is the key, dots included).
+    """
+    if "." not in handle:
+        def set_(node, value):
+            setattr(node, handle, value)
+
+        return set_
+
+    parent_attr, sub_key = handle.split(".", 1)
+
+    def set_(node, value):
+        parent_dict = getattr(node, parent_attr, {})
+
+        if not isinstance(parent_dict, dict):
+            raise TypeError(
+                f"Can't configure: '{parent_attr}' existing type is: {type(parent_dict).__name__}, not a dict!")
+
+        parent_dict[sub_key] = value
+        setattr(node, parent_attr, parent_dict)
+
+    return set_
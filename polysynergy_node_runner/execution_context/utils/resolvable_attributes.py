@@ -0,0 +1,40 @@
+from weakref import WeakKeyDictionary
+
+# Path outputs are not inputs, so templates are never rendered into them
+TEMPLATE_SKIP_ATTRIBUTES = frozenset({'true_path', 'false_path'})
+
+# Computed once per node class instead of on every node start
+_public_attributes: WeakKeyDictionary = WeakKeyDictionary()
+_template_attributes: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_public_attributes(cls: type) -> tuple[str, ...]:
+    """
+    The annotated, non-underscore attributes of a node class: the attributes
+    that can hold secret, environment and template placeholders.
+    """
+    attributes = _public_attributes.get(cls)
+    if attributes is None:
+        attributes = tuple(
+            name for name in getattr(cls, '__annotations__', {})
+            if not name.startswith("_")
+        )
+        _public_attributes[cls] = attributes
+    return attributes
+
+
+def get_template_attributes(cls: type) -> tuple[str, ...]:
+    """
+    The public attributes that templates are rendered into; skips the path
+    outputs and variables configured with skip_template=True.
+    """
+    attributes = _template_attributes.get(cls)
+    if attributes is None:
+        node_var_settings = getattr(cls, '__node_variable_settings__', {})
+        attributes = tuple(
+            name for name in get_public_attributes(cls)
+            if name not in TEMPLATE_SKIP_ATTRIBUTES
+            and not node_var_settings.get(name, {}).get('skip_template', False)
+        )
+        _template_attributes[cls] = attributes
+    return attributes
@@ -1,15 +1,44 @@
+import json
+import logging
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Tuple
 
 import boto3
+import redis
 from boto3.dynamodb.conditions import Key
 
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Short negative TTL, for when listener changes are not pushed to this process
+NEGATIVE_TTL_SECONDS = 2
+
 
 class ActiveListenersService:
-    # bool, expires_at
-    _listener_cache: dict[str, Tuple[bool, datetime]] = {}
+    """
+    Tracks whether a UI is listening to a flow. Listener presence is kept in
+    DynamoDB and mirrored in Redis: a key `flow_listener:{node_setup_version_id}`
+    holding the stage and activation time, with a TTL, plus a pub/sub
+    message on every change.
+    Every process subscribes to those messages and keeps the answer in a
+    bounded in-memory cache, so has_listener normally resolves in memory.
+    """
+
+    # Shared per process; per-entry expiry, oldest entries are evicted
+    _listener_cache: TTLCache = TTLCache(
+        ttl=NEGATIVE_TTL_SECONDS,
+        maxsize=int(os.getenv("LISTENER_CACHE_MAX_SIZE", "1024")),
+    )
+
+    _redis = None
+    _subscriber: threading.Thread | None = None
+    _subscriber_lock = threading.Lock()
+    # Set while the presence subscription is live
+    _subscribed = threading.Event()
 
     def __init__(
         self,
@@ -47,6 +76,7 @@ class ActiveListenersService:
             "last_activated_at": datetime.now(timezone.utc).isoformat()
         }
         self.table.put_item(Item=item)
+        self._publish_presence(node_setup_version_id, stage, active=True, activated_at=item["last_activated_at"])
 
     def _cache_key(self, node_setup_version_id: str, required_stage: str) -> str:
         return f"{node_setup_version_id}@{required_stage}"
@@ -58,40 +88,54 @@ class ActiveListenersService:
         max_age_minutes: int = 60,
         first_run: bool = False,
     ) -> bool:
+        self._ensure_subscriber()
+
         key = self._cache_key(node_setup_version_id, required_stage)
+
+        if not first_run:
+            cached = self._listener_cache.get(key)
+            if cached is not None:
+                return cached
+
         now = datetime.now(timezone.utc)
 
-        if not first_run and key in self._listener_cache:
-            value, expires_at = self._listener_cache[key]
-            if now <= expires_at:
-                return value
-            del self._listener_cache[key]
+        # Redis presence key first, DynamoDB for listeners that were not mirrored
+        presence = self._get_presence(node_setup_version_id)
+        if presence is not None:
+            stage, last_active = presence
+            remaining = (last_active + timedelta(minutes=max_age_minutes) - now).total_seconds()
+            is_valid = stage == required_stage and remaining > 0
+            self._listener_cache.set(key, is_valid, ttl=remaining if is_valid else self._negative_ttl())
+            return is_valid
 
         response = self.table.query(KeyConditionExpression=Key("PK").eq(node_setup_version_id))
         items = response.get("Items", [])
         if not items:
-            self._listener_cache[key] = (False, now + timedelta(seconds=2))  # korte negatieve TTL
+            self._listener_cache.set(key, False, ttl=self._negative_ttl())
             return False
 
         item = items[0]
         if item.get("stage") != required_stage:
-            self._listener_cache[key] = (False, now + timedelta(seconds=2))
+            self._listener_cache.set(key, False, ttl=self._negative_ttl())
             return False
 
         ts = item.get("last_activated_at")
         if not ts:
-            self._listener_cache[key] = (False, now + timedelta(seconds=2))
+            self._listener_cache.set(key, False, ttl=self._negative_ttl())
             return False
 
         try:
             last_active = datetime.fromisoformat(ts)
-            is_valid = now - last_active < timedelta(minutes=max_age_minutes)
-            pos_expires = last_active + timedelta(minutes=max_age_minutes)
-            neg_expires = now + timedelta(seconds=2)
-            self._listener_cache[key] = (is_valid, pos_expires if is_valid else neg_expires)
+            remaining = (last_active + timedelta(minutes=max_age_minutes) - now).total_seconds()
+            is_valid = remaining > 0
+            if is_valid:
+                self._listener_cache.set(key, True, ttl=remaining)
+                self._set_presence_key(node_setup_version_id, required_stage, ts, int(remaining))
+            else:
+                self._listener_cache.set(key, False, ttl=self._negative_ttl())
             return is_valid
         except Exception:
-            self._listener_cache[key] = (False, now + timedelta(seconds=2))
+            self._listener_cache.set(key, False, ttl=self._negative_ttl())
             return False
 
     def clear_listeners(self, node_setup_version_id: str):
@@ -103,10 +147,8 @@ class ActiveListenersService:
                 batch.delete_item(Key={"PK": node_setup_version_id})
 
         # Clear all cached entries for this node_setup_version_id
-        # Remove all cache keys that start with this version_id
-        keys_to_remove = [key for key in self._listener_cache.keys() if key.startswith(f"{node_setup_version_id}@")]
-        for key in keys_to_remove:
-            del self._listener_cache[key]
+        self._listener_cache.invalidate_prefix(f"{node_setup_version_id}@")
+        self._publish_presence(node_setup_version_id, None, active=False)
 
     def is_listener_valid(self, node_setup_version_id: str, max_age_minutes: int = 60) -> bool:
         response = self.table.query(
@@ -127,6 +169,142 @@ class ActiveListenersService:
         except Exception:
             return False
 
+    # Redis presence
+
+    @staticmethod
+    def _presence_key(node_setup_version_id: str) -> str:
+        return f"flow_listener:{node_setup_version_id}"
+
+    @staticmethod
+    def _presence_channel() -> str:
+        return os.getenv("LISTENER_PRESENCE_CHANNEL", "flow_listener_updates")
+
+    @staticmethod
+    def _presence_enabled() -> bool:
+        return os.getenv("LISTENER_PRESENCE_REDIS", "true").lower() not in ("false", "0", "no")
+
+    @classmethod
+    def _get_redis(cls):
+        if cls._redis is None:
+            cls._redis = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379"), decode_responses=True)
+        return cls._redis
+
+    def _negative_ttl(self) -> float:
+        # With a live subscription a new listener is pushed into the cache
+        # right away, so "nobody is listening" can be cached much longer
+        if self._subscribed.is_set():
+            return float(os.getenv("LISTENER_NEGATIVE_TTL", "60"))
+        return NEGATIVE_TTL_SECONDS
+
+    @staticmethod
+    def _presence_value(stage: str, activated_at: str) -> str:
+        return json.dumps({"stage": stage, "activated_at": activated_at})
+
+    def _get_presence(self, node_setup_version_id: str) -> tuple[str, datetime] | None:
+        """(stage, last activation) from the presence key, or None to ask DynamoDB."""
+        if not self._presence_enabled():
+            return None
+        try:
+            value = self._get_redis().get(self._presence_key(node_setup_version_id))
+        except Exception as e:
+            logger.warning(f"Listener presence lookup failed, using DynamoDB: {e}")
+            return None
+        if value is None:
+            return None
+        try:
+            presence = json.loads(value)
+            return presence["stage"], datetime.fromisoformat(presence["activated_at"])
+        except (TypeError, ValueError, KeyError):
+            # Not a presence value this version wrote; DynamoDB decides
+            return None
+
+    def _set_presence_key(self, node_setup_version_id: str, stage: str, activated_at: str, ttl_seconds: int):
+        if not self._presence_enabled() or ttl_seconds <= 0:
+            return
+        try:
+            self._get_redis().set(
+                self._presence_key(node_setup_version_id), self._presence_value(stage, activated_at), ex=ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store listener presence: {e}")
+
+    def _publish_presence(self, node_setup_version_id: str, stage: str | None, active: bool,
+                          activated_at: str = None):
+        if active:
+            self._listener_cache.invalidate_prefix(f"{node_setup_version_id}@")
+            self._listener_cache.set(self._cache_key(node_setup_version_id, stage), True, ttl=self._presence_ttl())
+
+        if not self._presence_enabled():
+            return
+        try:
+            conn = self._get_redis()
+            pipeline = conn.pipeline(transaction=False)
+            if active:
+                pipeline.set(
+                    self._presence_key(node_setup_version_id),
+                    self._presence_value(stage, activated_at),
+                    ex=self._presence_ttl(),
+                )
+            else:
+                pipeline.delete(self._presence_key(node_setup_version_id))
+            pipeline.publish(self._presence_channel(), json.dumps({
+                "id": node_setup_version_id,
+                "stage": stage,
+                "active": active,
+            }))
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish listener presence: {e}")
+
+    @staticmethod
+    def _presence_ttl() -> int:
+        return int(os.getenv("LISTENER_PRESENCE_TTL", "3600"))
+
+    @classmethod
+    def apply_presence_message(cls, data):
+        try:
+            message = json.loads(data)
+            node_setup_version_id = message["id"]
+        except (TypeError, ValueError, KeyError):
+            return
+
+        cls._listener_cache.invalidate_prefix(f"{node_setup_version_id}@")
+        if message.get("active") and message.get("stage"):
+            cls._listener_cache.set(
+                f"{node_setup_version_id}@{message['stage']}", True, ttl=cls._presence_ttl()
+            )
+
+    @classmethod
+    def _listen_for_presence(cls):
+        while True:
+            try:
+                pubsub = cls._get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(cls._presence_channel())
+                cls._subscribed.set()
+                for message in pubsub.listen():
+                    cls.apply_presence_message(message.get("data"))
+            except Exception as e:
+                if cls._subscribed.is_set():
+                    logger.warning(f"Listener presence subscription lost: {e}")
+            # Changes may have been missed while disconnected
+            cls._subscribed.clear()
+            cls._listener_cache.clear()
+            time.sleep(5)
+
+    @classmethod
+    def _ensure_subscriber(cls):
+        if cls._subscriber is not None or not cls._presence_enabled():
+            return
+        with cls._subscriber_lock:
+            if cls._subscriber is not None:
+                return
+            cls._subscriber = threading.Thread(
+                target=cls._listen_for_presence,
+                name="listener-presence-subscriber",
+                daemon=True,
+            )
+            cls._subscriber.start()
+
 def get_active_listeners_service(
     table_name: str = "flow_listeners"
 ) -> ActiveListenersService:
@@ -0,0 +1,155 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json, get_codegen_mode
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import discover_node_code
+from polysynergy_node_runner.services.codegen.steps.node_source_index import get_node_source_index
+from polysynergy_node_runner.services.codegen.steps.unify_node_code import prime_unify_cache, unify_node_code
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CodegenJob:
+    json_data: dict
+    id: str
+    templates: dict | None = None
+
+
+@dataclass
+class CodegenResult:
+    id: str
+    code: str | None
+    seconds: float
+    worker: int
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CodegenBatchReport:
+    results: list[CodegenResult] = field(default_factory=list)
+    workers: int = 1
+    # Discovering and unifying the node classes shared by the jobs, done once up front
+    shared_seconds: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[CodegenResult]:
+        return [r for r in self.results if not r.ok]
+
+    def format(self) -> str:
+        lines = [f"{'version':<40} {'worker':>8} {'ms':>10}  status"]
+        for result in sorted(self.results, key=lambda r: r.seconds, reverse=True):
+            status = "ok" if result.ok else f"failed: {result.error}"
+            lines.append(f"{result.id:<40} {result.worker:>8} {result.seconds * 1000:>10.2f}  {status}")
+        lines.append(
+            f"{len(self.results)} jobs, {len(self.failed)} failed, {self.workers} workers: "
+            f"{self.shared_seconds * 1000:.2f}ms shared, {self.seconds * 1000:.2f}ms total"
+        )
+        return "\n".join(lines)
+
+
+def get_codegen_workers() -> int:
+    return int(os.getenv("CODEGEN_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def unify_shared_node_code(jobs: list[CodegenJob]) -> dict:
+    """
+    Discovers and unifies every node class (path and version) used by the
+    jobs once, as the (path, version) -> (code, unified, imports) entries
+    of the unify cache.
+    """
+    entries = {}
+    for job in jobs:
+        for nd in job.json_data.get("nodes", []):
+            if nd.get("type") in ["group", "warp_gate"]:
+                continue
+            key = (nd.get("path"), nd.get("version", 0.0))
+            if not key[0] or key in entries:
+                continue
+            code = discover_node_code(nd)
+            if not code.strip():
+                continue
+            imports = set()
+            try:
+                unified = unify_node_code(code, imports, key[1], key[0])
+            except Exception as e:
+                # The job that uses it reports the failure
+                logger.debug(f"Unifying {key[0]} failed: {e}")
+                continue
+            entries[key] = (code, unified, frozenset(imports))
+    return entries
+
+
+def shared_node_sources(entries: dict) -> dict:
+    """The node source files read for the unified entries, as module path -> NodeSource."""
+    module_paths = {path.rsplit(".", 1)[0] for path, _ in entries}
+    return get_node_source_index().loaded_sources(module_paths)
+
+
+def _init_worker(entries: dict, sources: dict):
+    # Codegen still discovers every node's code (for the cache key and to
+    # match the unify cache); primed sources spare the worker a package scan
+    get_node_source_index().prime(sources)
+    prime_unify_cache(entries)
+
+
+def _run_job(job: CodegenJob, mode: str) -> CodegenResult:
+    started_at = time.perf_counter()
+    try:
+        code = generate_code_from_json(job.json_data, job.id, job.templates, mode=mode)
+        error = None
+    except Exception as e:
+        logger.warning(f"Codegen for {job.id} failed: {e}")
+        code = None
+        error = f"{type(e).__name__}: {e}"
+    return CodegenResult(
+        id=str(job.id),
+        code=code,
+        seconds=time.perf_counter() - started_at,
+        worker=os.getpid(),
+        error=error,
+    )
+
+
+def generate_code_batch(jobs, max_workers: int = None, mode: str = None) -> CodegenBatchReport:
+    """
+    Generates code for many node setups, fanned out over a process pool.
+
+    Args:
+        jobs: CodegenJob instances or (json_data, id[, templates]) tuples
+        max_workers: Size of the pool (default CODEGEN_WORKERS, else the CPU count);
+            1 generates in this process
+        mode: Codegen mode for every job (see generate_code_from_json)
+
+    Returns:
+        A CodegenBatchReport with a result per job, in the order of `jobs`.
+        A failing job is reported in its result and doesn't stop the others.
+        The generated code cache (CODEGEN_CACHE_DIR) is used by every worker.
+    """
+    started_at = time.perf_counter()
+    jobs = [job if isinstance(job, CodegenJob) else CodegenJob(*job) for job in jobs]
+    mode = get_codegen_mode(mode)
+    workers = max(1, min(max_workers or get_codegen_workers(), len(jobs)))
+
+    entries = unify_shared_node_code(jobs)
+    report = CodegenBatchReport(workers=workers, shared_seconds=time.perf_counter() - started_at)
+
+    if workers == 1:
+        report.results = [_run_job(job, mode) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(entries, shared_node_sources(entries))) as executor:
+            # A few chunks per worker: less IPC, still balanced when job sizes differ
+            chunksize = max(1, len(jobs) // (workers * 4))
+            report.results = list(executor.map(_run_job, jobs, [mode] * len(jobs), chunksize=chunksize))
+
+    report.seconds = time.perf_counter() - started_at
+    return report
@@ -39,9 +39,18 @@ def _load_node_class_for_hook(node_path: str):
         return None
 
 
+from polysynergy_node_runner.services.codegen.codegen_cache import CodegenCacheStore, VERSION_ID_MARKER, \
+    codegen_cache_key, get_codegen_cache, version_id_line
+from polysynergy_node_runner.services.codegen.steps.build_environment_tables import build_connection_table, \
+    build_node_table
 from polysynergy_node_runner.services.codegen.steps.build_group_nodes_code import build_group_nodes_code
 from polysynergy_node_runner.services.codegen.steps.build_nodes_code import build_nodes_code, discover_node_code
+from polysynergy_node_runner.services.codegen.steps.build_template_sources import build_template_sources_code
+from polysynergy_node_runner.services.codegen.steps.collect_environment_keys import collect_environment_keys
+from polysynergy_node_runner.services.codegen.steps.collect_secret_keys import collect_secret_keys
 from polysynergy_node_runner.services.codegen.steps.find_groups_with_output import find_groups_with_output
+from polysynergy_node_runner.services.codegen.steps.precompile_templates import build_precompiled_templates_code, \
+    collect_template_sources, is_template_precompilation_requested
 from polysynergy_node_runner.services.codegen.steps.rewrite_connections_for_groups import rewrite_connections_for_groups
 from polysynergy_node_runner.services.codegen.steps.unify_node_code import unify_node_code
 
@@ -66,17 +75,38 @@ from polysynergy_node_runner.services.active_listeners_service import get_active
     ActiveListenersService
 from polysynergy_node_runner.services.env_var_manager import get_env_var_manager
 from polysynergy_node_runner.services.execution_storage_service import DynamoDbExecutionStorageService, get_execution_storage_service
-from polysynergy_node_runner.execution_context.send_flow_event import send_flow_event
+from polysynergy_node_runner.execution_context.send_flow_event import send_flow_event, flush_flow_events
 from polysynergy_node_runner.services.secrets_manager import get_secrets_manager
 from polysynergy_node_runner.execution_context.replace_placeholders import set_project_templates
+from polysynergy_node_runner.utils.profiling import SamplingProfiler, is_profiling_requested, profiled, save_profile
+from polysynergy_node_runner.utils.run_logging import configure_run_logging, bind_run_context
+from polysynergy_node_runner.utils.tracing import KIND_SERVER, get_tracer, parse_traceparent, flush_traces
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Runtime records go through the package logger: level gated by
+# NODE_RUNNER_LOG_LEVEL and tagged with the run's correlation fields
+configure_run_logging()
+run_logger = logging.getLogger("polysynergy_node_runner.runtime")
+
 storage: DynamoDbExecutionStorageService = get_execution_storage_service()
 active_listeners_service: ActiveListenersService = get_active_listeners_service()
 """
 
+# Codegen modes: generated statements per node and connection, or data tables
+# that environment_builder turns into the same environment at runtime
+CODEGEN_MODE_CODE = "code"
+CODEGEN_MODE_TABLE = "table"
+CODEGEN_MODES = (CODEGEN_MODE_CODE, CODEGEN_MODE_TABLE)
+
+ENVIRONMENT_BUILDER_IMPORT = \
+    "from polysynergy_node_runner.execution_context.environment_builder import build_connections, register_nodes"
+
+TABLE_ENVIRONMENT = """        connections = build_connections(CONNECTION_TABLE, mock, connection_context)
+        state.connections = connections
+        register_nodes(NODE_TABLE, globals(), connections, node_context, mock=mock, trigger_node_id=trigger_node_id)"""
+
 CONNECTIONS = """
 connections = []
 """
@@ -88,7 +118,14 @@ flow = Flow(connections, state, execution_flow)
 """
 
 
-def generate_code_from_json(json_data, id, templates: dict = None):
+def get_codegen_mode(mode: str = None) -> str:
+    mode = mode or os.getenv("CODEGEN_MODE", CODEGEN_MODE_CODE)
+    if mode not in CODEGEN_MODES:
+        raise ValueError(f"Unknown codegen mode '{mode}', expected one of {', '.join(CODEGEN_MODES)}")
+    return mode
+
+
+def generate_code_from_json(json_data, id, templates: dict = None, cache: CodegenCacheStore = None, mode: str = None):
     """
     Generate executable Python code from node setup JSON.
 
@@ -96,8 +133,50 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         json_data: The node setup JSON containing nodes and connections
         id: The version ID for this node setup
         templates: Optional dict of project templates {name: content} for Jinja extends
+        cache: Optional store for generated code, keyed by content hash
+            (defaults to a directory cache when CODEGEN_CACHE_DIR is set)
+        mode: "code" generates statements per node and connection, "table"
+            emits them as data tables built by environment_builder at runtime
+            (defaults to CODEGEN_MODE, else "code")
     """
-    json_data = copy.deepcopy(json_data)
+    mode = get_codegen_mode(mode)
+    if cache is None:
+        cache = get_codegen_cache()
+    if cache is None:
+        return _generate_code_from_json(json_data, id, templates, mode)
+
+    key = codegen_cache_key(json_data, templates, discover_node_code, _load_node_class_for_hook, mode,
+                            is_template_precompilation_requested())
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"[CODEGEN] Version ID: {id} (cached {key[:12]})")
+        return cached.replace(VERSION_ID_MARKER, version_id_line(id), 1)
+
+    code = _generate_code_from_json(json_data, id, templates, mode)
+    try:
+        cache.set(key, code.replace(version_id_line(id), VERSION_ID_MARKER, 1))
+    except Exception as e:
+        logger.warning(f"Storing generated code in the cache failed: {e}")
+    return code
+
+
+def _has_codegen_hooks(nodes_data: list) -> bool:
+    paths = {nd.get("path") for nd in nodes_data if nd.get("type") not in ["group", "warp_gate"]}
+    return any(hasattr(_load_node_class_for_hook(path), "before_codegen") for path in paths)
+
+
+def _generate_code_from_json(json_data, id, templates: dict = None, mode: str = CODEGEN_MODE_CODE, fragments=None):
+    if fragments is None or _has_codegen_hooks(json_data.get("nodes", [])):
+        # before_codegen hooks may edit any node's nested data in place
+        json_data = copy.deepcopy(json_data)
+    else:
+        # The group rewrite only replaces top level keys, and the fragments
+        # keep their own snapshots
+        json_data = {
+            **json_data,
+            "nodes": [dict(nd) for nd in json_data.get("nodes", [])],
+            "connections": [dict(c) for c in json_data.get("connections", [])],
+        }
     nodes_data = json_data.get("nodes", [])
     conns_data = json_data.get("connections", [])
 
@@ -120,20 +199,27 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         path = nd["path"]
         version = nd.get("version", 0.0)
         version_key = f"{path}-v{str(version).replace('.', '_')}"
-        
+        if version_key in path_version_map:
+            continue
+
         # Always discover code from path, ignore the code field entirely
         code = discover_node_code(nd)
         
-        if code.strip() and version_key not in path_version_map:
-            cleaned = unify_node_code(code, collected_imports, version)
+        if code.strip():
+            cleaned = unify_node_code(code, collected_imports, version, path)
             path_version_map[version_key] = cleaned
 
     # Run before_codegen hooks for each node
+    hook_classes = {}
+    hooked_node_ids = set()
     for nd in nodes_data:
         if nd.get("type") in ["group", "warp_gate"]:
             continue
-        node_class = _load_node_class_for_hook(nd.get('path'))
+        if nd.get('path') not in hook_classes:
+            hook_classes[nd.get('path')] = _load_node_class_for_hook(nd.get('path'))
+        node_class = hook_classes[nd.get('path')]
         if node_class and hasattr(node_class, 'before_codegen'):
+            hooked_node_ids.add(nd.get('id'))
             try:
                 result = node_class.before_codegen(nd, nodes_data, conns_data)
                 if result and isinstance(result, dict):
@@ -157,7 +243,14 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         # Add the full header with shebang
         code_parts.append(HEADER)
 
-    code_parts.append(f"NODE_SETUP_VERSION_ID = \"{str(id)}\"")
+    if mode == CODEGEN_MODE_TABLE:
+        code_parts.append(ENVIRONMENT_BUILDER_IMPORT)
+
+    code_parts.append(version_id_line(id))
+
+    # Secrets and environment variables referenced in the setup, prefetched once per run
+    code_parts.append(f"SECRET_KEYS = {repr(collect_secret_keys(nodes_data))}")
+    code_parts.append(f"ENVIRONMENT_KEYS = {repr(collect_environment_keys(nodes_data))}")
 
     # Add project templates for Jinja extends support
     if templates:
@@ -165,6 +258,11 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         templates_repr = repr(templates)
         code_parts.append(f"\n# Project base templates for Jinja extends\nset_project_templates({templates_repr})\n")
 
+    if is_template_precompilation_requested():
+        precompiled = build_precompiled_templates_code(templates, collect_template_sources(nodes_data))
+        if precompiled:
+            code_parts.append(precompiled)
+
     # Add remaining imports
     if other_imports:
         code_parts.append("\n".join(sorted(other_imports)))
@@ -173,11 +271,23 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         if ctext.strip():
             code_parts.append(ctext)
 
-    code_parts.append(build_group_nodes_code(conns_data, groups_with_output))
+    if fragments is not None:
+        fragments.start(hooked_node_ids)
+
+    code_parts.append(build_group_nodes_code(conns_data, groups_with_output, fragments))
 
     rewrite_connections_for_groups(conns_data)
 
-    code_parts.append("""\ndef create_execution_environment(mock = False, run_id:str = \"\", stage:str=None, sub_stage:str=None, trigger_node_id:str=None):
+    if mode == CODEGEN_MODE_TABLE:
+        code_parts.append(build_connection_table(conns_data, nodes_data, groups_with_output, fragments))
+        code_parts.append(build_node_table(nodes_data, groups_with_output, fragments))
+
+    # Where the handles static templates reference come from, see replace_placeholders
+    template_sources_code = build_template_sources_code(nodes_data, conns_data, groups_with_output)
+    if template_sources_code:
+        code_parts.append(template_sources_code)
+
+    code_parts.append("""\ndef create_execution_environment(mock = False, run_id:str = \"\", stage:str=None, sub_stage:str=None, trigger_node_id:str=None, has_listener:bool=None):
         storage.clear_previous_execution(NODE_SETUP_VERSION_ID, current_run_id=run_id)
 
         execution_flow = { "run_id": run_id, "nodes_order": [], "connections": [], "execution_data": []}
@@ -199,6 +309,9 @@ def generate_code_from_json(json_data, id, templates: dict = None):
             execution_flow=execution_flow,
             trigger_node_id=trigger_node_id
         )
+        node_context.prefetch_secrets(SECRET_KEYS)
+        node_context.prefetch_environment_variables(ENVIRONMENT_KEYS)
+        node_context.resolve_listener(has_listener)
 
         connection_context = ConnectionContext(
             state=state
@@ -206,11 +319,16 @@ def generate_code_from_json(json_data, id, templates: dict = None):
 
         connections = []
         """)
-    code_parts.append(build_connections_code(conns_data, nodes_data, groups_with_output))
-    code_parts.append("        state.connections = connections")
-    code_parts.append(build_nodes_code(nodes_data, groups_with_output))
+    if mode == CODEGEN_MODE_TABLE:
+        code_parts.append(TABLE_ENVIRONMENT)
+    else:
+        code_parts.append(build_connections_code(conns_data, nodes_data, groups_with_output, fragments))
+        code_parts.append("        state.connections = connections")
+        code_parts.append(build_nodes_code(nodes_data, groups_with_output, fragments))
+    if template_sources_code:
+        code_parts.append("        state.template_sources = MOCK_TEMPLATE_SOURCES if mock else TEMPLATE_SOURCES")
     code_parts.append("        return flow, execution_flow, state")
-    code_parts.append("""\nasync def execute_with_mock_start_node(node_id:str, run_id:str, sub_stage:str, input_data:dict=None):
+    code_parts.append("""\nasync def execute_with_mock_start_node(node_id:str, run_id:str, sub_stage:str, input_data:dict=None, has_listener:bool=None):
 
     node_id = str(node_id)
 
@@ -219,7 +337,8 @@ def generate_code_from_json(json_data, id, templates: dict = None):
         run_id=run_id,
         stage="mock",
         sub_stage=sub_stage,
-        trigger_node_id=node_id
+        trigger_node_id=node_id,
+        has_listener=has_listener
     )
 
     # Apply input_data to nodes if provided (e.g., chat message)
@@ -245,32 +364,31 @@ def generate_code_from_json(json_data, id, templates: dict = None):
 
     # If we have input_data with a message (e.g., embedded chat), inject it into the Prompt node
     if input_data and input_data.get('message'):
-        print(f"[EXECUTE] Looking for Prompt node to inject message: {input_data['message'][:50]}...")
-        print(f"[EXECUTE] Available nodes: {[(n.id, n.path) for n in state.nodes]}")
+        run_logger.debug("[EXECUTE] Looking for Prompt node to inject message: %.50s...", input_data['message'])
         prompt_found = False
         target_prompt_id = input_data.get('prompt_node_id')
 
         if target_prompt_id:
             # Target a specific prompt node by ID
-            print(f"[EXECUTE] Targeting specific prompt node: {target_prompt_id}")
+            run_logger.debug("[EXECUTE] Targeting specific prompt node: %s", target_prompt_id)
             target_node = state.get_node_by_id(target_prompt_id)
             if target_node and target_node.path == 'polysynergy_nodes.play.prompt.Prompt':
                 target_node.prompt = input_data['message']
-                print(f"[EXECUTE] Injected prompt into specific Prompt node {target_node.id}")
+                run_logger.debug("[EXECUTE] Injected prompt into specific Prompt node %s", target_node.id)
                 if input_data.get('session_id'):
                     target_node.active_session = input_data['session_id']
                 if input_data.get('user_id'):
                     target_node.active_user = input_data['user_id']
                 prompt_found = True
             else:
-                print(f"[EXECUTE] WARNING: Target prompt node {target_prompt_id} not found or not a Prompt node!")
+                run_logger.warning("[EXECUTE] Target prompt node %s not found or not a Prompt node!", target_prompt_id)
 
         # Fallback: find first Prompt node if no specific target or target not found
         if not prompt_found:
             for n in state.nodes:
                 if n.path == 'polysynergy_nodes.play.prompt.Prompt':
                     n.prompt = input_data['message']
-                    print(f"[EXECUTE] Injected prompt into Prompt node {n.id}")
+                    run_logger.debug("[EXECUTE] Injected prompt into Prompt node %s", n.id)
                     if input_data.get('session_id'):
                         n.active_session = input_data['session_id']
                     if input_data.get('user_id'):
@@ -278,9 +396,13 @@ def generate_code_from_json(json_data, id, templates: dict = None):
                     prompt_found = True
                     break
         if not prompt_found:
-            print(f"[EXECUTE] WARNING: No Prompt node found in workflow!")
+            run_logger.warning("[EXECUTE] No Prompt node found in workflow!")
 
-    await flow.execute_node(node)
+    node.context.start_listener_refresh()
+    try:
+        await flow.execute_node(node)
+    finally:
+        node.context.stop_listener_refresh()
     storage.store_connections_result(
         flow_id=NODE_SETUP_VERSION_ID,
         run_id=run_id,
@@ -290,8 +412,8 @@ def generate_code_from_json(json_data, id, templates: dict = None):
     return execution_flow
 
 
-async def execute_with_production_start(event=None, run_id:str=None, stage:str=None):
-    flow, execution_flow, state = create_execution_environment(run_id=run_id, stage=stage)
+async def execute_with_production_start(event=None, run_id:str=None, stage:str=None, has_listener:bool=None):
+    flow, execution_flow, state = create_execution_environment(run_id=run_id, stage=stage, has_listener=has_listener)
 
     entry_nodes = [n for n in state.nodes if n.path in ['polysynergy_nodes.route.route.Route', 'polysynergy_nodes.schedule.schedule.Schedule']]
 
@@ -312,7 +434,11 @@ async def execute_with_production_start(event=None, run_id:str=None, stage:str=N
                 node.cookies = event.get("cookies", {})
                 node.route_variables = event.get("pathParameters", {})
 
-    await flow.execute_node(entry_node)
+    entry_node.context.start_listener_refresh()
+    try:
+        await flow.execute_node(entry_node)
+    finally:
+        entry_node.context.stop_listener_refresh()
 
     storage.store_connections_result(
         flow_id=NODE_SETUP_VERSION_ID,
@@ -335,10 +461,10 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
     Returns:
         execution_flow dict with execution results
     \"\"\"
-    print(f"[RESUME] Starting resume for run_id={run_id}, node={resume_node_id}")
+    run_logger.info("[RESUME] Starting resume for run_id=%s, node=%s", run_id, resume_node_id)
 
     # Check if there's a listener and send resume_start event
-    has_listener = active_listeners_service.has_listener(NODE_SETUP_VERSION_ID)
+    has_listener = active_listeners_service.has_listener(NODE_SETUP_VERSION_ID, first_run=True)
     if has_listener:
         send_flow_event(
             NODE_SETUP_VERSION_ID,
@@ -346,11 +472,11 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
             None,
             'resume_start'
         )
-        print(f"[RESUME] Sent resume_start event")
+        run_logger.debug("[RESUME] Sent resume_start event")
 
     # Get all previous node states from DynamoDB
     nodes_state = storage.get_all_nodes_for_run(NODE_SETUP_VERSION_ID, run_id)
-    print(f"[RESUME] Found {len(nodes_state)} nodes with saved state")
+    run_logger.debug("[RESUME] Found %d nodes with saved state", len(nodes_state))
 
     if not nodes_state:
         raise ValueError(f"No saved state found for run_id {run_id}")
@@ -360,7 +486,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
     if resume_node_state:
         existing_user_response = resume_node_state['data'].get('variables', {}).get('user_response')
         if existing_user_response:
-            print(f"[RESUME] Flow already resumed - user_response already set to: {existing_user_response}")
+            run_logger.warning("[RESUME] Flow already resumed - user_response already set to: %s", existing_user_response)
             raise ValueError(f"Flow {run_id} was already resumed. Cannot resume twice.")
 
     # Get stage/sub_stage from first node to preserve execution context
@@ -377,10 +503,11 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
         run_id=run_id,
         stage=original_stage,
         sub_stage=original_sub_stage,
-        trigger_node_id=resume_node_id
+        trigger_node_id=resume_node_id,
+        has_listener=has_listener
     )
 
-    print(f"[RESUME] Created execution environment with {len(state.nodes)} fresh nodes")
+    run_logger.debug("[RESUME] Created execution environment with %d fresh nodes", len(state.nodes))
 
     # Reconstruct the execution_flow.nodes_order from previous execution
     # This ensures the UI shows the complete execution history
@@ -405,7 +532,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
 
     # Find the highest order number to continue from
     max_order = max((ns['order'] for ns in nodes_state), default=-1)
-    print(f"[RESUME] Reconstructed {len(execution_flow['nodes_order'])} nodes in execution_flow, max_order={max_order}")
+    run_logger.debug("[RESUME] Reconstructed %d nodes in execution_flow, max_order=%s", len(execution_flow['nodes_order']), max_order)
 
     # Map all saved state back onto the nodes
     for node_state in nodes_state:
@@ -413,7 +540,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
         node = state.get_node_by_id(node_id)
 
         if not node:
-            print(f"[RESUME] Warning: Node {node_id} not found in state, skipping")
+            run_logger.warning("[RESUME] Node %s not found in state, skipping", node_id)
             continue
 
         # Restore all variables from saved state
@@ -423,19 +550,19 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
                 try:
                     setattr(node, var_name, var_value)
                 except Exception as e:
-                    print(f"[RESUME] Warning: Could not set {var_name} on {node_id}: {e}")
+                    run_logger.warning("[RESUME] Could not set %s on %s: %s", var_name, node_id, e)
 
         # Mark node as processed if it was completed
         if node_state['data'].get('processed'):
             node._processed = True
-            print(f"[RESUME] Marked {node.handle} as processed")
+            run_logger.debug("[RESUME] Marked %s as processed", node.handle)
 
     # Apply user input to the resume node
     resume_node = state.get_node_by_id(resume_node_id)
     if not resume_node:
         raise ValueError(f"Resume node {resume_node_id} not found")
 
-    print(f"[RESUME] Applying user input to {resume_node.handle}: {user_input}")
+    run_logger.debug("[RESUME] Applying user input to %s: %s", resume_node.handle, user_input)
 
     # Handle both dict and bool user_input
     if isinstance(user_input, dict):
@@ -447,7 +574,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
         # Boolean: set user_input_data directly (for AgnoAgent HITL confirmation)
         if hasattr(resume_node, 'user_input_data'):
             setattr(resume_node, 'user_input_data', user_input)
-            print(f"[RESUME] Set user_input_data={user_input} for HITL confirmation")
+            run_logger.debug("[RESUME] Set user_input_data=%s for HITL confirmation", user_input)
     else:
         # Fallback: try to set as user_response for old HITL nodes
         if hasattr(resume_node, 'user_response'):
@@ -459,17 +586,21 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
     # Restore connection state
     stored_connections = storage.get_connections_result(NODE_SETUP_VERSION_ID, run_id)
     if stored_connections:
-        print(f"[RESUME] Restoring {len(stored_connections)} connection states")
+        run_logger.debug("[RESUME] Restoring %d connection states", len(stored_connections))
         for conn_data in stored_connections:
             # Find connection by UUID
             conn = next((c for c in state.connections if c.uuid == conn_data.get('uuid')), None)
             if conn and conn_data.get('is_killer'):
                 conn.make_killer()
 
-    print(f"[RESUME] Starting execution from {resume_node.handle}")
+    run_logger.debug("[RESUME] Starting execution from %s", resume_node.handle)
 
     # Execute from the resume node
-    await flow.execute_node(resume_node)
+    resume_node.context.start_listener_refresh()
+    try:
+        await flow.execute_node(resume_node)
+    finally:
+        resume_node.context.stop_listener_refresh()
 
     # Store updated connections
     storage.store_connections_result(
@@ -478,7 +609,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
         connections=[c.to_dict() for c in state.connections],
     )
 
-    print(f"[RESUME] Resume complete, executed {len(execution_flow.get('nodes_order', []))} new nodes")
+    run_logger.info("[RESUME] Resume complete, executed %d new nodes", len(execution_flow.get('nodes_order', [])))
 
     # Send resume_end event
     if has_listener:
@@ -488,7 +619,7 @@ async def execute_with_resume(run_id: str, resume_node_id: str, user_input):
             None,
             'resume_end'
         )
-        print(f"[RESUME] Sent resume_end event")
+        run_logger.debug("[RESUME] Sent resume_end event")
 
     return execution_flow
 """)
@@ -517,6 +648,22 @@ def lambda_handler(event, context):
     if not run_id:
         run_id = str(uuid.uuid4())
 
+    bind_run_context(
+        run_id=run_id,
+        flow_id=NODE_SETUP_VERSION_ID,
+        request_id=getattr(context, "aws_request_id", None),
+    )
+
+    # Root of the run's trace; continues the caller's trace when it sent a traceparent
+    run_span = get_tracer().start_span(
+        "run",
+        kind=KIND_SERVER,
+        attributes={"flow.id": NODE_SETUP_VERSION_ID, "run.id": run_id, "run.stage": stage},
+        parent=parse_traceparent((event.get("headers") or {}).get("traceparent")),
+    ).activate()
+
+    # Sampling profiler for this run, on request ("profile": true) or NODE_RUNNER_PROFILE
+    profiler = SamplingProfiler() if is_profiling_requested(event) else None
 
     try:
         # Check if this is a resume request for Human-in-the-Loop
@@ -537,12 +684,12 @@ def lambda_handler(event, context):
                     "body": json.dumps({"error": "run_id is required for resume requests"})
                 }
 
-            print(f"[HIL] Resuming flow: run_id={run_id}, node={resume_node_id}")
+            run_logger.info("[HIL] Resuming flow: run_id=%s, node=%s", run_id, resume_node_id)
 
             # Execute the resume
-            execution_flow = asyncio.run(execute_with_resume(run_id, resume_node_id, user_input))
+            execution_flow = asyncio.run(profiled(execute_with_resume(run_id, resume_node_id, user_input), profiler))
 
-            print(f"[HIL] Resume completed successfully")
+            run_logger.info("[HIL] Resume completed successfully")
 
             return {
                 "statusCode": 200,
@@ -557,9 +704,9 @@ def lambda_handler(event, context):
         # in that case, it should start with the node_id that is provided.
         is_ui_mock = stage == "mock" and node_id is not None
         if is_ui_mock:
-            print("Running in mock mode with node_id:", node_id)
+            run_logger.debug("Running in mock mode with node_id: %s", node_id)
             has_listener = active_listeners_service.has_listener(NODE_SETUP_VERSION_ID, first_run=True)
-            print("Has listener:", has_listener, NODE_SETUP_VERSION_ID)
+            run_logger.debug("Has listener: %s %s", has_listener, NODE_SETUP_VERSION_ID)
             if has_listener:
                 send_flow_event(
                     NODE_SETUP_VERSION_ID,
@@ -567,7 +714,7 @@ def lambda_handler(event, context):
                     None,
                     'run_start'
                 )
-            execution_flow = asyncio.run(execute_with_mock_start_node(node_id, run_id, sub_stage, input_data))
+            execution_flow = asyncio.run(profiled(execute_with_mock_start_node(node_id, run_id, sub_stage, input_data, has_listener), profiler))
             if has_listener:
                 send_flow_event(
                     NODE_SETUP_VERSION_ID,
@@ -591,8 +738,11 @@ def lambda_handler(event, context):
                 is_test_run = True
 
             has_listener = False
+            # Resolved once per run: test runs here, for the Context; other runs by the Context itself
+            listener = None
             if is_test_run:
                 has_listener = active_listeners_service.has_listener(NODE_SETUP_VERSION_ID, first_run=True)
+                listener = has_listener
 
                 if has_listener:
                     send_flow_event(
@@ -609,22 +759,24 @@ def lambda_handler(event, context):
                 asyncio.get_running_loop()
                 # If we get here, we're in a running loop, run in a separate thread
                 import concurrent.futures
+                import contextvars
 
                 def run_production_async():
                     loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(loop)
                     try:
-                        return loop.run_until_complete(execute_with_production_start(event, run_id, stage))
+                        return loop.run_until_complete(profiled(execute_with_production_start(event, run_id, stage, listener), profiler))
                     finally:
                         loop.close()
 
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_production_async)
+                    # Carry the run's log correlation fields into the worker thread
+                    future = executor.submit(contextvars.copy_context().run, run_production_async)
                     execution_flow, flow, state, is_schedule = future.result()
             except RuntimeError:
                 # No running loop, we can use asyncio.run
-                execution_flow, flow, state, is_schedule = asyncio.run(execute_with_production_start(event, run_id, stage))
-            print('request_id: ', context.aws_request_id)
+                execution_flow, flow, state, is_schedule = asyncio.run(profiled(execute_with_production_start(event, run_id, stage, listener), profiler))
+            run_logger.debug("request_id: %s", context.aws_request_id)
 
             last_http_response = next(
                 (node for node in reversed(execution_flow.get("nodes_order", [])) 
@@ -636,13 +788,9 @@ def lambda_handler(event, context):
                 variables = last_http_response.get("variables", {})
                 http_response_node = state.get_node_by_id(last_http_response.get("id", ""))
 
-                print("DEBUG: http_response_node:", http_response_node)
-                print("DEBUG: http_response_node.response:", http_response_node.response)
-                print("DEBUG: type(http_response_node.response):", type(http_response_node.response))
-                
                 # More defensive response construction
                 node_response = http_response_node.response
-                print("DEBUG: node_response assigned:", node_response, "type:", type(node_response))
+                run_logger.debug("http_response_node: %s, response: %r", http_response_node, node_response)
                 
                 if isinstance(node_response, dict):
                     # Handle both 'status' and 'statusCode' keys for compatibility
@@ -650,24 +798,18 @@ def lambda_handler(event, context):
                     headers_part = node_response.get('headers', {})
                     body_part = node_response.get('body', '')
                 else:
-                    print("ERROR: node_response is not a dict, using fallback values")
+                    run_logger.error("node_response is not a dict, using fallback values")
                     status_part = 200
                     headers_part = {"Content-Type": "application/json"}
                     body_part = str(node_response) if node_response is not None else ""
                 
-                print("DEBUG: status_part:", status_part, "type:", type(status_part))
-                print("DEBUG: headers_part:", headers_part, "type:", type(headers_part))
-                print("DEBUG: body_part:", body_part, "type:", type(body_part))
-                
                 final_lambda_response = {
                     "statusCode": status_part,
                     "headers": headers_part,
                     "body": body_part
                 }
                 
-                print("DEBUG: constructed final_lambda_response:", final_lambda_response)
-                print("DEBUG: type(final_lambda_response):", type(final_lambda_response))
-                print("FINAL RESPONSE", last_http_response, variables, final_lambda_response)
+                run_logger.debug("FINAL RESPONSE %s %s %r", last_http_response, variables, final_lambda_response)
 
                 if is_test_run and has_listener:
                     send_flow_event(
@@ -677,11 +819,9 @@ def lambda_handler(event, context):
                         'run_end'
                     )
 
-                print("DEBUG: About to return final_lambda_response:", final_lambda_response, "type:", type(final_lambda_response))
-                
                 # Safety check to ensure we always return a proper dict
                 if not isinstance(final_lambda_response, dict):
-                    print("SAFETY: final_lambda_response is not a dict, creating fallback response")
+                    run_logger.error("final_lambda_response is not a dict, creating fallback response")
                     final_lambda_response = {
                         "statusCode": 500,
                         "headers": {"Content-Type": "application/json"},
@@ -695,12 +835,9 @@ def lambda_handler(event, context):
                     final_lambda_response["headers"] = {}
                 if "body" not in final_lambda_response:
                     final_lambda_response["body"] = ""
-                    
-                print("DEBUG: FINAL SAFETY CHECK - returning:", final_lambda_response, "type:", type(final_lambda_response))
-                
+
                 # Absolutely explicit return to avoid any scoping issues
                 lambda_response_to_return = dict(final_lambda_response)  # Create a copy
-                print("DEBUG: EXPLICITLY RETURNING:", lambda_response_to_return)
                 return lambda_response_to_return
 
             if is_test_run and has_listener:
@@ -714,7 +851,7 @@ def lambda_handler(event, context):
             # Handle missing HttpResponse based on execution type
             if is_schedule:
                 # Schedules don't need HttpResponse nodes - return success
-                logger.info("Schedule execution completed successfully - no HttpResponse node required")
+                run_logger.info("Schedule execution completed successfully - no HttpResponse node required")
                 return {
                     "statusCode": 200,
                     "body": json.dumps({
@@ -725,7 +862,7 @@ def lambda_handler(event, context):
                 }
             else:
                 # Routes require HttpResponse nodes
-                logger.error("Error: No valid HttpResponse node found. Make sure the flow leads to a response. 500 Response given.")
+                run_logger.error("Error: No valid HttpResponse node found. Make sure the flow leads to a response. 500 Response given.")
                 return {
                     "statusCode": 500,
                     "body": json.dumps({
@@ -735,15 +872,28 @@ def lambda_handler(event, context):
                 }
 
     except ValueError as e:
+        run_span.record_exception(e)
         return {
             "statusCode": 404,
             "body": json.dumps({"error": str(e)})
         }
     except Exception as e:
+        run_span.record_exception(e)
         return {
             "statusCode": 500,
             "body": json.dumps({"error": str(e)})
         }
+    finally:
+        if profiler is not None:
+            save_profile(profiler, storage, NODE_SETUP_VERSION_ID, run_id)
+        # Queued flow events and spans must be out before the container is frozen
+        flush_flow_events()
+        run_span.end()
+        flush_traces()
 """)
 
+    if fragments is not None:
+        fragments.finish()
+        print(f"[CODEGEN] Incremental: reused {fragments.reused} of {fragments.reused + fragments.built} fragments")
+
     return "\n\n".join(code_parts)
@@ -0,0 +1,121 @@
+import importlib.util
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# PEP 552 flags: the .pyc is validated by the hash of its source instead of
+# the source's mtime, which doesn't survive packaging into an image or zip
+FLAG_HASH_BASED = 0b01
+FLAG_CHECK_SOURCE = 0b10
+
+HEADER_SIZE = 16
+
+
+def is_bytecode_requested() -> bool:
+    return os.getenv("CODEGEN_BYTECODE", "false").lower() in ("true", "1", "yes")
+
+
+def compile_generated_code(code: str, filename: str = "<generated>") -> bytes:
+    """
+    Compiles generated source into the contents of a hash-based .pyc for the
+    running interpreter. `filename` ends up in tracebacks, so pass the path
+    the source will be deployed at.
+    """
+    source = code.encode("utf-8")
+    code_object = compile(source, filename, "exec", dont_inherit=True)
+    return (
+        importlib.util.MAGIC_NUMBER
+        + (FLAG_HASH_BASED | FLAG_CHECK_SOURCE).to_bytes(4, "little")
+        + importlib.util.source_hash(source)
+        + marshal.dumps(code_object)
+    )
+
+
+def load_bytecode(data: bytes, source: bytes | None = None) -> types.CodeType | None:
+    """
+    The code object in .pyc `data`, or None when it was written by another
+    Python version or does not belong to `source` (when given).
+    """
+    if len(data) < HEADER_SIZE or data[:4] != importlib.util.MAGIC_NUMBER:
+        return None
+    flags = int.from_bytes(data[4:8], "little")
+    if not flags & FLAG_HASH_BASED:
+        return None
+    if source is not None and flags & FLAG_CHECK_SOURCE and data[8:16] != importlib.util.source_hash(source):
+        return None
+    try:
+        code_object = marshal.loads(data[HEADER_SIZE:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return code_object if isinstance(code_object, types.CodeType) else None
+
+
+def bytecode_path(source_path: str | Path) -> Path:
+    """Where the import system looks for the .pyc of `source_path` (`__pycache__/<name>.<tag>.pyc`)."""
+    return Path(importlib.util.cache_from_source(str(source_path)))
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_generated_module(code: str, directory: str | Path, module_name: str = "main",
+                           bytecode: bool | None = None) -> Path:
+    """
+    Writes generated code as `<directory>/<module_name>.py` and, when
+    `bytecode` is on (default: CODEGEN_BYTECODE), its .pyc next to it in
+    `__pycache__`. A plain `import` of the module then skips compilation; so
+    does load_generated_module. The .pyc only applies to the Python version
+    that wrote it, others compile the source as before.
+    """
+    if bytecode is None:
+        bytecode = is_bytecode_requested()
+
+    source_path = Path(directory) / f"{module_name}.py"
+    _write_atomic(source_path, code.encode("utf-8"))
+    if bytecode:
+        _write_atomic(bytecode_path(source_path), compile_generated_code(code, str(source_path)))
+    return source_path
+
+
+def load_generated_module(source_path: str | Path, module_name: str = None) -> types.ModuleType:
+    """
+    Executes a generated module from its source file, using its .pyc when it
+    is valid for this interpreter and this source, and compiling otherwise.
+    """
+    source_path = Path(source_path)
+    source = source_path.read_bytes()
+
+    code_object = None
+    try:
+        code_object = load_bytecode(bytecode_path(source_path).read_bytes(), source)
+        if code_object is None:
+            logger.info(f"Bytecode for {source_path} is stale or from another Python version, compiling source")
+    except OSError:
+        pass
+    if code_object is None:
+        code_object = compile(source, str(source_path), "exec", dont_inherit=True)
+
+    module = types.ModuleType(module_name or source_path.stem)
+    module.__file__ = str(source_path)
+    sys.modules[module.__name__] = module
+    try:
+        exec(code_object, module.__dict__)
+    except BaseException:
+        sys.modules.pop(module.__name__, None)
+        raise
+    return module
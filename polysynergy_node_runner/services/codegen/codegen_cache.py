@@ -0,0 +1,134 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from inspect import getsourcefile
+from pathlib import Path
+
+import jinja2
+
+from polysynergy_node_runner.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Generated code is cached without its version id, so identical setups share
+# one entry across versions and projects; the id is put back on a hit
+VERSION_ID_MARKER = 'NODE_SETUP_VERSION_ID = "__NODE_SETUP_VERSION_ID__"'
+
+
+def version_id_line(id) -> str:
+    return f"NODE_SETUP_VERSION_ID = \"{str(id)}\""
+
+
+class CodegenCacheStore:
+    """Where generated code is kept, by cache key. Subclass for other backends."""
+
+    def get(self, key: str) -> str | None:
+        raise NotImplementedError()
+
+    def set(self, key: str, code: str):
+        raise NotImplementedError()
+
+
+class InMemoryCodegenCache(CodegenCacheStore):
+    def __init__(self, maxsize: int = 256):
+        self._cache = TTLCache(ttl=float("inf"), maxsize=maxsize)
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, code: str):
+        self._cache.set(key, code)
+
+
+class FileSystemCodegenCache(CodegenCacheStore):
+    """One file per key, written atomically, so processes can share a directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.py"
+
+    def get(self, key: str) -> str | None:
+        try:
+            return self._path(key).read_text()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, code: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(code)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def get_codegen_cache() -> CodegenCacheStore | None:
+    directory = os.getenv("CODEGEN_CACHE_DIR")
+    if directory:
+        return FileSystemCodegenCache(directory)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def codegen_fingerprint() -> str:
+    """Hash of the code generator's own source, so upgrading the runner invalidates the cache."""
+    digest = hashlib.sha256()
+    root = Path(__file__).parent
+    for path in sorted(root.rglob("*.py")):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def codegen_cache_key(json_data: dict, templates: dict = None, discover_code=None, load_hook_class=None,
+                      mode: str = "code", precompile_templates: bool = False) -> str:
+    """
+    Content hash of everything the generated code depends on: the setup
+    (normalised, with every node's code replaced by the hash of the code
+    that will actually be used), the project templates, the source of node
+    classes with a before_codegen hook, the codegen mode, the Jinja version
+    templates are precompiled with and the code generator itself.
+    """
+    nodes = []
+    hook_sources = {}
+    for nd in json_data.get("nodes", []):
+        if nd.get("type") in ["group", "warp_gate"]:
+            nodes.append(nd)
+            continue
+
+        code = discover_code(nd) if discover_code else nd.get("code", "")
+        nodes.append({**nd, "code": _hash_text(code)})
+
+        path = nd.get("path")
+        if load_hook_class and path and path not in hook_sources:
+            node_class = load_hook_class(path)
+            hook_sources[path] = None
+            if node_class is not None and hasattr(node_class, "before_codegen"):
+                try:
+                    hook_sources[path] = _hash_text(Path(getsourcefile(node_class)).read_text())
+                except (TypeError, OSError):
+                    # No source to hash; fall back to the class identity
+                    hook_sources[path] = f"{node_class.__module__}.{node_class.__qualname__}"
+
+    normalised = {
+        "setup": {**json_data, "nodes": nodes},
+        "templates": templates or {},
+        "hooks": hook_sources,
+        "mode": mode,
+        "jinja": jinja2.__version__ if precompile_templates else None,
+        "codegen": codegen_fingerprint(),
+    }
+    return _hash_text(json.dumps(normalised, sort_keys=True, separators=(",", ":"), default=str))
@@ -0,0 +1,79 @@
+import copy
+
+from polysynergy_node_runner.services.codegen.build_executable import _generate_code_from_json, get_codegen_mode
+
+
+class CodegenFragments:
+    """
+    The code emitted per node, connection and group class by the previous
+    generation, with the data it was emitted from. A fragment is reused when
+    its data is unchanged and rebuilt otherwise; fragments that are not used
+    by a generation are dropped when it finishes.
+
+    Nodes with a before_codegen hook are always rebuilt: what their hook
+    adds can depend on any part of the setup.
+    """
+
+    def __init__(self):
+        self._previous: dict = {}
+        self._current: dict = {}
+        self._hooked_node_ids = frozenset()
+        self.reused = 0
+        self.built = 0
+
+    def start(self, hooked_node_ids=()):
+        self._current = {}
+        self._hooked_node_ids = frozenset(hooked_node_ids)
+        self.reused = 0
+        self.built = 0
+
+    def finish(self):
+        # Only a completed generation replaces what is reused next time
+        self._previous = self._current
+        self._current = {}
+
+    def _fragment(self, key: tuple, data, build, *args) -> str:
+        entry = self._previous.get(key)
+        if entry is not None and entry[0] == data:
+            self._current[key] = entry
+            self.reused += 1
+            return entry[1]
+
+        fragment = build(*args)
+        # Node data is the caller's (nested) JSON, which may be edited in place
+        self._current[key] = (copy.deepcopy(data) if isinstance(data, dict) else data, fragment)
+        self.built += 1
+        return fragment
+
+    def node(self, kind: str, nd: dict, build) -> str:
+        if nd.get("id") in self._hooked_node_ids:
+            self.built += 1
+            return build(nd)
+        return self._fragment((kind, "node", nd["id"]), nd, build, nd)
+
+    def connection(self, kind: str, c: dict, source_category: str, build) -> str:
+        data = (c['id'], c['sourceNodeId'], c['sourceHandle'], c['targetNodeId'], c['targetHandle'], source_category)
+        return self._fragment((kind, "connection", c['id']), data, build, c, source_category)
+
+    def group(self, group_id: str, conns: list, build) -> str:
+        data = tuple((c["sourceNodeId"], c["sourceHandle"], c["targetHandle"]) for c in conns)
+        return self._fragment(("group", group_id), data, build, group_id, conns)
+
+
+class IncrementalCodegen:
+    """
+    Generates code for successive versions of one node setup, e.g. while it
+    is edited on the canvas. Every generation gives the same code as
+    generate_code_from_json, but only the node factories, connection lines
+    and group classes whose data changed since the previous generation are
+    emitted again; node class code comes from the unify cache.
+
+    Keep one instance per node setup; an instance is not thread-safe.
+    """
+
+    def __init__(self, mode: str = None):
+        self.mode = get_codegen_mode(mode)
+        self.fragments = CodegenFragments()
+
+    def generate(self, json_data: dict, id, templates: dict = None) -> str:
+        return _generate_code_from_json(json_data, id, templates, self.mode, self.fragments)
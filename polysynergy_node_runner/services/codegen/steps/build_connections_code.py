@@ -1,14 +1,15 @@
-def build_connections_code(connections, nodes, groups_with_output: set):
-    lines = []
+def get_built_connections(connections, nodes, groups_with_output: set, report: bool = True) -> list[tuple[dict, str]]:
+    """The connections that are instantiated, with the category of their source node."""
+    built = []
     node_dict = {nd["id"]: nd for nd in nodes}
 
     # Debug: Count connections being built
-    built_count = 0
     skipped_group_internal = 0
     skipped_group_no_output = 0
 
-    print(f"[CODEGEN-CONN] Total connections in JSON: {len(connections)}")
-    print(f"[CODEGEN-CONN] Total nodes in JSON: {len(nodes)}")
+    if report:
+        print(f"[CODEGEN-CONN] Total connections in JSON: {len(connections)}")
+        print(f"[CODEGEN-CONN] Total nodes in JSON: {len(nodes)}")
 
     for c in connections:
         source_node = node_dict.get(c["sourceNodeId"], {})
@@ -25,15 +26,31 @@ def build_connections_code(connections, nodes, groups_with_output: set):
             skipped_group_no_output += 1
             continue
 
-        built_count += 1
-        condition = f"mock or '{source_category}' != 'mock'"
+        built.append((c, source_category))
+
+    if report:
+        print(f"[CODEGEN-CONN] Built: {len(built)}, Skipped (group internal): {skipped_group_internal}, Skipped (group no output): {skipped_group_no_output}")
+
+    return built
+
 
-        lines.append(
-            f"        if {condition}: connections.append(Connection(uuid='{c['id']}', "
-            f"source_node_id='{c['sourceNodeId']}', source_handle='{c['sourceHandle']}', "
-            f"target_node_id='{c['targetNodeId']}', target_handle='{c['targetHandle']}', context=connection_context))"
-        )
+def build_connection_code(c: dict, source_category: str) -> str:
+    condition = f"mock or '{source_category}' != 'mock'"
+
+    return (
+        f"        if {condition}: connections.append(Connection(uuid='{c['id']}', "
+        f"source_node_id='{c['sourceNodeId']}', source_handle='{c['sourceHandle']}', "
+        f"target_node_id='{c['targetNodeId']}', target_handle='{c['targetHandle']}', context=connection_context))"
+    )
+
+
+def build_connections_code(connections, nodes, groups_with_output: set, fragments=None):
+    lines = []
 
-    print(f"[CODEGEN-CONN] Built: {built_count}, Skipped (group internal): {skipped_group_internal}, Skipped (group no output): {skipped_group_no_output}")
+    for c, source_category in get_built_connections(connections, nodes, groups_with_output):
+        if fragments is None:
+            lines.append(build_connection_code(c, source_category))
+        else:
+            lines.append(fragments.connection("code", c, source_category, build_connection_code))
 
     return "\n".join(lines)
\ No newline at end of file
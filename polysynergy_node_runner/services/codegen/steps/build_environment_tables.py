@@ -0,0 +1,51 @@
+from polysynergy_node_runner.services.codegen.steps.build_connections_code import get_built_connections
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import get_flow_state_name, \
+    get_node_attributes, get_node_class_name, is_node_instantiated
+
+
+def _table_literal(name: str, rows: list[str]) -> str:
+    # One row per line keeps large tables readable and diffable
+    return f"{name} = (\n{''.join(rows)})"
+
+
+def build_node_row(nd: dict) -> str:
+    row = (
+        nd["id"],
+        nd["handle"],
+        get_node_class_name(nd),
+        nd.get('stateful', True),
+        'group' if nd.get("type") == "group" else nd['path'],
+        nd['category'],
+        get_flow_state_name(nd),
+        dict(get_node_attributes(nd)),
+    )
+    return f"    {repr(row)},\n"
+
+
+def build_connection_row(c: dict, source_category: str) -> str:
+    row = (c['id'], c['sourceNodeId'], c['sourceHandle'], c['targetNodeId'], c['targetHandle'], source_category)
+    return f"    {repr(row)},\n"
+
+
+def build_node_table(nodes: list, groups_with_output: set, fragments=None) -> str:
+    """NODE_TABLE for environment_builder.register_nodes: the data build_nodes_code turns into statements."""
+    rows = []
+    for nd in nodes:
+        if not is_node_instantiated(nd, groups_with_output):
+            continue
+        if fragments is None:
+            rows.append(build_node_row(nd))
+        else:
+            rows.append(fragments.node("table", nd, build_node_row))
+    return _table_literal("NODE_TABLE", rows)
+
+
+def build_connection_table(connections: list, nodes: list, groups_with_output: set, fragments=None) -> str:
+    """CONNECTION_TABLE for environment_builder.build_connections."""
+    rows = []
+    for c, source_category in get_built_connections(connections, nodes, groups_with_output):
+        if fragments is None:
+            rows.append(build_connection_row(c, source_category))
+        else:
+            rows.append(fragments.connection("table", c, source_category, build_connection_row))
+    return _table_literal("CONNECTION_TABLE", rows)
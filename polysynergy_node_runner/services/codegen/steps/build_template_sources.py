@@ -0,0 +1,98 @@
+import functools
+from collections import defaultdict
+
+import jinja2
+from jinja2 import meta
+
+from polysynergy_node_runner.execution_context.replace_placeholders import jinja_env
+from polysynergy_node_runner.services.codegen.steps.build_connections_code import get_built_connections
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import is_node_instantiated
+from polysynergy_node_runner.services.codegen.steps.precompile_templates import node_template_sources
+
+
+@functools.lru_cache(maxsize=4096)
+def find_template_handles(source: str) -> tuple[str, ...] | None:
+    """
+    The names a template reads from its context, or None when it does not
+    parse. Jinja globals (component, flow) are not handles.
+    """
+    try:
+        names = meta.find_undeclared_variables(jinja_env.parse(source))
+    except jinja2.TemplateSyntaxError:
+        return None
+    return tuple(sorted(names - jinja_env.globals.keys()))
+
+
+def resolve_handle_backwards(start_node_id: str, handle: str, in_sources: dict, handles: dict) -> str | None:
+    """
+    The node traversal.find_node_by_handle_backwards finds at runtime, from
+    the graph instead of the nodes: `in_sources` maps a node id to the source
+    node ids of its in connections, in order, and `handles` the id of every
+    registered node to its handle.
+    """
+    found = None
+    visited = {start_node_id}
+    stack = [iter(in_sources.get(start_node_id, ()))]
+    while stack:
+        for source_id in stack[-1]:
+            if source_id not in handles:
+                continue
+            if handles[source_id] == handle:
+                # Like the runtime traversal the last match wins
+                found = source_id
+                continue
+            if source_id not in visited:
+                visited.add(source_id)
+                stack.append(iter(in_sources.get(source_id, ())))
+                break
+        else:
+            stack.pop()
+    return found if found != start_node_id else None
+
+
+def build_template_sources(nodes: list, connections: list, groups_with_output: set, mock: bool) -> dict:
+    """
+    {node id: {template source: {handle: upstream node id}}} for the static
+    templates of every node: per handle a template references, the node
+    replace_placeholders takes it from when it is not in the render context.
+    Handles without an upstream node are left out. Which nodes and
+    connections exist differs between mock and live runs, hence `mock`.
+    """
+    handles = {
+        nd["id"]: nd["handle"]
+        for nd in nodes
+        if is_node_instantiated(nd, groups_with_output) and (mock or nd.get("category") != "mock")
+    }
+
+    in_sources = defaultdict(list)
+    for c, source_category in get_built_connections(connections, nodes, groups_with_output, report=False):
+        if (mock or source_category != "mock") and c["targetHandle"] not in "node":
+            in_sources[c["targetNodeId"]].append(c["sourceNodeId"])
+
+    template_sources = {}
+    for nd in nodes:
+        if nd["id"] not in handles:
+            continue
+        sources = {}
+        for source in node_template_sources(nd):
+            referenced = find_template_handles(source)
+            if referenced is None:
+                continue
+            sources[source] = {
+                handle: node_id
+                for handle in referenced
+                if (node_id := resolve_handle_backwards(nd["id"], handle, in_sources, handles)) is not None
+            }
+        if sources:
+            template_sources[nd["id"]] = sources
+    return template_sources
+
+
+def build_template_sources_code(nodes: list, connections: list, groups_with_output: set) -> str:
+    """TEMPLATE_SOURCES and MOCK_TEMPLATE_SOURCES, or nothing for a setup without static templates."""
+    live = build_template_sources(nodes, connections, groups_with_output, mock=False)
+    mock = build_template_sources(nodes, connections, groups_with_output, mock=True)
+    if not live and not mock:
+        return ""
+    mock_code = "TEMPLATE_SOURCES" if mock == live else repr(mock)
+    return f"\nTEMPLATE_SOURCES = {repr(live)}\nMOCK_TEMPLATE_SOURCES = {mock_code}\n"
@@ -0,0 +1,10 @@
+import re
+
+from polysynergy_node_runner.services.codegen.steps.collect_secret_keys import collect_placeholder_keys
+
+# Same syntax as ResolveEnvironmentVariableMixin: <environment:key> or <env:key>
+ENVIRONMENT_PLACEHOLDER_PATTERN = re.compile(r"<(?:environment|env):([a-zA-Z0-9_\-]+)>")
+
+
+def collect_environment_keys(nodes: list) -> list[str]:
+    return collect_placeholder_keys(nodes, ENVIRONMENT_PLACEHOLDER_PATTERN, "VariableEnvironment")
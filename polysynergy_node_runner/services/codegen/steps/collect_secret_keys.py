@@ -0,0 +1,46 @@
+import re
+
+# Same syntax as ResolveSecretMixin: <secret:key> or <sec:key>
+SECRET_PLACEHOLDER_PATTERN = re.compile(r"<sec(?:ret)?:([a-zA-Z0-9_\-]+)>")
+
+
+def _collect_from_value(value, pattern: re.Pattern, keys: set):
+    if isinstance(value, str):
+        keys.update(pattern.findall(value))
+    elif isinstance(value, dict):
+        for v in value.values():
+            _collect_from_value(v, pattern, keys)
+    elif isinstance(value, list):
+        for v in value:
+            _collect_from_value(v, pattern, keys)
+
+
+def collect_placeholder_keys(nodes: list, pattern: re.Pattern, variable_node_prefix: str) -> list[str]:
+    """
+    Collect every key that is referenced statically in the node setup, either
+    as a placeholder matching `pattern` in a variable value or as the key of a
+    variable node (e.g. VariableSecret) whose class starts with
+    `variable_node_prefix`.
+    """
+    keys = set()
+
+    for nd in nodes:
+        if nd.get("type") in ["group", "warp_gate"]:
+            continue
+
+        is_variable_node = (nd.get("path") or "").split(".")[-1].startswith(variable_node_prefix)
+
+        for v in nd.get("variables", []):
+            value = v.get("value")
+
+            if is_variable_node and v.get("handle") == "true_path" and isinstance(value, str) and value:
+                keys.add(value)
+                continue
+
+            _collect_from_value(value, pattern, keys)
+
+    return sorted(keys)
+
+
+def collect_secret_keys(nodes: list) -> list[str]:
+    return collect_placeholder_keys(nodes, SECRET_PLACEHOLDER_PATTERN, "VariableSecret")
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# How long a resolved source is trusted before its file's mtime is checked
+# again. Within a codegen run every node is a dict lookup; between runs,
+# edited node files are picked up.
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def get_node_packages() -> list[str]:
+    node_packages = os.getenv("NODE_PACKAGES", "").split(",")
+    return [pkg.strip() for pkg in node_packages if pkg.strip()]
+
+
+def get_search_paths(node_packages: list[str]) -> list[Path]:
+    """Directories a node module path is resolved against, in order of priority."""
+    base_paths = [
+        Path.cwd().parent,  # Parent directory (development)
+        Path.cwd(),         # Current directory
+        Path("/app"),       # Docker /app location
+        Path("/"),          # Docker root (for /nodes, /nodes_agno, etc.)
+    ]
+
+    search_paths = []
+    for base in base_paths:
+        search_paths.append(base)
+        # polysynergy_nodes -> nodes, polysynergy_nodes_agno -> nodes_agno
+        for pkg in node_packages:
+            if pkg.startswith("polysynergy_"):
+                search_paths.append(base / pkg.replace("polysynergy_", ""))
+    return search_paths
+
+
+class NodeSource:
+    __slots__ = ('path', 'mtime_ns', 'code', 'checked_at', '_hash')
+
+    def __init__(self, path: Path, mtime_ns: int, code: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.code = code
+        self.checked_at = time.monotonic()
+        self._hash = None
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = hashlib.sha256(self.code.encode()).hexdigest()
+        return self._hash
+
+
+class NodeSourceIndex:
+    """
+    Maps node module paths (e.g. `polysynergy_nodes.variable.variable_string`)
+    to their source file, by walking the NODE_PACKAGES packages under the
+    search paths once. Sources are read once and re-read when the file's
+    mtime changes; a module that is not found triggers a rescan, at most
+    once per check interval.
+    """
+
+    def __init__(self, node_packages: list[str], search_paths: list[Path],
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.node_packages = node_packages
+        self.search_paths = search_paths
+        self.check_interval = check_interval
+        self._files: dict[str, Path] | None = None
+        self._missing: set[str] = set()
+        self._scanned_at = 0.0
+        self._sources: dict[str, NodeSource] = {}
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = {}
+        for root in self.search_paths:
+            for pkg in self.node_packages:
+                package_dir = root / pkg.replace(".", "/")
+                if not package_dir.is_dir():
+                    continue
+                for file in package_dir.rglob("*.py"):
+                    module_path = ".".join(file.relative_to(root).with_suffix("").parts)
+                    # The first search path that has the module wins
+                    files.setdefault(module_path, file)
+        self._files = files
+        self._missing = set()
+        self._scanned_at = time.monotonic()
+
+    def _find_file(self, module_path: str) -> Path | None:
+        if self._files is None or (
+            module_path not in self._files
+            and time.monotonic() - self._scanned_at >= self.check_interval
+        ):
+            self._scan()
+        file = self._files.get(module_path)
+        if file is None and module_path not in self._missing:
+            file = self._probe(module_path)
+        return file
+
+    def _probe(self, module_path: str) -> Path | None:
+        # Modules of a package that is only matched by prefix (e.g.
+        # polysynergy_nodes_agno for polysynergy_nodes) are not scanned
+        relative = module_path.replace(".", "/") + ".py"
+        for root in self.search_paths:
+            file = root / relative
+            if file.exists():
+                self._files[module_path] = file
+                return file
+        self._missing.add(module_path)
+        return None
+
+    def loaded_sources(self, module_paths) -> dict[str, NodeSource]:
+        """The sources already read for `module_paths`, e.g. to prime the index of another process with."""
+        return {path: self._sources[path] for path in module_paths if path in self._sources}
+
+    def prime(self, sources: dict[str, NodeSource]):
+        """
+        Adds sources read elsewhere, e.g. in another process. They are
+        trusted for a check interval from now and then checked against
+        their file's mtime like any other, without scanning the packages.
+        """
+        with self._lock:
+            for module_path, source in sources.items():
+                source.checked_at = time.monotonic()
+                self._sources[module_path] = source
+
+    def get(self, module_path: str) -> NodeSource | None:
+        source = self._sources.get(module_path)
+        if source is not None and time.monotonic() - source.checked_at < self.check_interval:
+            return source
+
+        with self._lock:
+            return self._load(module_path, source)
+
+    def _load(self, module_path: str, source: NodeSource | None) -> NodeSource | None:
+        if source is not None:
+            try:
+                mtime_ns = source.path.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns == source.mtime_ns:
+                source.checked_at = time.monotonic()
+                return source
+            del self._sources[module_path]
+
+        file = self._find_file(module_path)
+        if file is None:
+            return None
+        try:
+            mtime_ns = file.stat().st_mtime_ns
+            code = file.read_text()
+        except OSError as e:
+            logger.warning(f"Failed to read file {file}: {e}")
+            self._files.pop(module_path, None)
+            return None
+
+        source = NodeSource(file, mtime_ns, code)
+        self._sources[module_path] = source
+        return source
+
+
+_index: NodeSourceIndex | None = None
+_index_key: tuple | None = None
+
+
+def get_node_source_index() -> NodeSourceIndex:
+    """The process index, rebuilt when NODE_PACKAGES or the working directory changes."""
+    global _index, _index_key
+    node_packages = get_node_packages()
+    key = (tuple(node_packages), os.getcwd())
+    if _index is None or key != _index_key:
+        _index = NodeSourceIndex(node_packages, get_search_paths(node_packages))
+        _index_key = key
+    return _index
@@ -0,0 +1,121 @@
+import functools
+import json
+import logging
+import os
+import textwrap
+
+import jinja2
+
+from polysynergy_node_runner.execution_context.replace_placeholders import jinja_env
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import TEMPLATE_SKIP_ATTRIBUTES
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import get_node_attributes
+from polysynergy_node_runner.services.codegen.steps.collect_environment_keys import ENVIRONMENT_PLACEHOLDER_PATTERN
+from polysynergy_node_runner.services.codegen.steps.collect_secret_keys import SECRET_PLACEHOLDER_PATTERN
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+PRECOMPILED_TEMPLATES_IMPORT = \
+    "from polysynergy_node_runner.execution_context.replace_placeholders import register_precompiled_templates"
+
+
+def is_template_precompilation_requested() -> bool:
+    return os.getenv("CODEGEN_PRECOMPILE_TEMPLATES", "false").lower() in ("true", "1", "yes")
+
+
+def _has_template(text: str) -> bool:
+    return any(marker in text for marker in TEMPLATE_MARKERS)
+
+
+def node_template_sources(nd: dict) -> list[str]:
+    """
+    The template sources a node's variables are rendered from, as
+    replace_placeholders sees them: strings as they are, dicts and lists as
+    their json.dumps. Strings with secret or environment placeholders are
+    left out; those are replaced before rendering, so the rendered source
+    is only known at runtime.
+    """
+    sources = []
+    for attribute, value in get_node_attributes(nd):
+        if attribute.startswith("_") or attribute in TEMPLATE_SKIP_ATTRIBUTES:
+            continue
+        if isinstance(value, str):
+            if (
+                _has_template(value)
+                and not SECRET_PLACEHOLDER_PATTERN.search(value)
+                and not ENVIRONMENT_PLACEHOLDER_PATTERN.search(value)
+            ):
+                sources.append(value)
+        elif isinstance(value, (dict, list)):
+            source = json.dumps(value)
+            if _has_template(source):
+                sources.append(source)
+    return sources
+
+
+def collect_template_sources(nodes: list) -> list[str]:
+    """Every node's template sources (see node_template_sources)."""
+    sources = set()
+    for nd in nodes:
+        if nd.get("type") == "warp_gate":
+            continue
+        sources.update(node_template_sources(nd))
+    return sorted(sources)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(source: str, name: str = None) -> str | None:
+    """
+    The Python module code Jinja compiles `source` to with the runtime
+    environment, or None when it does not compile (rendering it then raises
+    the same error at runtime as before).
+    """
+    try:
+        return jinja_env.compile(source, name, name, raw=True)
+    except jinja2.TemplateError as e:
+        logger.warning(f"Not precompiling template {name or repr(source[:40])}: {e}")
+        return None
+
+
+def build_precompiled_templates_code(templates: dict = None, template_sources: list = ()) -> str:
+    """
+    Project templates and inline template sources as Jinja's compiled module
+    code, each wrapped in a factory that returns the module namespace, and
+    the call registering them with replace_placeholders. Rendering them then
+    skips parsing and compiling at runtime. Empty when there is nothing to
+    precompile.
+    """
+    lines = []
+    project = {}
+    inline = {}
+
+    def add(target: dict, key: str, module_code: str):
+        factory_name = f"_jinja_template_{len(project) + len(inline)}"
+        lines.append(f"def {factory_name}(environment):")
+        lines.append(textwrap.indent(module_code, "    "))
+        lines.append("    return locals()\n")
+        target[key] = factory_name
+
+    for name, source in sorted((templates or {}).items()):
+        module_code = compile_template(source, name)
+        if module_code is not None:
+            add(project, name, module_code)
+
+    for source in template_sources:
+        module_code = compile_template(source)
+        if module_code is not None:
+            add(inline, source, module_code)
+
+    if not lines:
+        return ""
+
+    project_code = "{" + ", ".join(f"{name!r}: {factory}" for name, factory in project.items()) + "}"
+    inline_code = "{" + ", ".join(f"{source!r}: {factory}" for source, factory in inline.items()) + "}"
+    return "\n".join([
+        "\n# Jinja templates compiled at code generation time",
+        PRECOMPILED_TEMPLATES_IMPORT,
+        "",
+        *lines,
+        f"register_precompiled_templates({jinja2.__version__!r}, project={project_code}, inline={inline_code})\n",
+    ])
@@ -0,0 +1,145 @@
+import ast
+import re
+
+from polysynergy_node_runner.services.codegen.steps.get_version_suffix import get_version_suffix
+
+SKIPPED_IMPORTS = (
+    "from polysynergy_node_runner.node_variable_settings",
+    "import polysynergy_node_runner.node_variable_settings"
+)
+
+NODE_BASES = {"Node", "ServiceNode", "ExecutableNode"}
+
+# Position of `default` when it is passed positionally
+SETTINGS_DEFAULT_POSITION = {
+    "NodeVariableSettings": 1,
+    "PathSettings": 2,
+}
+
+class_name_pat = re.compile(rb'class\s+[^\s(:]+')
+
+
+def _name(node) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _settings_default(call: ast.Call, source: bytes, offsets: list[int]) -> str:
+    for keyword in call.keywords:
+        if keyword.arg == "default":
+            return _segment(source, offsets, keyword.value)
+    position = SETTINGS_DEFAULT_POSITION[_name(call.func)]
+    if len(call.args) > position and not isinstance(call.args[position], ast.Starred):
+        return _segment(source, offsets, call.args[position])
+    return "None"
+
+
+def _offset(offsets: list[int], lineno: int, col_offset: int) -> int:
+    # ast positions are (1-based line, utf-8 byte column)
+    return offsets[lineno - 1] + col_offset
+
+
+def _segment(source: bytes, offsets: list[int], node) -> str:
+    start = _offset(offsets, node.lineno, node.col_offset)
+    end = _offset(offsets, node.end_lineno, node.end_col_offset)
+    return source[start:end].decode("utf-8")
+
+
+def _whole_lines(offsets: list[int], first: int, last: int) -> tuple[int, int]:
+    return offsets[first - 1], offsets[last]
+
+
+def _statement_lists(tree: ast.Module):
+    """Every list of statements in the tree: the module body, and the bodies of functions, classes and blocks."""
+    for node in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                yield body
+
+
+def transform_node_code(code: str, version=None) -> tuple[str, set[str]]:
+    """
+    Rewrites node source into its executable form with a single parse:
+    imports, module level and nested, are taken out and returned, `@node(...)` decorators
+    are removed, `Node` / `ServiceNode` bases become `ExecutableNode` (with
+    the version suffix on the class name) and NodeVariableSettings /
+    PathSettings assignments are reduced to their default.
+
+    Edits are applied to the original source by position, so formatting and
+    comments are kept. Raises SyntaxError for code that does not parse.
+    """
+    tree = ast.parse(code)
+    source = code.encode("utf-8")
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    imports = set()
+    edits = []
+
+    for body in _statement_lists(tree):
+        statement_lines = {}
+        for statement in body:
+            for lineno in range(statement.lineno, statement.end_lineno + 1):
+                statement_lines[lineno] = statement_lines.get(lineno, 0) + 1
+
+        body_imports = [s for s in body if isinstance(s, (ast.Import, ast.ImportFrom))]
+        for statement in body_imports:
+            if any(statement_lines[n] > 1 for n in range(statement.lineno, statement.end_lineno + 1)):
+                raise SyntaxError("import shares a line with another statement")
+            text = ast.unparse(statement)
+            if not text.startswith(SKIPPED_IMPORTS):
+                imports.add(text)
+            edits.append((*_whole_lines(offsets, statement.lineno, statement.end_lineno), b""))
+
+        # Imports nested in functions, methods and blocks are lifted as
+        # well; a block that held nothing else keeps a `pass`
+        if body is not tree.body and len(body_imports) == len(body):
+            first = body[0]
+            start = offsets[first.lineno - 1]
+            indent = lines[first.lineno - 1][:first.col_offset]
+            edits.append((start, start, indent + b"pass\n"))
+
+    version_suffix = get_version_suffix(version) if version is not None else ""
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            for decorator in node.decorator_list:
+                if isinstance(decorator, ast.Call) and _name(decorator.func) == "node":
+                    edits.append((*_whole_lines(offsets, decorator.lineno, decorator.end_lineno), b""))
+
+            # Only a single, plain node base is rewritten; mixins are left alone
+            if len(node.bases) == 1 and not node.keywords and _name(node.bases[0]) in NODE_BASES:
+                base = node.bases[0]
+                edits.append((
+                    _offset(offsets, base.lineno, base.col_offset),
+                    _offset(offsets, base.end_lineno, base.end_col_offset),
+                    b"ExecutableNode",
+                ))
+                if version_suffix:
+                    match = class_name_pat.match(lines[node.lineno - 1], node.col_offset)
+                    if match:
+                        name_end = offsets[node.lineno - 1] + match.end()
+                        edits.append((name_end, name_end, version_suffix.encode("utf-8")))
+
+        elif (
+            isinstance(node, ast.AnnAssign)
+            and isinstance(node.value, ast.Call)
+            and _name(node.value.func) in SETTINGS_DEFAULT_POSITION
+        ):
+            edits.append((
+                _offset(offsets, node.value.lineno, node.value.col_offset),
+                _offset(offsets, node.value.end_lineno, node.value.end_col_offset),
+                _settings_default(node.value, source, offsets).encode("utf-8"),
+            ))
+
+    out = bytearray(source)
+    for start, end, replacement in sorted(edits, reverse=True):
+        out[start:end] = replacement
+
+    return "\n".join(out.decode("utf-8").splitlines()), imports
@@ -1,3 +1,4 @@
+import logging
 import re
 
 from polysynergy_node_runner.services.codegen.steps.filter_and_collect_imports import filter_and_collect_imports
@@ -5,9 +6,44 @@ from polysynergy_node_runner.services.codegen.steps.get_version_suffix import ge
 from polysynergy_node_runner.services.codegen.steps.replace_node_to_executable import replace_node_to_executable
 from polysynergy_node_runner.services.codegen.steps.strip_multiline_decorator import strip_multiline_decorator
 from polysynergy_node_runner.services.codegen.steps.strip_nodevariable_all import strip_nodevariable_all
+from polysynergy_node_runner.services.codegen.steps.transform_node_code import transform_node_code
+from polysynergy_node_runner.services.ttl_cache import TTLCache
 
+logger = logging.getLogger(__name__)
 
-def unify_node_code(code, collected_imports, version=None):
+# Transformed node code per (path, version); an entry is only used while the
+# source it was made from is unchanged
+_transformed = TTLCache(ttl=float("inf"), maxsize=1024)
+
+
+def unify_node_code(code, collected_imports, version=None, path=None):
+    key = (path, version) if path else None
+    if key is not None:
+        cached = _transformed.get(key)
+        if cached is not None and cached[0] == code:
+            collected_imports.update(cached[2])
+            return cached[1]
+
+    try:
+        unified, imports = transform_node_code(code, version)
+    except SyntaxError as e:
+        logger.warning(f"Falling back to line based node code transformation for {path or 'node'}: {e}")
+        imports = set()
+        unified = unify_node_code_by_lines(code, imports, version)
+
+    if key is not None:
+        _transformed.set(key, (code, unified, frozenset(imports)))
+    collected_imports.update(imports)
+    return unified
+
+
+def prime_unify_cache(entries: dict):
+    """Adds (path, version) -> (code, unified, imports) entries made elsewhere, e.g. in another process."""
+    for key, entry in entries.items():
+        _transformed.set(key, entry)
+
+
+def unify_node_code_by_lines(code, collected_imports, version=None):
     raw_lines = code.splitlines()
 
     step1 = filter_and_collect_imports(raw_lines, collected_imports)
@@ -26,4 +62,4 @@ def unify_node_code(code, collected_imports, version=None):
             for line in step4
         ]
 
-    return "\n".join(step4)
\ No newline at end of file
+    return "\n".join(step4)
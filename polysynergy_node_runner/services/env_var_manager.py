@@ -1,11 +1,24 @@
+import logging
 from collections import defaultdict
 
 import boto3
 import os
+from botocore.exceptions import ClientError
 from typing import Optional
 from .encryption_service import get_encryption_service
+from .ttl_cache import get_ttl_cache, publish_invalidation
+from ..utils.tracing import KIND_CLIENT, get_tracer
 from cryptography.fernet import InvalidToken
 
+logger = logging.getLogger(__name__)
+
+# Error codes of a query on a table or index that doesn't exist (yet)
+MISSING_INDEX_ERRORS = {"ValidationException", "ResourceNotFoundException"}
+
+# (table, index) pairs found missing in this process; load_stage is skipped
+# for them and get_var reads per key
+_missing_stage_indexes: set[tuple[str, str]] = set()
+
 
 class EnvVarManager:
     def __init__(self, access_key: str = None, secret_key: str = None, region: str = None):
@@ -37,6 +50,11 @@ class EnvVarManager:
             self.client = boto3.client("dynamodb", **dynamodb_config)
 
         self.table_name = os.getenv("DYNAMODB_ENV_VARS_TABLE", "polysynergy_env_vars")
+        # GSI on the project_stage attribute, so a whole stage can be read with one query
+        self.stage_index_name = os.getenv("DYNAMODB_ENV_VARS_STAGE_INDEX", "project_stage-index")
+
+        # Variables loaded with load_stage, by (project_id, stage) and key
+        self._stage_snapshots: dict[tuple[str, str], dict[str, str]] = {}
 
         # Initialize encryption service
         try:
@@ -45,9 +63,35 @@ class EnvVarManager:
             print(f"Warning: Encryption service not available: {e}")
             self.encryption = None
 
+        # Optional process level cache, shared across runs (ENV_VARS_CACHE_TTL)
+        self.cache = get_ttl_cache("env_vars", "ENV_VARS_CACHE_TTL", "ENV_VARS_CACHE_MAX_SIZE")
+
     def _key(self, project_id, stage, key):
         return f"envvar#{project_id}#{stage}#{key}"
 
+    def _stage_key(self, project_id, stage):
+        return f"envvar#{project_id}#{stage}"
+
+    def _invalidate(self, pk):
+        if self.cache is not None:
+            self.cache.invalidate(pk)
+        # Writers may run without a local cache, runners in other processes do
+        publish_invalidation("env_vars", pk)
+
+    def _decrypt_item(self, item, key):
+        value = item.get("value", {}).get("S")
+        is_encrypted = item.get("encrypted", {}).get("BOOL", False)
+
+        # Decrypt if encrypted
+        if is_encrypted and self.encryption:
+            try:
+                value = self.encryption.decrypt(value)
+            except (InvalidToken, Exception) as e:
+                logger.warning(f"Failed to decrypt env var {key}: {e}")
+                return None
+
+        return value
+
     def list_vars(self, project_id):
         response = self.client.scan(
             TableName=self.table_name,
@@ -56,9 +100,11 @@ class EnvVarManager:
         )
         items = response.get("Items", [])
         grouped = defaultdict(dict)
+        prefix = f"envvar#{project_id}#"
 
         for item in items:
-            _, project_id, stage, key = item["PK"]["S"].split("#", 3)
+            # Keys may contain '#', so only the part after the known prefix is split
+            stage, key = item["PK"]["S"][len(prefix):].split("#", 1)
             value = item["value"]["S"]
             is_encrypted = item.get("encrypted", {}).get("BOOL", False)
 
@@ -103,14 +149,115 @@ class EnvVarManager:
             TableName=self.table_name,
             Item={
                 "PK": {"S": pk},
+                "project_stage": {"S": self._stage_key(project_id, stage)},
                 "value": {"S": encrypted_value},
                 "encrypted": {"BOOL": is_encrypted}
             }
         )
+        self._invalidate(pk)
+        self._stage_snapshots.get((project_id, stage), {}).pop(key, None)
         return {"id": pk, "key": key, "stage": stage, "value": value, "encrypted": is_encrypted}
 
+    def load_stage(self, project_id, stage):
+        """
+        Load every variable of a stage with a single (paginated) query and keep
+        the decrypted values on this instance; get_var reads from this snapshot.
+        When the stage index does not exist (yet) nothing is loaded, for the
+        rest of the process, and get_var reads per key.
+        """
+        index = (self.table_name, self.stage_index_name)
+        if index in _missing_stage_indexes:
+            return {}
+
+        with get_tracer().span("env_vars.load_stage", KIND_CLIENT, {'db.system': 'dynamodb', 'db.operation': 'Query'}):
+            try:
+                items = self._query_all(
+                    TableName=self.table_name,
+                    IndexName=self.stage_index_name,
+                    KeyConditionExpression="project_stage = :ps",
+                    ExpressionAttributeValues={":ps": {"S": self._stage_key(project_id, stage)}}
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in MISSING_INDEX_ERRORS:
+                    raise
+                _missing_stage_indexes.add(index)
+                logger.warning(f"Stage index {self.stage_index_name} is not available, reading environment variables per key: {e}")
+                return {}
+
+        prefix = f"{self._stage_key(project_id, stage)}#"
+        snapshot = {}
+        for item in items:
+            key = item["PK"]["S"][len(prefix):]
+            value = self._decrypt_item(item, key)
+            if value is None:
+                continue
+            snapshot[key] = value
+            if self.cache is not None:
+                self.cache.set(item["PK"]["S"], value)
+
+        self._stage_snapshots[(project_id, stage)] = snapshot
+        return snapshot
+
+    def _query_all(self, **kwargs):
+        items = []
+        while True:
+            response = self.client.query(**kwargs)
+            items.extend(response.get("Items", []))
+            if not response.get("LastEvaluatedKey"):
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _scan_all(self, **kwargs):
+        items = []
+        while True:
+            response = self.client.scan(**kwargs)
+            items.extend(response.get("Items", []))
+            if not response.get("LastEvaluatedKey"):
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def backfill_stage_index(self):
+        """
+        Migration helper: add the project_stage attribute to variables that were
+        written before the stage index existed. Returns the number of updated items.
+        """
+        items = self._scan_all(
+            TableName=self.table_name,
+            FilterExpression="begins_with(PK, :prefix) AND attribute_not_exists(project_stage)",
+            ExpressionAttributeValues={":prefix": {"S": "envvar#"}}
+        )
+
+        for item in items:
+            pk = item["PK"]["S"]
+            self.client.update_item(
+                TableName=self.table_name,
+                Key={"PK": {"S": pk}},
+                UpdateExpression="SET project_stage = :ps",
+                # envvar#<project>#<stage>; the key after it may contain '#'
+                ExpressionAttributeValues={":ps": {"S": "#".join(pk.split("#", 3)[:3])}}
+            )
+
+        return len(items)
+
     def get_var(self, project_id, stage, key):
+        snapshot = self._stage_snapshots.get((project_id, stage))
+        if snapshot and key in snapshot:
+            return snapshot[key]
+
         pk = self._key(project_id, stage, key)
+
+        if self.cache is not None:
+            cached = self.cache.get(pk)
+            if cached is not None:
+                return cached
+
+        with get_tracer().span("env_vars.get_var", KIND_CLIENT, {'db.system': 'dynamodb', 'db.operation': 'GetItem'}):
+            value = self._fetch_var(pk, key)
+        if value is not None and self.cache is not None:
+            self.cache.set(pk, value)
+        return value
+
+    def _fetch_var(self, pk, key):
         response = self.client.get_item(
             TableName=self.table_name,
             Key={"PK": {"S": pk}}
@@ -119,18 +266,7 @@ class EnvVarManager:
         if not item:
             return None
 
-        value = item.get("value", {}).get("S")
-        is_encrypted = item.get("encrypted", {}).get("BOOL", False)
-
-        # Decrypt if encrypted
-        if is_encrypted and self.encryption:
-            try:
-                value = self.encryption.decrypt(value)
-            except (InvalidToken, Exception) as e:
-                print(f"Warning: Failed to decrypt env var {key}: {e}")
-                return None
-
-        return value
+        return self._decrypt_item(item, key)
 
     def delete_var(self, project_id, stage, key):
         pk = self._key(project_id, stage, key)
@@ -138,6 +274,8 @@ class EnvVarManager:
             TableName=self.table_name,
             Key={"PK": {"S": pk}}
         )
+        self._invalidate(pk)
+        self._stage_snapshots.get((project_id, stage), {}).pop(key, None)
 
 def get_env_var_manager():
     region = os.getenv("AWS_REGION") or "eu-central-1"
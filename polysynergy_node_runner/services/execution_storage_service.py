@@ -9,6 +9,7 @@ from boto3.dynamodb.conditions import Key
 
 from polysynergy_node_runner.execution_context.utils.redact_secrets import redact
 from polysynergy_node_runner.execution_context.utils.truncate_values import truncate_large_values
+from polysynergy_node_runner.utils.tracing import KIND_CLIENT, NOOP_SPAN, get_tracer
 
 
 class DynamoDbExecutionStorageService:
@@ -44,6 +45,16 @@ class DynamoDbExecutionStorageService:
         self.dynamodb = boto3.resource("dynamodb", **dynamodb_config)
         self.table = self.dynamodb.Table(self.table_name)
 
+    def _span(self, operation: str, name: str):
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return NOOP_SPAN
+        return tracer.span(f"storage.{name}", KIND_CLIENT, {
+            'db.system': 'dynamodb',
+            'db.operation': operation,
+            'aws.dynamodb.table_names': [self.table_name],
+        })
+
     def clear_previous_execution(self, flow_id: str, current_run_id: str = None, *, max_runs_to_keep: int = 50, **extra_kwargs):
         """
         Clear old execution data while preserving the last X runs.
@@ -53,7 +64,10 @@ class DynamoDbExecutionStorageService:
             current_run_id: The current run ID to preserve (optional)
             max_runs_to_keep: Maximum number of runs to keep (default: 50)
         """
-        
+        with self._span('Query', 'clear_previous_execution'):
+            self._clear_previous_execution(flow_id, current_run_id, max_runs_to_keep)
+
+    def _clear_previous_execution(self, flow_id: str, current_run_id: str, max_runs_to_keep: int):
         try:
             # Get current highest run number before cleanup
             current_max_run_number = self._get_max_run_number(flow_id)
@@ -235,11 +249,12 @@ class DynamoDbExecutionStorageService:
                 break
 
     def store_connections_result(self, flow_id: str, run_id: str, connections: list[dict]):
-        self.table.put_item(Item={
-            "PK": flow_id,
-            "SK": f"{run_id}#connections",
-            "data": json.dumps(connections)
-        })
+        with self._span('PutItem', 'store_connections_result'):
+            self.table.put_item(Item={
+                "PK": flow_id,
+                "SK": f"{run_id}#connections",
+                "data": json.dumps(connections)
+            })
 
     def store_mock_nodes_result(self, flow_id: str, run_id: str, mock_nodes: list[dict]):
         """Store the final mock nodes state for perfect visual state recreation"""
@@ -250,9 +265,10 @@ class DynamoDbExecutionStorageService:
         })
 
     def get_connections_result(self, flow_id: str, run_id: str):
-        response = self.table.get_item(
-            Key={"PK": flow_id, "SK": f"{run_id}#connections"}
-        )
+        with self._span('GetItem', 'get_connections_result'):
+            response = self.table.get_item(
+                Key={"PK": flow_id, "SK": f"{run_id}#connections"}
+            )
         item = response.get("Item", {})
         return json.loads(item["data"]) if "data" in item else None
 
@@ -264,14 +280,33 @@ class DynamoDbExecutionStorageService:
         item = response.get("Item", {})
         return json.loads(item["data"]) if "data" in item else None
 
+    def store_profile_result(self, flow_id: str, run_id: str, profile: dict):
+        """Store the sampling profile of a run (see utils.profiling) next to its results."""
+        with self._span('PutItem', 'store_profile_result'):
+            self.table.put_item(Item={
+                "PK": flow_id,
+                "SK": f"{run_id}#profile",
+                "data": json.dumps(profile)
+            })
+
+    def get_profile_result(self, flow_id: str, run_id: str):
+        with self._span('GetItem', 'get_profile_result'):
+            response = self.table.get_item(
+                Key={"PK": flow_id, "SK": f"{run_id}#profile"}
+            )
+        item = response.get("Item", {})
+        return json.loads(item["data"]) if "data" in item else None
+
     def store_node_result(self,
         node,
         flow_id: str,
         run_id: str,
         order: int,
         stage: str,
-        sub_stage: str = 'mock'
-    ):
+        sub_stage: str = 'mock',
+        timings: dict = None,
+    ) -> int:
+        """Store the result of a node execution. Returns the number of bytes written."""
         result_data = {
             "timestamp": datetime.now().isoformat(),
             "variables": redact(
@@ -298,11 +333,21 @@ class DynamoDbExecutionStorageService:
         if order == 0 and hasattr(self, '_current_run_numbers') and run_id in self._current_run_numbers:
             result_data["run_number"] = self._current_run_numbers[run_id]
 
-        self.table.put_item(Item={
-            "PK": flow_id,
-            "SK": f"{run_id}#{node.id}#{order}#{stage}#{sub_stage}",
-            "data": json.dumps(result_data, default=str),
-        })
+        if timings:
+            result_data["timings"] = timings
+
+        sk = f"{run_id}#{node.id}#{order}#{stage}#{sub_stage}"
+        data = json.dumps(result_data, default=str)
+        # json.dumps escapes non-ASCII, so characters are bytes
+        size = len(flow_id) + len(sk) + len(data)
+        with self._span('PutItem', 'store_node_result') as span:
+            span.set_attribute('db.item_size', size)
+            self.table.put_item(Item={
+                "PK": flow_id,
+                "SK": sk,
+                "data": data,
+            })
+        return size
 
     def get_node_result(
         self,
@@ -440,6 +485,10 @@ class DynamoDbExecutionStorageService:
 
     def get_all_nodes_for_run(self, flow_id: str, run_id: str, stage: str = "mock", sub_stage: str = "mock") -> list[dict]:
         """Get all node execution results for a specific run"""
+        with self._span('Scan', 'get_all_nodes_for_run'):
+            return self._get_all_nodes_for_run(flow_id, run_id)
+
+    def _get_all_nodes_for_run(self, flow_id: str, run_id: str) -> list[dict]:
         try:
             # Use table resource scan to get all nodes for this run
             response = self.table.scan(
@@ -8,6 +8,8 @@ import mimetypes
 from botocore.exceptions import ClientError, NoCredentialsError
 from typing import Dict, Any, Optional
 
+from polysynergy_node_runner.utils.tracing import KIND_CLIENT, get_tracer
+
 
 logger = logging.getLogger(__name__)
 
@@ -228,7 +230,14 @@ class S3Service:
                 upload_params['Metadata'] = metadata
 
             # Upload the file
-            response = self.s3_client.put_object(**upload_params)
+            with get_tracer().span("s3.put_object", KIND_CLIENT, {
+                'rpc.system': 'aws-api',
+                'rpc.service': 'S3',
+                'rpc.method': 'PutObject',
+                'aws.s3.bucket': bucket_name,
+                'aws.s3.object_size': len(file_data) if isinstance(file_data, (bytes, bytearray)) else None,
+            }):
+                response = self.s3_client.put_object(**upload_params)
 
             # Generate URL based on configuration
             url = self._generate_url(bucket_name, key)
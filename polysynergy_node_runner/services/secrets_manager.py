@@ -4,8 +4,14 @@ from typing import Optional
 import boto3
 from botocore.exceptions import ClientError
 from .encryption_service import get_encryption_service
+from .ttl_cache import get_ttl_cache, publish_invalidation
+from ..utils.tracing import KIND_CLIENT, get_tracer
 from cryptography.fernet import InvalidToken
 
+# DynamoDB accepts at most 100 keys per BatchGetItem request
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 3
+
 class SecretsManager:
     def __init__(self, access_key: str = None, secret_key: str = None, region: str = None):
         execution_env = os.getenv("AWS_EXECUTION_ENV", "")
@@ -57,11 +63,25 @@ class SecretsManager:
             print(f"Warning: Encryption service not available: {e}")
             self.encryption = None
 
+        # Secrets fetched up front for a run (see prefetch_secrets_by_keys),
+        # keyed by full secret name
+        self._prefetched: dict[str, dict] = {}
+
+        # Optional process level cache, shared across runs (SECRETS_CACHE_TTL)
+        self.cache = get_ttl_cache("secrets", "SECRETS_CACHE_TTL", "SECRETS_CACHE_MAX_SIZE")
+
     def _prefix_name(self, name: str, project_id: str, stage: str | None = None) -> str:
         if stage:
             return f"{project_id}@{stage}@{name}"
         return f"{project_id}@{name}"
 
+    def _invalidate(self, secret_id: str):
+        self._prefetched.pop(secret_id, None)
+        if self.cache is not None:
+            self.cache.invalidate(secret_id)
+        # Writers may run without a local cache, runners in other processes do
+        publish_invalidation("secrets", secret_id)
+
     def create_secret(self, name: str, secret_value: str, project_id: str, stage: str) -> dict:
         full_name = self._prefix_name(name, project_id, stage)
 
@@ -88,6 +108,7 @@ class SecretsManager:
                     'encrypted': {'BOOL': is_encrypted}
                 }
             )
+            self._invalidate(full_name)
 
             # Return success response in same format as Secrets Manager
             return {
@@ -102,7 +123,97 @@ class SecretsManager:
         full_name = self._prefix_name(key, project_id, stage)
         return self.get_secret(full_name)
 
+    def prefetch_secrets_by_keys(self, keys: list[str], project_id: str, stage: str) -> dict:
+        """
+        Fetch many secrets with BatchGetItem and keep them on this instance,
+        so subsequent get_secret_by_key calls are served from memory.
+
+        Keys that are not found in DynamoDB are left out; those still go
+        through the regular get_secret path (including the fallback).
+        """
+        full_names_by_key = {key: self._prefix_name(key, project_id, stage) for key in keys}
+        full_names = []
+        for name in full_names_by_key.values():
+            if name in self._prefetched:
+                continue
+            cached = self.cache.get(name) if self.cache is not None else None
+            if cached is not None:
+                self._prefetched[name] = cached
+                continue
+            full_names.append(name)
+
+        with get_tracer().span("secrets.prefetch", KIND_CLIENT, {
+            'db.system': 'dynamodb',
+            'db.operation': 'BatchGetItem',
+            'secrets.count': len(full_names),
+        }):
+            for start in range(0, len(full_names), BATCH_GET_MAX_KEYS):
+                request = {
+                    self.dynamodb_table: {
+                        'Keys': [{'secret_key': {'S': name}} for name in full_names[start:start + BATCH_GET_MAX_KEYS]]
+                    }
+                }
+
+                for _ in range(BATCH_GET_MAX_ATTEMPTS):
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+
+                    for item in response.get('Responses', {}).get(self.dynamodb_table, []):
+                        secret_id = item.get('secret_key', {}).get('S')
+                        secret = self._secret_from_item(secret_id, item)
+                        if secret is not None:
+                            self._prefetched[secret_id] = secret
+                            if self.cache is not None:
+                                self.cache.set(secret_id, secret)
+
+                    request = response.get('UnprocessedKeys') or {}
+                    if not request:
+                        break
+
+        return {
+            key: self._prefetched[name]
+            for key, name in full_names_by_key.items()
+            if name in self._prefetched
+        }
+
+    def _secret_from_item(self, secret_id: str, item: dict) -> dict | None:
+        secret_value = item.get('secret_value', {}).get('S')
+        is_encrypted = item.get('encrypted', {}).get('BOOL', False)
+
+        # Decrypt if encrypted
+        if is_encrypted and self.encryption:
+            try:
+                secret_value = self.encryption.decrypt(secret_value)
+            except (InvalidToken, Exception) as e:
+                print(f"Warning: Failed to decrypt secret {secret_id}: {e}")
+                return None
+
+        full_key = secret_id
+        if "@" in full_key:
+            key = full_key.split("@", 1)[1]
+        else:
+            key = full_key
+
+        return {
+            "key": key,
+            "value": secret_value
+        }
+
     def get_secret(self, secret_id: str) -> dict:
+        if secret_id in self._prefetched:
+            return self._prefetched[secret_id]
+
+        if self.cache is not None:
+            cached = self.cache.get(secret_id)
+            if cached is not None:
+                return cached
+
+        with get_tracer().span("secrets.get_secret", KIND_CLIENT, {'db.system': 'dynamodb', 'db.operation': 'GetItem'}):
+            secret = self._fetch_secret(secret_id)
+        if secret is not None and self.cache is not None:
+            self.cache.set(secret_id, secret)
+        return secret
+
+    def _fetch_secret(self, secret_id: str) -> dict:
         # Try DynamoDB first (cheap!)
         try:
             response = self.dynamodb.get_item(
@@ -111,27 +222,7 @@ class SecretsManager:
             )
 
             if 'Item' in response:
-                secret_value = response['Item'].get('secret_value', {}).get('S')
-                is_encrypted = response['Item'].get('encrypted', {}).get('BOOL', False)
-
-                # Decrypt if encrypted
-                if is_encrypted and self.encryption:
-                    try:
-                        secret_value = self.encryption.decrypt(secret_value)
-                    except (InvalidToken, Exception) as e:
-                        print(f"Warning: Failed to decrypt secret {secret_id}: {e}")
-                        return None
-
-                full_key = secret_id
-                if "@" in full_key:
-                    key = full_key.split("@", 1)[1]
-                else:
-                    key = full_key
-
-                return {
-                    "key": key,
-                    "value": secret_value
-                }
+                return self._secret_from_item(secret_id, response['Item'])
         except Exception as e:
             print(f"DynamoDB read failed for {secret_id}, falling back to Secrets Manager: {e}")
 
@@ -175,6 +266,7 @@ class SecretsManager:
                     ':enc': {'BOOL': is_encrypted}
                 }
             )
+            self._invalidate(secret_id)
 
             return {
                 'ARN': f'dynamodb:{secret_id}',
@@ -195,6 +287,7 @@ class SecretsManager:
                 TableName=self.dynamodb_table,
                 Key={'secret_key': {'S': secret_id}}
             )
+            self._invalidate(secret_id)
 
             return {
                 'ARN': f'dynamodb:{secret_id}',
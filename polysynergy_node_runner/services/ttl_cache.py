@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+DEFAULT_MAX_SIZE = 1024
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache where every entry expires after `ttl` seconds.
+    Used to keep decrypted secrets and environment variables in memory across
+    runs in the same (warm) process.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = DEFAULT_MAX_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float | None = None):
+        # ttl overrides the cache wide TTL for this entry
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Process level caches, by name ("secrets", "env_vars")
+_caches: dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+_invalidation_listener = None
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379"), decode_responses=True)
+    return _redis
+
+
+def get_ttl_cache(name: str, ttl_env: str, max_size_env: str) -> TTLCache | None:
+    """
+    Return the process level cache for `name`, or None when caching is not
+    enabled. Caching is opt-in: it is only active when `ttl_env` is set to a
+    positive number of seconds.
+    """
+    try:
+        ttl = float(os.getenv(ttl_env, "0") or 0)
+    except ValueError:
+        logger.warning(f"Invalid value for {ttl_env}, caching disabled")
+        return None
+
+    if ttl <= 0:
+        return None
+
+    try:
+        maxsize = int(os.getenv(max_size_env) or DEFAULT_MAX_SIZE)
+        if maxsize <= 0:
+            raise ValueError(maxsize)
+    except ValueError:
+        logger.warning(f"Invalid value for {max_size_env}, using {DEFAULT_MAX_SIZE}")
+        maxsize = DEFAULT_MAX_SIZE
+
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = TTLCache(ttl=ttl, maxsize=maxsize)
+            _caches[name] = cache
+
+    _start_invalidation_listener()
+    return cache
+
+
+def clear_ttl_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+
+
+def _get_invalidation_channel() -> str | None:
+    return os.getenv("CACHE_INVALIDATION_CHANNEL") or None
+
+
+def publish_invalidation(name: str, key: str, prefix: bool = False):
+    """
+    Tell other processes to drop `key` from cache `name`. Only active when
+    CACHE_INVALIDATION_CHANNEL is configured.
+    """
+    channel = _get_invalidation_channel()
+    if not channel:
+        return
+
+    try:
+        _get_redis().publish(channel, json.dumps({"cache": name, "key": key, "prefix": prefix}))
+    except Exception as e:
+        logger.warning(f"Failed to publish cache invalidation for {name}: {e}")
+
+
+def handle_invalidation_message(data):
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+
+    cache = _caches.get(message.get("cache"))
+    key = message.get("key")
+    if cache is None or not key:
+        return
+
+    if message.get("prefix"):
+        cache.invalidate_prefix(key)
+    else:
+        cache.invalidate(key)
+
+
+def _listen_for_invalidations(channel: str):
+    while True:
+        try:
+            redis_conn = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379"), decode_responses=True)
+            pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(channel)
+            for message in pubsub.listen():
+                handle_invalidation_message(message.get("data"))
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener error, clearing caches: {e}")
+            # Invalidations may have been missed while disconnected
+            clear_ttl_caches()
+            time.sleep(5)
+
+
+def _start_invalidation_listener():
+    global _invalidation_listener
+
+    channel = _get_invalidation_channel()
+    if not channel or _invalidation_listener is not None:
+        return
+
+    with _caches_lock:
+        if _invalidation_listener is not None:
+            return
+        _invalidation_listener = threading.Thread(
+            target=_listen_for_invalidations,
+            args=(channel,),
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        _invalidation_listener.start()
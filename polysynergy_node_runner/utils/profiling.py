@@ -0,0 +1,206 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# A run is profiled when its event carries `"profile": true`, or for every
+# run when NODE_RUNNER_PROFILE is set. A background thread samples the stack
+# of the thread running the flow every NODE_RUNNER_PROFILE_INTERVAL_MS, so
+# the flow itself is not slowed down by tracing every call.
+DEFAULT_INTERVAL_MS = 10
+# DynamoDB items are at most 400KB; the heaviest stacks are kept
+MAX_STORED_PROFILE_BYTES = 300_000
+ENGINE_LABEL = "engine"
+
+# thread id -> labels of the nodes executing on it, outermost first.
+# Only maintained while a profiler is running (see enter_node).
+_node_stacks: dict[int, list[str]] = {}
+_active_profilers = 0
+_active_lock = threading.Lock()
+
+
+def is_profiling_requested(event: dict = None) -> bool:
+    if event and event.get("profile"):
+        return True
+    return os.getenv("NODE_RUNNER_PROFILE", "false").lower() in ("true", "1", "yes")
+
+
+def enter_node(node) -> int | None:
+    """
+    Mark `node` as executing on this thread. Returns the depth to pass to
+    exit_node, or None when nothing is profiled and exit_node is not needed.
+    """
+    if not _active_profilers:
+        return None
+    stack = _node_stacks.setdefault(threading.get_ident(), [])
+    depth = len(stack)
+    stack.append(f"{node.handle} ({type(node).__name__})")
+    return depth
+
+
+def exit_node(depth: int):
+    """
+    Truncate this thread's node stack to `depth`, as enter_node returned it.
+    Labels of nodes that did not exit in order (concurrent nodes on one
+    event loop) are dropped with it instead of staying on the stack.
+    """
+    stack = _node_stacks.get(threading.get_ident())
+    if stack:
+        del stack[depth:]
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval. Stacks are
+    attributed to the innermost node executing at the time of the sample;
+    only the frames from that node's state_execute down are kept, below the
+    labels of the nodes it runs in (e.g. a loop). Samples taken between
+    nodes are attributed to the engine.
+    """
+
+    def __init__(self, interval_ms: float = None):
+        if interval_ms is None:
+            interval_ms = float(os.getenv("NODE_RUNNER_PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS))
+        self.interval = max(interval_ms, 1) / 1000
+        # (node labels, code objects root first) -> number of samples
+        self.samples: Counter = Counter()
+        self.thread_id: int | None = None
+        self.started_at: float | None = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, thread_id: int = None):
+        """Start sampling `thread_id`, by default the calling thread."""
+        global _active_profilers
+        self.thread_id = thread_id or threading.get_ident()
+        self.started_at = time.perf_counter()
+        with _active_lock:
+            _active_profilers += 1
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="flow-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        global _active_profilers
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+        with _active_lock:
+            _active_profilers -= 1
+            if not _active_profilers:
+                _node_stacks.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        nodes = tuple(_node_stacks.get(self.thread_id, ()))
+
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            # Everything above the innermost node is the engine getting there
+            if nodes and frame.f_code.co_name == "state_execute":
+                break
+            frame = frame.f_back
+        codes.reverse()
+        self.samples[(nodes, tuple(codes))] += 1
+
+    def collapsed(self) -> list[tuple[str, int]]:
+        """(stack, samples) in the collapsed format flamegraph tools read, heaviest first."""
+        stacks = Counter()
+        for (nodes, codes), count in self.samples.items():
+            labels = [f"node:{node}" for node in nodes] or [ENGINE_LABEL]
+            stacks[";".join(labels + [_frame_label(code) for code in codes])] += count
+        return stacks.most_common()
+
+    def node_samples(self) -> dict[str, int]:
+        """Samples per node, counted for the innermost node only."""
+        totals = Counter()
+        for (nodes, _), count in self.samples.items():
+            totals[nodes[-1] if nodes else ENGINE_LABEL] += count
+        return dict(totals.most_common())
+
+    def to_dict(self, max_bytes: int = None) -> dict:
+        interval_ms = self.interval * 1000
+        collapsed = self.collapsed()
+        total = sum(count for _, count in collapsed)
+
+        lines = []
+        size = 0
+        truncated = False
+        for stack, count in collapsed:
+            line = f"{stack} {count}"
+            size += len(line.encode('utf-8')) + 1
+            if max_bytes is not None and size > max_bytes:
+                truncated = True
+                break
+            lines.append(line)
+
+        return {
+            "interval_ms": interval_ms,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": total,
+            "nodes": {
+                label: {"samples": count, "ms": round(count * interval_ms, 3)}
+                for label, count in self.node_samples().items()
+            },
+            "collapsed": "\n".join(lines),
+            "truncated": truncated,
+        }
+
+
+async def profiled(coroutine, profiler: SamplingProfiler | None):
+    """Await `coroutine`, sampled by `profiler` on the thread running the event loop."""
+    if profiler is None:
+        return await coroutine
+    profiler.start()
+    try:
+        return await coroutine
+    finally:
+        profiler.stop()
+
+
+def save_profile(profiler: SamplingProfiler, storage, flow_id: str, run_id: str):
+    """
+    Store the profile next to the run's results, and write the full
+    collapsed stacks to NODE_RUNNER_PROFILE_DIR when that is set. Never
+    raises: a failing profile must not fail the run.
+    """
+    try:
+        directory = os.getenv("NODE_RUNNER_PROFILE_DIR")
+        if directory:
+            path = os.path.join(directory, f"{flow_id}-{run_id}.folded")
+            with open(path, "w") as file:
+                file.write(profiler.to_dict()["collapsed"] + "\n")
+            logger.info("Profile written to %s", path)
+
+        profile = profiler.to_dict(max_bytes=MAX_STORED_PROFILE_BYTES)
+        storage.store_profile_result(flow_id, run_id, profile)
+        logger.info("Profile stored: %d samples over %.0fms", profile["samples"], profile["duration_ms"])
+    except Exception as e:
+        logger.warning("Saving the profile failed (ignored): %s", e)
@@ -0,0 +1,122 @@
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+
+# Root of the loggers configured here; modules use logging.getLogger(__name__)
+PACKAGE_LOGGER = "polysynergy_node_runner"
+
+# NODE_RUNNER_LOG_LEVEL accepts the standard level names plus "quiet", the
+# production level: only warnings and errors. The execution trace (node
+# executes, traversals, killers, flow events) is logged at DEBUG, so at
+# INFO and above those records are never built or formatted.
+LEVEL_QUIET = "quiet"
+DEFAULT_LEVEL = "INFO"
+
+FORMAT_JSON = "json"
+FORMAT_TEXT = "text"
+
+# Per-run correlation fields, added to every record by RunContextFilter.
+# asyncio tasks copy the context they are created in, so binding these in
+# the entry point covers everything a run does.
+current_run_id: contextvars.ContextVar[str | None] = contextvars.ContextVar('log_run_id', default=None)
+current_flow_id: contextvars.ContextVar[str | None] = contextvars.ContextVar('log_flow_id', default=None)
+current_node_id: contextvars.ContextVar[str | None] = contextvars.ContextVar('log_node_id', default=None)
+current_request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar('log_request_id', default=None)
+
+CORRELATION_FIELDS = {
+    'run_id': current_run_id,
+    'flow_id': current_flow_id,
+    'node_id': current_node_id,
+    'request_id': current_request_id,
+}
+
+# Attributes every LogRecord has; anything else was passed in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def bind_run_context(run_id: str = None, flow_id: str = None, request_id: str = None):
+    """Set the correlation fields of the current run (None leaves a field unchanged)."""
+    if run_id is not None:
+        current_run_id.set(run_id)
+    if flow_id is not None:
+        current_flow_id.set(flow_id)
+    if request_id is not None:
+        current_request_id.set(request_id)
+
+
+def get_log_level(value: str = None) -> int:
+    value = (value or os.getenv("NODE_RUNNER_LOG_LEVEL", DEFAULT_LEVEL)).strip()
+    if value.lower() == LEVEL_QUIET:
+        return logging.WARNING
+
+    level = logging.getLevelName(value.upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+class RunContextFilter(logging.Filter):
+    """
+    Adds the correlation fields to each record. Filters only run for records
+    that passed the level check, so disabled levels cost nothing here.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in CORRELATION_FIELDS.items():
+            if not hasattr(record, name):
+                setattr(record, name, var.get())
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for CloudWatch Logs Insights and the like."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and value is not None:
+                entry[name] = value
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(levelname)s %(name)s [run=%(run_id)s node=%(node_id)s] %(message)s')
+
+
+def configure_run_logging(level: str = None, log_format: str = None, stream=None) -> logging.Logger:
+    """
+    Configure the package logger from NODE_RUNNER_LOG_LEVEL and
+    NODE_RUNNER_LOG_FORMAT (`json`, default, or `text`). Safe to call more
+    than once; the handler is replaced rather than added again.
+    """
+    log_format = (log_format or os.getenv("NODE_RUNNER_LOG_FORMAT", FORMAT_JSON)).lower()
+
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    package_logger.setLevel(get_log_level(level))
+
+    for handler in list(package_logger.handlers):
+        if getattr(handler, '_run_logging', False):
+            package_logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler._run_logging = True
+    handler.addFilter(RunContextFilter())
+    handler.setFormatter(TextFormatter() if log_format == FORMAT_TEXT else JsonFormatter())
+    package_logger.addHandler(handler)
+
+    # The Lambda runtime puts its own handler on the root logger; propagating
+    # would write every line twice
+    package_logger.propagate = False
+    return package_logger
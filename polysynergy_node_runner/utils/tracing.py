@@ -0,0 +1,334 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+# Spans follow the OpenTelemetry data model and are exported as OTLP/JSON,
+# so any collector (or a file replayed into one) can read them. There is no
+# dependency on the OpenTelemetry SDK. NODE_RUNNER_TRACE_EXPORTER selects
+# where spans go:
+# - none:   tracing off (default); spans are a shared no-op object
+# - memory: kept in memory (tests, local inspection)
+# - file:   one OTLP/JSON export request per line in NODE_RUNNER_TRACE_FILE
+# - otlp:   POSTed to OTEL_EXPORTER_OTLP_TRACES_ENDPOINT (or
+#           OTEL_EXPORTER_OTLP_ENDPOINT + /v1/traces)
+EXPORTER_NONE = "none"
+EXPORTER_MEMORY = "memory"
+EXPORTER_FILE = "file"
+EXPORTER_OTLP = "otlp"
+
+DEFAULT_TRACE_FILE = "/tmp/polysynergy-traces.jsonl"
+DEFAULT_SERVICE_NAME = "polysynergy-node-runner"
+SCOPE_NAME = "polysynergy_node_runner"
+# Finished spans are exported in batches of this size, and at flush()
+MAX_EXPORT_BATCH_SIZE = 512
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar('current_span', default=None)
+
+
+class SpanContext:
+    __slots__ = ('trace_id', 'span_id')
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+def parse_traceparent(value: str | None) -> SpanContext | None:
+    """Parse a W3C `traceparent` header, e.g. from the request that started the run."""
+    if not value:
+        return None
+    parts = value.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_attribute_value(v) for v in value]}}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_span_id: str | None,
+                 kind: int, attributes: dict | None):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.status_code = STATUS_UNSET
+        self.status_message = None
+        self.start_time = time.time_ns()
+        self.end_time: int | None = None
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_status(self, code: int, message: str = None):
+        self.status_code = code
+        self.status_message = message
+
+    def record_exception(self, exception: BaseException):
+        self.attributes['exception.type'] = type(exception).__name__
+        self.attributes['exception.message'] = str(exception)
+        self.set_status(STATUS_ERROR, str(exception))
+
+    def activate(self) -> "Span":
+        """Make this the parent of spans started in the current context, until end()."""
+        if self._token is None:
+            self._token = current_span.set(self)
+        return self
+
+    def end(self):
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        if self._token is not None:
+            try:
+                current_span.reset(self._token)
+            except ValueError:
+                # Ended in another context than it was activated in
+                pass
+            self._token = None
+        self.tracer._on_end(self)
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        return False
+
+    def to_otlp(self) -> dict:
+        span = {
+            'traceId': self.context.trace_id,
+            'spanId': self.context.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time or self.start_time),
+            'attributes': [{'key': k, 'value': _attribute_value(v)} for k, v in self.attributes.items() if v is not None],
+            'status': {'code': self.status_code},
+        }
+        if self.parent_span_id:
+            span['parentSpanId'] = self.parent_span_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is off, so call sites never need to check."""
+    context = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_status(self, code: int, message: str = None):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+    def activate(self):
+        return self
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    def export(self, spans: list[Span]):
+        raise NotImplementedError()
+
+
+def to_otlp_request(spans: list[Span], service_name: str) -> dict:
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+            'scopeSpans': [{
+                'scope': {'name': SCOPE_NAME},
+                'spans': [span.to_otlp() for span in spans],
+            }],
+        }],
+    }
+
+
+class InMemorySpanExporter(SpanExporter):
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]):
+        self.spans.extend(spans)
+
+    def clear(self):
+        self.spans.clear()
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends each export as one OTLP/JSON request per line; replayable into a collector."""
+
+    def __init__(self, path: str, service_name: str = DEFAULT_SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]):
+        line = json.dumps(to_otlp_request(spans, self.service_name), default=str)
+        with self._lock, open(self.path, 'a') as file:
+            file.write(line + '\n')
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    def __init__(self, endpoint: str, service_name: str = DEFAULT_SERVICE_NAME, timeout: float = 5):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(to_otlp_request(spans, self.service_name), default=str).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter | None):
+        self.exporter = exporter
+        self.enabled = exporter is not None
+        self._pending: list[Span] = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: int = KIND_INTERNAL, attributes: dict = None,
+                   parent: Span | SpanContext | None = None) -> Span | _NoopSpan:
+        """
+        Start a span, child of `parent` or else of the current span. It is not
+        activated; use it as a context manager, or call activate() and end().
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        if parent is None:
+            parent = current_span.get()
+        if isinstance(parent, Span):
+            parent = parent.context
+
+        if parent is not None:
+            context = SpanContext(parent.trace_id, os.urandom(8).hex())
+            parent_span_id = parent.span_id
+        else:
+            context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex())
+            parent_span_id = None
+
+        return Span(self, name, context, parent_span_id, kind, attributes)
+
+    def span(self, name: str, kind: int = KIND_INTERNAL, attributes: dict = None) -> Span | _NoopSpan:
+        """Shorthand for `with tracer.span(...)` around an external call."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return self.start_span(name, kind, attributes)
+
+    def _on_end(self, span: Span):
+        with self._lock:
+            self._pending.append(span)
+            full = len(self._pending) >= MAX_EXPORT_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Export all finished spans now (at the end of a run, before the process may be frozen)."""
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if not spans or self.exporter is None:
+            return
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning("Exporting %d span(s) failed (ignored): %s", len(spans), e)
+
+
+def _create_exporter() -> SpanExporter | None:
+    exporter = os.getenv("NODE_RUNNER_TRACE_EXPORTER", EXPORTER_NONE).lower()
+    service_name = os.getenv("OTEL_SERVICE_NAME", DEFAULT_SERVICE_NAME)
+
+    if exporter == EXPORTER_MEMORY:
+        return InMemorySpanExporter()
+    if exporter == EXPORTER_FILE:
+        return JsonFileSpanExporter(os.getenv("NODE_RUNNER_TRACE_FILE", DEFAULT_TRACE_FILE), service_name)
+    if exporter == EXPORTER_OTLP:
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+        if not endpoint:
+            endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip('/') + "/v1/traces"
+        return OtlpHttpSpanExporter(endpoint, service_name)
+    return None
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(_create_exporter())
+    return _tracer
+
+
+def set_tracer(tracer: Tracer | None):
+    """Replace the process tracer (None re-reads the environment on next use)."""
+    global _tracer
+    _tracer = tracer
+
+
+def flush_traces():
+    if _tracer is not None and _tracer.enabled:
+        _tracer.flush()
+
+
+def inject_traceparent(headers: dict) -> dict:
+    """Add the current span as `traceparent`, so the called service continues the trace."""
+    span = current_span.get()
+    if span is not None:
+        headers['traceparent'] = span.context.to_traceparent()
+    return headers
@@ -233,7 +233,7 @@ EXPECTED_PATTERNS = {
         "run_id = str(uuid.uuid4())"
     ],
     "execution_environment": [
-        "def create_execution_environment(mock = False, run_id:str = \"\", stage:str=None, sub_stage:str=None, trigger_node_id:str=None):",
+        "def create_execution_environment(mock = False, run_id:str = \"\", stage:str=None, sub_stage:str=None, trigger_node_id:str=None, has_listener:bool=None):",
         "storage.clear_previous_execution(NODE_SETUP_VERSION_ID, current_run_id=run_id)",
         "node_context = Context("
     ]
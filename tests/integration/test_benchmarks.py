@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks.graphs import SCENARIOS
+from benchmarks.run import PHASES, compare, run_scenario
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBenchmarks:
+
+    @pytest.mark.parametrize("name, executed", [
+        ("chain", 3),
+        ("fan_out", 4),
+        ("diamonds", 10),
+        ("nested_groups", 8),
+        # The loop node, and five body nodes plus the loop end per item
+        ("list_loop", 19),
+        # Only one path through the tree runs
+        ("branch_tree", 4),
+    ])
+    def test_scenarios_generate_and_run(self, name, executed):
+        result = run_scenario(name, size=3, repeat=1)
+
+        assert result["executed"] == executed
+        assert set(result["phases"]) == set(PHASES)
+        assert all(ms >= 0 for ms in result["phases"].values())
+
+    def test_every_scenario_is_covered(self):
+        assert set(SCENARIOS) == {"chain", "fan_out", "diamonds", "nested_groups", "list_loop", "branch_tree"}
+
+    def test_compare_flags_slow_phases_and_changed_runs(self):
+        baseline = {
+            "chain": {"size": 3, "executed": 3, "phases": {"codegen": 10.0, "execution": 0.2}},
+            "fan_out": {"size": 3, "executed": 4, "phases": {"codegen": 10.0}},
+        }
+        results = {
+            # execution is slower, but under the noise floor
+            "chain": {"size": 3, "executed": 3, "phases": {"codegen": 16.0, "execution": 0.5}},
+            "fan_out": {"size": 3, "executed": 2, "phases": {"codegen": 10.0}},
+        }
+
+        regressions = compare(results, baseline, tolerance=1.5)
+
+        assert regressions == [
+            "chain.codegen: 16.00ms, baseline 10.00ms",
+            "fan_out: executed 2 nodes, baseline 4",
+        ]
@@ -0,0 +1,83 @@
+import contextlib
+import io
+
+import pytest
+from unittest.mock import patch
+
+from polysynergy_node_runner.services.codegen import batch_codegen
+from polysynergy_node_runner.services.codegen.batch_codegen import CodegenJob, generate_code_batch
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.services.codegen.steps import node_source_index, unify_node_code
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import discover_node_code
+from polysynergy_node_runner.services.codegen.steps.node_source_index import NodeSourceIndex
+from polysynergy_node_runner.services.codegen.steps.transform_node_code import transform_node_code
+from tests.fixtures.codegen_samples import CONNECTED_NODES_WORKFLOW, SIMPLE_NODE_WORKFLOW
+
+BROKEN_WORKFLOW = {"nodes": [{"id": "node-1", "type": "broken"}], "connections": []}
+
+
+def generate_batch(jobs, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generate_code_batch(jobs, **kwargs)
+
+
+@pytest.mark.unit
+class TestBatchCodegen:
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_results_match_serial_codegen_in_job_order(self, max_workers):
+        jobs = [
+            (SIMPLE_NODE_WORKFLOW, "version-1"),
+            CodegenJob(CONNECTED_NODES_WORKFLOW, "version-2", {"base": "{{ content }}"}),
+            (SIMPLE_NODE_WORKFLOW, "version-3"),
+        ]
+
+        report = generate_batch(jobs, max_workers=max_workers)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [generate_code_from_json(SIMPLE_NODE_WORKFLOW, "version-1"),
+                        generate_code_from_json(CONNECTED_NODES_WORKFLOW, "version-2", {"base": "{{ content }}"}),
+                        generate_code_from_json(SIMPLE_NODE_WORKFLOW, "version-3")]
+        assert [r.id for r in report.results] == ["version-1", "version-2", "version-3"]
+        assert [r.code for r in report.results] == expected
+        assert report.workers == max_workers
+        assert all(r.ok and r.seconds > 0 for r in report.results)
+
+    def test_failing_job_is_reported_without_stopping_the_batch(self):
+        report = generate_batch([(BROKEN_WORKFLOW, "broken"), (SIMPLE_NODE_WORKFLOW, "version-1")], max_workers=1)
+
+        assert [r.id for r in report.failed] == ["broken"]
+        assert report.failed[0].error.startswith("KeyError")
+        assert report.results[1].ok
+        assert "1 failed" in report.format()
+
+    def test_node_classes_are_unified_once_per_batch(self):
+        jobs = [(CONNECTED_NODES_WORKFLOW, f"version-{i}") for i in range(5)]
+        unique_classes = {(n["path"], n.get("version", 0.0)) for n in CONNECTED_NODES_WORKFLOW["nodes"]}
+        unify_node_code._transformed.clear()
+
+        with patch(
+            "polysynergy_node_runner.services.codegen.steps.unify_node_code.transform_node_code",
+            wraps=transform_node_code,
+        ) as transform:
+            generate_batch(jobs, max_workers=1)
+
+        assert transform.call_count == len(unique_classes)
+
+    def test_workers_are_primed_with_the_shared_node_sources(self, tmp_path, monkeypatch):
+        node_file = tmp_path / "polysynergy_nodes" / "math" / "add.py"
+        node_file.parent.mkdir(parents=True)
+        node_file.write_text("class Add: pass\n")
+        monkeypatch.setenv("NODE_PACKAGES", "polysynergy_nodes")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(node_source_index, "_index", None)
+        nd = {"id": "node-1", "type": "add", "path": "polysynergy_nodes.math.add.Add"}
+
+        entries = batch_codegen.unify_shared_node_code([CodegenJob({"nodes": [nd]}, "version-1")])
+        sources = batch_codegen.shared_node_sources(entries)
+        # A fresh process: its own, empty index
+        monkeypatch.setattr(node_source_index, "_index", None)
+        batch_codegen._init_worker(entries, sources)
+
+        with patch.object(NodeSourceIndex, "_scan", side_effect=AssertionError("scanned")):
+            assert discover_node_code(nd) == "class Add: pass\n"
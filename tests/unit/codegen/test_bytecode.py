@@ -0,0 +1,76 @@
+import importlib
+import importlib.util
+import marshal
+import sys
+
+import pytest
+
+from polysynergy_node_runner.services.codegen.bytecode import (
+    HEADER_SIZE,
+    bytecode_path,
+    compile_generated_code,
+    load_bytecode,
+    load_generated_module,
+    write_generated_module,
+)
+
+
+def replace_code(data: bytes, code: str) -> bytes:
+    """Keeps the header (and so the source hash) but swaps the code object."""
+    return data[:HEADER_SIZE] + marshal.dumps(compile(code, "<swapped>", "exec"))
+
+
+@pytest.mark.unit
+class TestBytecode:
+
+    def test_round_trip(self):
+        data = compile_generated_code("VALUE = 41 + 1\n", "generated.py")
+
+        code_object = load_bytecode(data, b"VALUE = 41 + 1\n")
+
+        namespace = {}
+        exec(code_object, namespace)
+        assert namespace["VALUE"] == 42
+        assert code_object.co_filename == "generated.py"
+
+    def test_rejects_other_python_versions_and_changed_source(self):
+        data = compile_generated_code("VALUE = 1\n")
+
+        assert load_bytecode(b"\x00\x00\x0d\x0a" + data[4:]) is None
+        assert load_bytecode(data, b"VALUE = 2\n") is None
+        assert load_bytecode(data[:10]) is None
+
+    def test_written_bytecode_is_used_by_import(self, tmp_path, monkeypatch):
+        source_path = write_generated_module("VALUE = 1\n", tmp_path, "generated_flow_module", bytecode=True)
+        pyc = bytecode_path(source_path)
+        pyc.write_bytes(replace_code(pyc.read_bytes(), "VALUE = 'from bytecode'"))
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        try:
+            module = importlib.import_module("generated_flow_module")
+        finally:
+            sys.modules.pop("generated_flow_module", None)
+
+        assert module.VALUE == "from bytecode"
+
+    def test_loader_falls_back_to_source(self, tmp_path):
+        source_path = write_generated_module("VALUE = 1\n", tmp_path, "flow", bytecode=True)
+        pyc = bytecode_path(source_path)
+
+        pyc.write_bytes(replace_code(pyc.read_bytes(), "VALUE = 'from bytecode'"))
+        assert load_generated_module(source_path, "flow_cached").VALUE == "from bytecode"
+
+        source_path.write_text("VALUE = 2\n")
+        assert load_generated_module(source_path, "flow_stale").VALUE == 2
+
+        pyc.unlink()
+        assert load_generated_module(source_path, "flow_source").VALUE == 2
+        for name in ("flow_cached", "flow_stale", "flow_source"):
+            sys.modules.pop(name, None)
+
+    def test_bytecode_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CODEGEN_BYTECODE", raising=False)
+        assert not bytecode_path(write_generated_module("VALUE = 1\n", tmp_path / "off")).exists()
+
+        monkeypatch.setenv("CODEGEN_BYTECODE", "true")
+        assert bytecode_path(write_generated_module("VALUE = 1\n", tmp_path / "on")).exists()
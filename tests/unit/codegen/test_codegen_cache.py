@@ -0,0 +1,63 @@
+import copy
+
+import pytest
+from unittest.mock import patch
+
+from polysynergy_node_runner.services.codegen import build_executable
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.services.codegen.codegen_cache import (
+    FileSystemCodegenCache,
+    InMemoryCodegenCache,
+    codegen_cache_key,
+    get_codegen_cache,
+)
+from tests.fixtures.codegen_samples import CONNECTED_NODES_WORKFLOW, SIMPLE_NODE_WORKFLOW
+
+
+@pytest.mark.unit
+class TestCodegenCache:
+
+    def test_key_ignores_key_order_and_follows_code(self):
+        reordered = {"connections": [], "nodes": [dict(reversed(list(SIMPLE_NODE_WORKFLOW["nodes"][0].items())))]}
+        changed = copy.deepcopy(SIMPLE_NODE_WORKFLOW)
+        changed["nodes"][0]["code"] += "\n# changed\n"
+
+        assert codegen_cache_key(reordered) == codegen_cache_key(SIMPLE_NODE_WORKFLOW)
+        assert codegen_cache_key(changed) != codegen_cache_key(SIMPLE_NODE_WORKFLOW)
+        assert codegen_cache_key(SIMPLE_NODE_WORKFLOW, {"base": "{{ x }}"}) != codegen_cache_key(SIMPLE_NODE_WORKFLOW)
+
+    def test_hit_skips_generation_and_restores_the_version_id(self):
+        cache = InMemoryCodegenCache()
+        first = generate_code_from_json(CONNECTED_NODES_WORKFLOW, "version-1", cache=cache)
+
+        with patch.object(build_executable, "_generate_code_from_json") as generate:
+            second = generate_code_from_json(CONNECTED_NODES_WORKFLOW, "version-2", cache=cache)
+
+        generate.assert_not_called()
+        assert 'NODE_SETUP_VERSION_ID = "version-1"' in first
+        assert second == first.replace('"version-1"', '"version-2"')
+
+    def test_changed_setup_is_a_miss(self):
+        cache = InMemoryCodegenCache()
+        generate_code_from_json(SIMPLE_NODE_WORKFLOW, "version-1", cache=cache)
+
+        code = generate_code_from_json(CONNECTED_NODES_WORKFLOW, "version-1", cache=cache)
+
+        assert "class OutputNodeV1_0(ExecutableNode):" in code
+
+    def test_file_system_store_round_trip(self, tmp_path):
+        cache = FileSystemCodegenCache(str(tmp_path))
+
+        assert cache.get("ab12") is None
+        cache.set("ab12", "code")
+        assert cache.get("ab12") == "code"
+        assert (tmp_path / "ab" / "ab12.py").exists()
+
+    def test_directory_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CODEGEN_CACHE_DIR", raising=False)
+        assert get_codegen_cache() is None
+
+        monkeypatch.setenv("CODEGEN_CACHE_DIR", str(tmp_path))
+        generate_code_from_json(SIMPLE_NODE_WORKFLOW, "version-1")
+
+        assert len(list(tmp_path.rglob("*.py"))) == 1
@@ -0,0 +1,37 @@
+import pytest
+from polysynergy_node_runner.services.codegen.steps.collect_environment_keys import collect_environment_keys
+
+
+@pytest.mark.unit
+class TestCollectEnvironmentKeys:
+
+    def test_collects_env_and_environment_placeholders(self):
+        nodes = [
+            {
+                "id": "node-1",
+                "path": "polysynergy_nodes.http.http_request.HttpRequest",
+                "variables": [
+                    {"handle": "url", "value": "<environment:API_URL>/users"},
+                    {"handle": "headers", "value": [{"handle": "X-Region", "value": "<env:REGION>"}]},
+                    {"handle": "token", "value": "<secret:not_an_env_var>"},
+                ],
+            }
+        ]
+
+        assert collect_environment_keys(nodes) == ["API_URL", "REGION"]
+
+    def test_collects_variable_environment_node_key(self):
+        nodes = [
+            {
+                "id": "node-1",
+                "path": "polysynergy_nodes.variable.variable_environment.VariableEnvironment",
+                "variables": [{"handle": "true_path", "value": "BASE_URL"}],
+            },
+            {
+                "id": "node-2",
+                "path": "polysynergy_nodes.variable.variable_secret.VariableSecret",
+                "variables": [{"handle": "true_path", "value": "api_key"}],
+            },
+        ]
+
+        assert collect_environment_keys(nodes) == ["BASE_URL"]
@@ -0,0 +1,68 @@
+import pytest
+from polysynergy_node_runner.services.codegen.steps.collect_secret_keys import collect_secret_keys
+
+
+@pytest.mark.unit
+class TestCollectSecretKeys:
+
+    def test_collects_placeholders_from_string_values(self):
+        nodes = [
+            {
+                "id": "node-1",
+                "path": "polysynergy_nodes.http.http_request.HttpRequest",
+                "variables": [
+                    {"handle": "url", "value": "https://api.example.com?key=<secret:api_key>"},
+                    {"handle": "token", "value": "Bearer <sec:bearer_token>"},
+                ],
+            }
+        ]
+
+        assert collect_secret_keys(nodes) == ["api_key", "bearer_token"]
+
+    def test_collects_placeholders_from_nested_values(self):
+        nodes = [
+            {
+                "id": "node-1",
+                "path": "polysynergy_nodes.http.http_request.HttpRequest",
+                "variables": [
+                    {
+                        "handle": "headers",
+                        "value": [
+                            {"handle": "Authorization", "value": "<secret:auth>"},
+                            {"handle": "X-Extra", "value": {"nested": ["<secret:deep>"]}},
+                        ],
+                    },
+                ],
+            }
+        ]
+
+        assert collect_secret_keys(nodes) == ["auth", "deep"]
+
+    def test_collects_variable_secret_node_key(self):
+        nodes = [
+            {
+                "id": "node-1",
+                "path": "polysynergy_nodes.variable.variable_secret.VariableSecret",
+                "variables": [
+                    {"handle": "true_path", "value": "openai_key"},
+                ],
+            }
+        ]
+
+        assert collect_secret_keys(nodes) == ["openai_key"]
+
+    def test_deduplicates_and_skips_groups(self):
+        nodes = [
+            {"id": "group-1", "type": "group", "variables": [{"handle": "x", "value": "<secret:ignored>"}]},
+            {"id": "node-1", "path": "a.b.C", "variables": [{"handle": "x", "value": "<secret:one>"}]},
+            {"id": "node-2", "path": "a.b.C", "variables": [{"handle": "x", "value": "<secret:one> <secret:two>"}]},
+        ]
+
+        assert collect_secret_keys(nodes) == ["one", "two"]
+
+    def test_no_secrets(self):
+        nodes = [
+            {"id": "node-1", "path": "a.b.C", "variables": [{"handle": "x", "value": "plain"}, {"handle": "y", "value": 3}]},
+        ]
+
+        assert collect_secret_keys(nodes) == []
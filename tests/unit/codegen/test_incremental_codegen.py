@@ -0,0 +1,130 @@
+import contextlib
+import io
+
+import pytest
+from unittest.mock import patch
+
+from benchmarks.graphs import diamonds, nested_groups
+from polysynergy_node_runner.services.codegen import build_executable
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.services.codegen.incremental import IncrementalCodegen
+
+
+def quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def edit_variable(node_setup):
+    node_setup["nodes"][2]["variables"] = [{"handle": "value", "type": "int", "value": 7}]
+
+
+def add_connection(node_setup):
+    nodes = node_setup["nodes"]
+    node_setup["connections"].append({
+        "id": "added", "sourceNodeId": nodes[0]["id"], "sourceHandle": "value",
+        "targetNodeId": nodes[-1]["id"], "targetHandle": "left",
+    })
+
+
+def remove_node(node_setup):
+    removed = node_setup["nodes"].pop()
+    node_setup["connections"] = [
+        c for c in node_setup["connections"] if removed["id"] not in (c["sourceNodeId"], c["targetNodeId"])
+    ]
+
+
+def rewire_group(node_setup):
+    boundary = next(c for c in node_setup["connections"] if c.get("targetGroupId") == c["targetNodeId"])
+    boundary["sourceHandle"] = "true_path"
+
+
+@pytest.mark.unit
+class TestIncrementalCodegen:
+
+    @pytest.mark.parametrize("mode", ["code", "table"])
+    @pytest.mark.parametrize("graph, edits", [
+        (diamonds, [edit_variable, add_connection, remove_node]),
+        (nested_groups, [edit_variable, add_connection, rewire_group, remove_node]),
+    ])
+    def test_every_generation_matches_a_full_generation(self, graph, edits, mode):
+        node_setup, _ = graph(3)
+        codegen = IncrementalCodegen(mode)
+
+        for version, edit in enumerate([None, *edits]):
+            if edit is not None:
+                # The caller's JSON is edited in place, as an editor would
+                edit(node_setup)
+
+            code = quietly(codegen.generate, node_setup, f"version-{version}")
+
+            assert code == quietly(generate_code_from_json, node_setup, f"version-{version}", mode=mode)
+
+    def test_only_changed_fragments_are_built(self):
+        node_setup, _ = diamonds(3)
+        codegen = IncrementalCodegen()
+        quietly(codegen.generate, node_setup, "version-1")
+        total = codegen.fragments.built
+
+        edit_variable(node_setup)
+        quietly(codegen.generate, node_setup, "version-2")
+
+        assert codegen.fragments.built == 1
+        assert codegen.fragments.reused == total - 1
+
+    def test_nodes_with_a_before_codegen_hook_are_always_rebuilt(self):
+        node_setup, _ = diamonds(1)
+        hooked_path = node_setup["nodes"][0]["path"]
+        calls = []
+
+        class Hooked:
+            @staticmethod
+            def before_codegen(nd, nodes, connections):
+                calls.append(nd["id"])
+                return {"_generated": len(calls)}
+
+        def load(path):
+            return Hooked if path == hooked_path else None
+
+        codegen = IncrementalCodegen()
+        with patch.object(build_executable, "_load_node_class_for_hook", side_effect=load):
+            quietly(codegen.generate, node_setup, "version-1")
+            code = quietly(codegen.generate, node_setup, "version-2")
+
+        hooked = [nd for nd in node_setup["nodes"] if nd.get("path") == hooked_path]
+        assert len(calls) == 2 * len(hooked)
+        assert codegen.fragments.built == len(hooked)
+        assert f"._generated = {len(calls)}" in code
+
+    def test_hooks_do_not_edit_the_callers_setup(self):
+        node_setup, _ = diamonds(1)
+        edit_variable(node_setup)
+        hooked_path = node_setup["nodes"][0]["path"]
+
+        class Hooked:
+            @staticmethod
+            def before_codegen(nd, nodes, connections):
+                for node in nodes:
+                    for variable in node.get("variables", []):
+                        variable["value"] = "edited"
+
+        def load(path):
+            return Hooked if path == hooked_path else None
+
+        codegen = IncrementalCodegen()
+        with patch.object(build_executable, "_load_node_class_for_hook", side_effect=load):
+            quietly(codegen.generate, node_setup, "version-1")
+
+        assert node_setup["nodes"][2]["variables"] == [{"handle": "value", "type": "int", "value": 7}]
+
+    def test_failed_generation_keeps_the_previous_fragments(self):
+        node_setup, _ = diamonds(1)
+        codegen = IncrementalCodegen()
+        quietly(codegen.generate, node_setup, "version-1")
+        total = codegen.fragments.built
+
+        with pytest.raises(KeyError):
+            quietly(codegen.generate, {"nodes": [{"id": "broken", "type": "broken"}]}, "version-2")
+        quietly(codegen.generate, node_setup, "version-3")
+
+        assert codegen.fragments.reused == total
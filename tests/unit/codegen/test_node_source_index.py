@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from polysynergy_node_runner.services.codegen.steps import node_source_index
+from polysynergy_node_runner.services.codegen.steps.build_nodes_code import discover_node_code
+from polysynergy_node_runner.services.codegen.steps.node_source_index import NodeSourceIndex
+
+
+def write_node(root: Path, module_path: str, code: str) -> Path:
+    file = root / (module_path.replace(".", "/") + ".py")
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(code)
+    return file
+
+
+@pytest.mark.unit
+class TestNodeSourceIndex:
+
+    def test_source_is_read_once(self, tmp_path):
+        write_node(tmp_path, "polysynergy_nodes.math.add", "class Add: pass\n")
+        index = NodeSourceIndex(["polysynergy_nodes"], [tmp_path])
+
+        with patch.object(Path, "read_text", autospec=True, side_effect=Path.read_text) as read_text:
+            first = index.get("polysynergy_nodes.math.add")
+            second = index.get("polysynergy_nodes.math.add")
+
+        assert first is second
+        assert first.code == "class Add: pass\n"
+        assert read_text.call_count == 1
+
+    def test_changed_file_is_reread(self, tmp_path):
+        file = write_node(tmp_path, "polysynergy_nodes.math.add", "class Add: pass\n")
+        index = NodeSourceIndex(["polysynergy_nodes"], [tmp_path], check_interval=0)
+        first_hash = index.get("polysynergy_nodes.math.add").hash
+
+        file.write_text("class Add: value = 1\n")
+        os.utime(file, ns=(0, file.stat().st_mtime_ns + 1_000_000))
+
+        source = index.get("polysynergy_nodes.math.add")
+        assert source.code == "class Add: value = 1\n"
+        assert source.hash != first_hash
+
+    def test_new_file_is_found_by_a_rescan(self, tmp_path):
+        index = NodeSourceIndex(["polysynergy_nodes"], [tmp_path], check_interval=0)
+        assert index.get("polysynergy_nodes.math.add") is None
+
+        write_node(tmp_path, "polysynergy_nodes.math.add", "class Add: pass\n")
+
+        assert index.get("polysynergy_nodes.math.add").code == "class Add: pass\n"
+
+    def test_first_search_path_wins(self, tmp_path):
+        write_node(tmp_path / "dev", "polysynergy_nodes.math.add", "dev\n")
+        write_node(tmp_path / "app", "polysynergy_nodes.math.add", "app\n")
+        index = NodeSourceIndex(["polysynergy_nodes"], [tmp_path / "dev", tmp_path / "app"])
+
+        assert index.get("polysynergy_nodes.math.add").code == "dev\n"
+
+    def test_primed_sources_are_served_without_a_scan(self, tmp_path):
+        write_node(tmp_path, "polysynergy_nodes.math.add", "class Add: pass\n")
+        index = NodeSourceIndex(["polysynergy_nodes"], [tmp_path])
+        index.get("polysynergy_nodes.math.add")
+        sources = index.loaded_sources(["polysynergy_nodes.math.add", "polysynergy_nodes.math.sub"])
+        primed = NodeSourceIndex(["polysynergy_nodes"], [tmp_path], check_interval=0)
+
+        primed.prime(sources)
+        with patch.object(NodeSourceIndex, "_scan", side_effect=AssertionError("scanned")):
+            assert primed.get("polysynergy_nodes.math.add").code == "class Add: pass\n"
+
+        assert list(sources) == ["polysynergy_nodes.math.add"]
+
+    def test_discovery_uses_the_index_and_falls_back_to_stored_code(self, tmp_path, monkeypatch):
+        write_node(tmp_path, "polysynergy_nodes.math.add", "live\n")
+        monkeypatch.setenv("NODE_PACKAGES", "polysynergy_nodes")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(node_source_index, "_index", None)
+
+        assert discover_node_code({"path": "polysynergy_nodes.math.add.Add", "code": "stored\n"}) == "live\n"
+        assert discover_node_code({"path": "polysynergy_nodes.math.sub.Sub", "code": "stored\n"}) == "stored\n"
+        assert discover_node_code({"path": "other_nodes.math.add.Add", "code": "stored\n"}) == "stored\n"
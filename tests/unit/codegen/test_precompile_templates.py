@@ -0,0 +1,129 @@
+import contextlib
+import io
+import json
+import types
+
+import jinja2
+import pytest
+
+from benchmarks.graphs import chain
+from benchmarks.stubs import in_memory_services
+from polysynergy_node_runner.execution_context import replace_placeholders as placeholders
+from polysynergy_node_runner.execution_context.replace_placeholders import register_precompiled_templates, \
+    replace_placeholders, set_project_templates
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.services.codegen.steps.precompile_templates import build_precompiled_templates_code, \
+    collect_template_sources
+
+PROJECT_TEMPLATES = {
+    "base": "<h1>{% block title %}Default{% endblock %}</h1>{% block body %}{% endblock %}",
+    "macros": "{% macro item(value) %}<li>{{ value | upper }}</li>{% endmacro %}",
+}
+
+PAGE = (
+    '{% extends "base" %}{% import "macros" as m %}'
+    '{% block title %}{{ title }}{% endblock %}'
+    '{% block body %}<ul>{% for user in users %}{{ m.item(user.name) }}{% endfor %}</ul>{% endblock %}'
+)
+
+VALUES = {"title": "Users", "users": [{"name": "ada"}, {"name": "bob"}]}
+
+
+def load_precompiled(templates: dict, sources: list, version: str = None):
+    code = build_precompiled_templates_code(templates, sources)
+    if version is not None:
+        code = code.replace(repr(jinja2.__version__), repr(version))
+    exec(compile(code, "precompiled_templates", "exec"), {})
+    return code
+
+
+@pytest.fixture(autouse=True)
+def reset_templates():
+    yield
+    set_project_templates({})
+    register_precompiled_templates(jinja2.__version__)
+
+
+@pytest.fixture
+def no_parsing(monkeypatch):
+    def from_string(*args, **kwargs):
+        raise AssertionError("template was parsed at runtime")
+
+    monkeypatch.setattr(placeholders.jinja_env, "from_string", from_string)
+    monkeypatch.setattr(placeholders.ProjectTemplateLoader, "get_source", from_string)
+
+
+@pytest.mark.unit
+class TestPrecompileTemplates:
+
+    def test_renders_like_parsed_templates(self):
+        set_project_templates(PROJECT_TEMPLATES)
+        expected = replace_placeholders(PAGE, VALUES)
+
+        load_precompiled(PROJECT_TEMPLATES, [PAGE])
+
+        assert replace_placeholders(PAGE, VALUES) == expected == "<h1>Users</h1><ul><li>ADA</li><li>BOB</li></ul>"
+
+    def test_renders_without_parsing(self, no_parsing):
+        data = {"greeting": "Hi {{ name }}", "count": 2}
+        load_precompiled(PROJECT_TEMPLATES, [PAGE, json.dumps(data)])
+
+        assert replace_placeholders(PAGE, VALUES) == "<h1>Users</h1><ul><li>ADA</li><li>BOB</li></ul>"
+        assert replace_placeholders(data, {"name": "Ada"}) == {"greeting": "Hi Ada", "count": 2}
+
+    def test_precompiled_templates_keep_strict_undefined(self, no_parsing):
+        load_precompiled({}, ["{{ missing }}"])
+
+        with pytest.raises(jinja2.UndefinedError):
+            replace_placeholders("{{ missing }}", {})
+
+    def test_other_jinja_version_parses_from_source(self):
+        set_project_templates(PROJECT_TEMPLATES)
+        load_precompiled(PROJECT_TEMPLATES, [PAGE], version="0.0.0")
+
+        assert placeholders._precompiled_inline == {}
+        assert replace_placeholders(PAGE, VALUES) == "<h1>Users</h1><ul><li>ADA</li><li>BOB</li></ul>"
+
+    def test_templates_that_do_not_compile_are_left_out(self):
+        code = build_precompiled_templates_code({"broken": "{% if %}"}, ["{{ value | no_such_filter }}", "{{ ok }}"])
+
+        assert "'broken'" not in code
+        assert "project={}" in code
+        assert code.count("def _jinja_template_") == 1
+
+    def test_nothing_to_precompile_emits_nothing(self):
+        assert build_precompiled_templates_code({}, []) == ""
+
+    def test_collects_static_template_values(self):
+        nodes = [{
+            "id": "n1",
+            "variables": [
+                {"handle": "body", "type": "str", "value": "Hello {{ user.name }}"},
+                {"handle": "plain", "type": "str", "value": "no template"},
+                {"handle": "secret", "type": "str", "value": "{{ a }} <secret:api_key>"},
+                {"handle": "headers", "type": "dict", "value": [{"handle": "auth", "value": "{{ token }}"}]},
+                {"handle": "true_path", "type": "true_path", "value": "{{ x }}"},
+            ],
+        }]
+
+        assert collect_template_sources(nodes) == sorted(["Hello {{ user.name }}", '{"auth": "{{ token }}"}'])
+
+    def test_generated_code_registers_precompiled_templates(self, monkeypatch):
+        node_setup, _ = chain(2)
+        node_setup["nodes"][1]["variables"] = [{"handle": "body", "type": "str", "value": PAGE}]
+
+        monkeypatch.delenv("CODEGEN_PRECOMPILE_TEMPLATES", raising=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain_code = generate_code_from_json(node_setup, "precompiled", PROJECT_TEMPLATES)
+            monkeypatch.setenv("CODEGEN_PRECOMPILE_TEMPLATES", "true")
+            code = generate_code_from_json(node_setup, "precompiled", PROJECT_TEMPLATES)
+
+        assert "register_precompiled_templates(" not in plain_code
+        assert "register_precompiled_templates(" in code
+
+        with in_memory_services():
+            module = types.ModuleType("precompiled_templates_flow")
+            exec(compile(code, module.__name__, "exec"), module.__dict__)
+
+        assert set(placeholders._precompiled_project) == set(PROJECT_TEMPLATES)
+        assert set(placeholders._precompiled_inline) == {PAGE}
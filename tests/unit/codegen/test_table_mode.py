@@ -0,0 +1,104 @@
+import contextlib
+import io
+import types
+
+import pytest
+
+from benchmarks.graphs import diamonds, list_loop, nested_groups
+from benchmarks.stubs import in_memory_services
+from polysynergy_node_runner.execution_context.flow_state import FlowState
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json, get_codegen_mode
+
+
+def with_variables(node_setup: dict) -> dict:
+    """Gives a node every kind of starting value build_nodes_code handles."""
+    node = node_setup["nodes"][1]
+    node["flowState"] = FlowState.FLOW_STOP.value
+    node["_hook_value"] = {"generated": True}
+    node["variables"] = [
+        {"handle": "headers", "type": "dict", "value": [{"handle": "a", "value": 1}]},
+        {"handle": "items", "type": "list | None", "value": {}},
+        {"handle": "options", "type": "dict", "value": {}},
+        {"handle": "label", "type": "str", "value": "text"},
+        {"handle": "true_path", "type": "true_path", "value": "yes"},
+    ]
+    mock_node = dict(node_setup["nodes"][0], id="mock-node", handle="mock_node", category="mock")
+    node_setup["nodes"].append(mock_node)
+    return node_setup
+
+
+def create_environment(node_setup: dict, start_node_id: str, mode: str, mock: bool = True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        code = generate_code_from_json(node_setup, f"table-mode-{mode}", mode=mode)
+    module = types.ModuleType(f"table_mode_{mode}")
+    exec(compile(code, module.__name__, "exec"), module.__dict__)
+    return code, module.create_execution_environment(
+        mock, run_id="run-1", stage="mock", sub_stage="mock", trigger_node_id=start_node_id if mock else None,
+    )
+
+
+def describe(state) -> list:
+    def connections(items):
+        return [c.uuid for c in items]
+
+    return [
+        (
+            type(node).__name__,
+            node.id,
+            node.handle,
+            node.stateful,
+            node.path,
+            node.flow_state,
+            {k: v for k, v in vars(node).items() if not k.startswith("_") and k not in ("context", "state", "flow", "factory")},
+            {k: v for k, v in vars(node).items() if k.startswith("_hook")},
+            connections(node.get_driving_connections()),
+            connections(node.get_in_connections()),
+            connections(node.get_out_connections()),
+        )
+        for node in state.nodes
+    ]
+
+
+@pytest.mark.unit
+class TestTableMode:
+
+    @pytest.mark.parametrize("graph", [diamonds, nested_groups, list_loop])
+    @pytest.mark.parametrize("mock", [True, False])
+    def test_builds_the_same_environment_as_generated_code(self, graph, mock):
+        node_setup, start_node_id = graph(3)
+        with_variables(node_setup)
+
+        with in_memory_services():
+            _, (_, _, code_state) = create_environment(node_setup, start_node_id, "code", mock)
+            table_code, (_, _, table_state) = create_environment(node_setup, start_node_id, "table", mock)
+
+        assert "NODE_TABLE = (" in table_code
+        assert "def make_node_" not in table_code
+        assert describe(table_state) == describe(code_state)
+        assert [c.to_dict() for c in table_state.connections] == [c.to_dict() for c in code_state.connections]
+
+    def test_recreated_nodes_do_not_share_values(self):
+        node_setup, start_node_id = diamonds(1)
+        with_variables(node_setup)
+
+        with in_memory_services():
+            _, (_, _, state) = create_environment(node_setup, start_node_id, "table")
+
+        node = state.get_node_by_id(node_setup["nodes"][1]["id"])
+        node.items.append("changed")
+        recreated = node.factory()
+
+        assert recreated is not node
+        assert recreated.items == []
+        assert recreated.get_in_connections() == node.get_in_connections()
+
+    def test_mode_from_environment(self, monkeypatch):
+        monkeypatch.delenv("CODEGEN_MODE", raising=False)
+        assert get_codegen_mode() == "code"
+
+        monkeypatch.setenv("CODEGEN_MODE", "table")
+        assert get_codegen_mode() == "table"
+        assert get_codegen_mode("code") == "code"
+
+        with pytest.raises(ValueError):
+            get_codegen_mode("compact")
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import types
+
+import pytest
+
+from benchmarks.graphs import chain, diamonds, list_loop, nested_groups
+from benchmarks.stubs import in_memory_services
+from polysynergy_node_runner.execution_context import replace_placeholders as placeholders
+from polysynergy_node_runner.execution_context.replace_placeholders import replace_placeholders
+from polysynergy_node_runner.execution_context.utils.traversal import find_node_by_handle_backwards
+from polysynergy_node_runner.services.codegen.build_executable import generate_code_from_json
+from polysynergy_node_runner.services.codegen.steps.build_template_sources import find_template_handles
+
+
+def create_environment(node_setup: dict, start_node_id: str, mock: bool, mode: str = "code"):
+    with contextlib.redirect_stdout(io.StringIO()):
+        code = generate_code_from_json(node_setup, "template-sources", mode=mode)
+    module = types.ModuleType("template_sources_flow")
+    with in_memory_services():
+        exec(compile(code, module.__name__, "exec"), module.__dict__)
+        _, _, state = module.create_execution_environment(
+            mock, run_id="run-1", stage="mock", sub_stage="mock", trigger_node_id=start_node_id if mock else None,
+        )
+    return code, state
+
+
+def referencing_every_handle(node_setup: dict) -> tuple[dict, str]:
+    """Gives every node a template referencing every handle, and a mock node that shadows one of them."""
+    nodes = node_setup["nodes"]
+    shadowed, target = nodes[0], nodes[-1]
+    mock_node = dict(shadowed, id="mock-node", category="mock")
+    nodes.append(mock_node)
+    node_setup["connections"].append({
+        "id": "mock-node->target",
+        "sourceNodeId": "mock-node",
+        "sourceHandle": "value",
+        "targetNodeId": target["id"],
+        "targetHandle": "value",
+    })
+
+    template = " ".join(f"{{{{ {nd['handle']}.value }}}}" for nd in nodes)
+    for nd in nodes:
+        nd["variables"] = [{"handle": "label", "type": "str", "value": template}]
+    return node_setup, template
+
+
+@pytest.mark.unit
+class TestTemplateSources:
+
+    def test_finds_referenced_handles(self):
+        source = "{{ user.name }} {% for item in items %}{{ item }}{% endfor %}{% set x = 1 %}{{ x }}{{ flow('/a') }}"
+
+        assert find_template_handles(source) == ("items", "user")
+        assert find_template_handles("{% if %}") is None
+
+    @pytest.mark.parametrize("graph", [chain, diamonds, nested_groups, list_loop])
+    @pytest.mark.parametrize("mock", [True, False])
+    def test_resolves_the_nodes_backwards_traversal_finds(self, graph, mock):
+        node_setup, start_node_id = graph(3)
+        node_setup, template = referencing_every_handle(node_setup)
+        _, state = create_environment(node_setup, start_node_id, mock)
+
+        handles = find_template_handles(template)
+        for node in state.nodes:
+            sources = state.get_template_sources(node.id, template)
+            assert sources is not None
+            for handle in handles:
+                found = find_node_by_handle_backwards(node, handle, state.get_node_by_id)
+                expected = found.id if found is not None and found is not node else None
+                assert sources.get(handle) == expected, (node.id, handle)
+
+    def test_table_mode_emits_the_same_sources(self):
+        node_setup, start_node_id = diamonds(2)
+        referencing_every_handle(node_setup)
+        _, code_state = create_environment(node_setup, start_node_id, True)
+        _, table_state = create_environment(node_setup, start_node_id, True, mode="table")
+
+        assert table_state.template_sources == code_state.template_sources != {}
+
+    def test_mock_runs_get_their_own_sources(self):
+        node_setup, start_node_id = diamonds(2)
+        referencing_every_handle(node_setup)
+        code, _ = create_environment(node_setup, start_node_id, True)
+
+        assert "MOCK_TEMPLATE_SOURCES = {" in code
+
+    def test_static_templates_render_without_traversal(self, monkeypatch):
+        node_setup, start_node_id = chain(3)
+        template = "{{ chain_0.true_path }} and {{ chain_1.true_path }}"
+        node_setup["nodes"][2]["variables"] = [{"handle": "label", "type": "str", "value": template}]
+        _, state = create_environment(node_setup, start_node_id, True)
+
+        def traverse(*args, **kwargs):
+            raise AssertionError("traversed at runtime")
+
+        monkeypatch.setattr(placeholders, "find_node_by_handle_backwards", traverse)
+        node = state.get_node_by_id("chain-2")
+
+        assert replace_placeholders(template, node.__dict__, state, node) == "None and None"
+
+    def test_setup_without_templates_emits_no_sources(self):
+        node_setup, start_node_id = chain(3)
+        code, state = create_environment(node_setup, start_node_id, True)
+
+        assert "TEMPLATE_SOURCES" not in code
+        assert state.template_sources == {}
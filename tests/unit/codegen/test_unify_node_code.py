@@ -1,4 +1,7 @@
 import pytest
+from unittest.mock import patch
+
+from polysynergy_node_runner.services.codegen.steps.transform_node_code import transform_node_code
 from polysynergy_node_runner.services.codegen.steps.unify_node_code import unify_node_code
 
 
@@ -212,4 +215,98 @@ class RegularClass:
         # Should still collect imports and do other transformations
         assert "import json" in collected_imports
         assert "class RegularClass:" in result
-        assert "def method(self):" in result
\ No newline at end of file
+        assert "def method(self):" in result
+
+    def test_complex_defaults_and_parentheses_in_strings(self):
+        code = """from typing import (
+    List,
+    Dict,
+)
+
+@node(name="Tricky (node)", category=")")
+class TestNode(Node):
+    # Kept as written
+    text: str = NodeVariableSettings(label="Text (a)", default="a, b)", has_in=True)
+    items: list = NodeVariableSettings(
+        label="Items",
+        dock=dock_property(default="x"),
+        default=[{"k": (1, 2)}, "]"],
+    )
+    flag: bool = PathSettings("Yes", "", True)
+    size: int = NodeVariableSettings(default=max(1, 2))
+    empty: str = NodeVariableSettings(label="Empty")
+"""
+        collected_imports = set()
+
+        result = unify_node_code(code, collected_imports, 1.0)
+
+        assert collected_imports == {"from typing import List, Dict"}
+        assert "@node" not in result
+        assert "class TestNodeV1_0(ExecutableNode):" in result
+        assert "# Kept as written" in result
+        assert 'text: str = "a, b)"' in result
+        assert 'items: list = [{"k": (1, 2)}, "]"]' in result
+        assert "flag: bool = True" in result
+        assert "size: int = max(1, 2)" in result
+        assert "empty: str = None" in result
+
+    def test_nested_imports_are_lifted_to_module_level(self):
+        code = """import json
+
+@node()
+class LiftingNode(Node):
+    def execute(self):
+        import os
+        self.cwd = os.getcwd()
+
+    def read(self):
+        from pathlib import Path
+
+    def other(self):
+        return Path(os.sep)
+"""
+        collected_imports = set()
+
+        result = unify_node_code(code, collected_imports, 1.0)
+
+        assert collected_imports == {"import json", "import os", "from pathlib import Path"}
+        assert "import" not in result
+        assert "    def read(self):\n        pass\n" in result
+        compile(result, "lifting_node", "exec")
+
+    def test_result_is_cached_per_path_and_version(self):
+        code = """import json
+
+@node()
+class CachedNode(Node):
+    pass
+"""
+        with patch(
+            "polysynergy_node_runner.services.codegen.steps.unify_node_code.transform_node_code",
+            wraps=transform_node_code,
+        ) as transform:
+            first_imports, second_imports = set(), set()
+            first = unify_node_code(code, first_imports, 1.0, "nodes.cached.CachedNode")
+            second = unify_node_code(code, second_imports, 1.0, "nodes.cached.CachedNode")
+            unify_node_code(code, set(), 2.0, "nodes.cached.CachedNode")
+            changed = unify_node_code(code + "\n# changed", set(), 1.0, "nodes.cached.CachedNode")
+
+        assert transform.call_count == 3
+        assert second == first
+        assert second_imports == first_imports == {"import json"}
+        assert changed.endswith("# changed")
+
+    def test_unparsable_code_falls_back_to_line_transformation(self):
+        code = """import json
+
+@node()
+class BrokenNode(Node):
+    def execute(self)
+        pass
+"""
+        collected_imports = set()
+
+        result = unify_node_code(code, collected_imports, 1.0)
+
+        assert "class BrokenNodeV1_0(ExecutableNode):" in result
+        assert collected_imports == {"import json"}
@@ -0,0 +1,142 @@
+import json
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import Mock, patch
+
+from polysynergy_node_runner.services.active_listeners_service import ActiveListenersService
+from polysynergy_node_runner.services.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def redis_conn():
+    return Mock()
+
+
+@pytest.fixture
+def service(monkeypatch, redis_conn):
+    monkeypatch.setenv("LISTENER_PRESENCE_REDIS", "true")
+    monkeypatch.setattr(ActiveListenersService, "_listener_cache", TTLCache(ttl=2, maxsize=10))
+    monkeypatch.setattr(ActiveListenersService, "_redis", redis_conn)
+    monkeypatch.setattr(ActiveListenersService, "_ensure_subscriber", classmethod(lambda cls: None))
+    ActiveListenersService._subscribed.clear()
+
+    with patch('boto3.resource'):
+        service = ActiveListenersService()
+    return service
+
+
+def _activated_at(minutes_ago=1):
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).isoformat()
+
+
+def _item(stage, minutes_ago=1):
+    return {"PK": "flow-1", "stage": stage, "last_activated_at": _activated_at(minutes_ago)}
+
+
+def _presence(stage, minutes_ago=1):
+    return json.dumps({"stage": stage, "activated_at": _activated_at(minutes_ago)})
+
+
+@pytest.mark.unit
+class TestActiveListenersService:
+
+    def test_presence_key_answers_without_dynamodb(self, service, redis_conn):
+        redis_conn.get.return_value = _presence("mock")
+
+        assert service.has_listener("flow-1") is True
+        assert service.has_listener("flow-1", required_stage="prod") is False
+        service.table.query.assert_not_called()
+
+    def test_result_is_served_from_cache(self, service, redis_conn):
+        redis_conn.get.return_value = _presence("mock")
+
+        for _ in range(10):
+            assert service.has_listener("flow-1") is True
+
+        redis_conn.get.assert_called_once()
+
+    def test_falls_back_to_dynamodb_and_mirrors_presence(self, service, redis_conn):
+        redis_conn.get.return_value = None
+        service.table.query.return_value = {"Items": [_item("mock")]}
+
+        assert service.has_listener("flow-1") is True
+
+        key, value = redis_conn.set.call_args.args
+        assert key == "flow_listener:flow-1" and json.loads(value)["stage"] == "mock"
+        assert 0 < redis_conn.set.call_args.kwargs["ex"] <= 3600
+
+    def test_presence_key_respects_max_age(self, service, redis_conn):
+        redis_conn.get.return_value = _presence("mock", minutes_ago=90)
+
+        assert service.has_listener("flow-1") is False
+        assert service.has_listener("flow-1", max_age_minutes=120, first_run=True) is True
+        service.table.query.assert_not_called()
+
+    def test_presence_without_activation_time_falls_back_to_dynamodb(self, service, redis_conn):
+        redis_conn.get.return_value = "mock"
+        service.table.query.return_value = {"Items": [_item("mock", minutes_ago=90)]}
+
+        assert service.has_listener("flow-1") is False
+        service.table.query.assert_called_once()
+
+    def test_redis_errors_fall_back_to_dynamodb(self, service, redis_conn):
+        redis_conn.get.side_effect = ConnectionError("down")
+        service.table.query.return_value = {"Items": []}
+
+        assert service.has_listener("flow-1") is False
+        service.table.query.assert_called_once()
+
+    def test_negative_ttl_is_longer_with_live_subscription(self, service, redis_conn, monkeypatch):
+        redis_conn.get.return_value = None
+        service.table.query.return_value = {"Items": []}
+        assert service._negative_ttl() == 2
+
+        ActiveListenersService._subscribed.set()
+        monkeypatch.setenv("LISTENER_NEGATIVE_TTL", "30")
+        try:
+            assert service._negative_ttl() == 30
+        finally:
+            ActiveListenersService._subscribed.clear()
+
+    def test_set_listener_publishes_presence(self, service, redis_conn):
+        service.set_listener("flow-1", "mock")
+
+        pipeline = redis_conn.pipeline.return_value
+        key, value = pipeline.set.call_args.args
+        assert key == "flow_listener:flow-1" and pipeline.set.call_args.kwargs == {"ex": 3600}
+        assert json.loads(value) == {
+            "stage": "mock", "activated_at": service.table.put_item.call_args.kwargs["Item"]["last_activated_at"],
+        }
+        channel, data = pipeline.publish.call_args.args
+        assert channel == "flow_listener_updates"
+        assert json.loads(data) == {"id": "flow-1", "stage": "mock", "active": True}
+        assert service.has_listener("flow-1") is True
+        redis_conn.get.assert_not_called()
+
+    def test_clear_listeners_invalidates_and_publishes(self, service, redis_conn):
+        service.set_listener("flow-1", "mock")
+        service.table.query.return_value = {"Items": []}
+
+        service.clear_listeners("flow-1")
+
+        pipeline = redis_conn.pipeline.return_value
+        pipeline.delete.assert_called_once_with("flow_listener:flow-1")
+        assert json.loads(pipeline.publish.call_args.args[1])["active"] is False
+        assert service._listener_cache.get("flow-1@mock") is None
+
+    def test_presence_messages_update_cache(self, service):
+        service._listener_cache.set("flow-1@mock", False)
+
+        ActiveListenersService.apply_presence_message(json.dumps({"id": "flow-1", "stage": "mock", "active": True}))
+        assert service._listener_cache.get("flow-1@mock") is True
+
+        ActiveListenersService.apply_presence_message(json.dumps({"id": "flow-1", "stage": None, "active": False}))
+        assert service._listener_cache.get("flow-1@mock") is None
+
+    def test_cache_is_bounded(self, service, redis_conn):
+        redis_conn.get.return_value = _presence("mock")
+
+        for i in range(50):
+            service.has_listener(f"flow-{i}")
+
+        assert len(service._listener_cache) == 10
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+
+from polysynergy_node_runner.execution_context.context import Context
+
+
+def _context(active_listeners):
+    return Context(
+        run_id="run-1",
+        node_setup_version_id="flow-1",
+        state=Mock(),
+        flow=Mock(),
+        storage=Mock(),
+        active_listeners=active_listeners,
+        secrets_manager=Mock(),
+        env_var_manager=Mock(),
+    )
+
+
+@pytest.mark.unit
+class TestContextListener:
+
+    def test_resolved_once_per_run(self):
+        active_listeners = Mock()
+        active_listeners.has_listener.return_value = True
+        context = _context(active_listeners)
+
+        context.resolve_listener()
+
+        assert context.has_listener is True
+        active_listeners.has_listener.assert_called_once_with("flow-1", first_run=True)
+
+    def test_listener_resolved_at_run_start_is_not_checked_again(self):
+        active_listeners = Mock()
+        context = _context(active_listeners)
+
+        context.resolve_listener(True)
+
+        assert context.has_listener is True
+        active_listeners.has_listener.assert_not_called()
+
+    def test_failed_check_means_no_listener(self):
+        active_listeners = Mock()
+        active_listeners.has_listener.side_effect = ConnectionError("down")
+        context = _context(active_listeners)
+
+        context.resolve_listener()
+
+        assert context.has_listener is False
+
+    def test_refresh_upgrades_mid_run(self):
+        active_listeners = Mock()
+        active_listeners.has_listener.side_effect = [False, False, True]
+        context = _context(active_listeners)
+
+        async def run():
+            context.resolve_listener()
+            context.start_listener_refresh(interval=0.001)
+            for _ in range(200):
+                if context.has_listener:
+                    break
+                await asyncio.sleep(0.005)
+            context.stop_listener_refresh()
+
+        asyncio.run(run())
+
+        assert context.has_listener is True
+        assert active_listeners.has_listener.call_count == 3
+
+    def test_refresh_is_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("LISTENER_REFRESH_INTERVAL", raising=False)
+        context = _context(Mock())
+
+        async def run():
+            context.start_listener_refresh()
+            return context._listener_refresh_task
+
+        assert asyncio.run(run()) is None
@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import Mock, patch
+from botocore.exceptions import ClientError
+
+from polysynergy_node_runner.services import env_var_manager
+from polysynergy_node_runner.services.env_var_manager import EnvVarManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.delenv("ENV_VARS_CACHE_TTL", raising=False)
+    monkeypatch.setattr(env_var_manager, "_missing_stage_indexes", set())
+    with patch('boto3.client') as mock_boto_client, \
+            patch('polysynergy_node_runner.services.env_var_manager.get_encryption_service', side_effect=ValueError("no key")):
+        mock_boto_client.return_value = Mock()
+        manager = EnvVarManager(region="eu-central-1")
+    return manager
+
+
+def _item(project_id, stage, key, value):
+    return {
+        'PK': {'S': f"envvar#{project_id}#{stage}#{key}"},
+        'project_stage': {'S': f"envvar#{project_id}#{stage}"},
+        'value': {'S': value},
+        'encrypted': {'BOOL': False},
+    }
+
+
+@pytest.mark.unit
+class TestEnvVarManagerLoadStage:
+
+    def test_load_stage_queries_stage_index(self, manager):
+        manager.client.query.return_value = {'Items': [_item('proj', 'prod', 'API_URL', 'https://api')]}
+
+        snapshot = manager.load_stage('proj', 'prod')
+
+        assert snapshot == {'API_URL': 'https://api'}
+        kwargs = manager.client.query.call_args.kwargs
+        assert kwargs['IndexName'] == 'project_stage-index'
+        assert kwargs['ExpressionAttributeValues'] == {':ps': {'S': 'envvar#proj#prod'}}
+
+    def test_load_stage_follows_pagination(self, manager):
+        manager.client.query.side_effect = [
+            {'Items': [_item('proj', 'prod', 'A', '1')], 'LastEvaluatedKey': {'PK': {'S': 'x'}}},
+            {'Items': [_item('proj', 'prod', 'B', '2')]},
+        ]
+
+        assert manager.load_stage('proj', 'prod') == {'A': '1', 'B': '2'}
+        assert manager.client.query.call_args.kwargs['ExclusiveStartKey'] == {'PK': {'S': 'x'}}
+
+    def test_get_var_reads_from_snapshot(self, manager):
+        manager.client.query.return_value = {'Items': [_item('proj', 'prod', 'API_URL', 'https://api')]}
+        manager.load_stage('proj', 'prod')
+
+        for _ in range(3):
+            assert manager.get_var('proj', 'prod', 'API_URL') == 'https://api'
+
+        manager.client.get_item.assert_not_called()
+
+    def test_get_var_falls_back_for_keys_outside_snapshot(self, manager):
+        manager.client.query.return_value = {'Items': [_item('proj', 'prod', 'API_URL', 'https://api')]}
+        manager.client.get_item.return_value = {'Item': {'value': {'S': 'legacy'}, 'encrypted': {'BOOL': False}}}
+        manager.load_stage('proj', 'prod')
+
+        assert manager.get_var('proj', 'prod', 'NOT_INDEXED') == 'legacy'
+        assert manager.get_var('proj', 'mock', 'API_URL') == 'legacy'
+        assert manager.client.get_item.call_count == 2
+
+    def test_missing_index_skips_the_prefetch_for_the_process(self, manager):
+        manager.client.query.side_effect = ClientError(
+            {'Error': {'Code': 'ValidationException', 'Message': 'The table does not have the specified index'}},
+            'Query'
+        )
+        manager.client.get_item.return_value = {'Item': {'value': {'S': '1'}, 'encrypted': {'BOOL': False}}}
+
+        assert manager.load_stage('proj', 'prod') == {}
+        assert manager.load_stage('proj', 'mock') == {}
+
+        assert manager.client.query.call_count == 1
+        manager.client.scan.assert_not_called()
+        assert manager.get_var('proj', 'prod', 'A') == '1'
+
+    def test_other_query_errors_are_raised(self, manager):
+        manager.client.query.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'slow down'}},
+            'Query'
+        )
+
+        with pytest.raises(ClientError):
+            manager.load_stage('proj', 'prod')
+
+        manager.client.scan.assert_not_called()
+        assert env_var_manager._missing_stage_indexes == set()
+
+    def test_keys_may_contain_hashes(self, manager):
+        manager.client.query.return_value = {'Items': [_item('proj', 'prod', 'A#B', '1')]}
+        manager.client.scan.return_value = {'Items': [_item('proj', 'prod', 'A#B', '1')]}
+
+        assert manager.load_stage('proj', 'prod') == {'A#B': '1'}
+        assert manager.list_vars('proj')[0]['key'] == 'A#B'
+        manager.backfill_stage_index()
+        assert manager.client.update_item.call_args.kwargs['ExpressionAttributeValues'] == {':ps': {'S': 'envvar#proj#prod'}}
+
+    def test_set_var_writes_stage_attribute_and_updates_snapshot(self, manager):
+        manager.client.query.return_value = {'Items': [_item('proj', 'prod', 'A', '1')]}
+        manager.client.get_item.return_value = {'Item': {'value': {'S': '2'}, 'encrypted': {'BOOL': False}}}
+        manager.load_stage('proj', 'prod')
+
+        manager.set_var('proj', 'prod', 'A', '2')
+
+        item = manager.client.put_item.call_args.kwargs['Item']
+        assert item['project_stage'] == {'S': 'envvar#proj#prod'}
+        assert manager.get_var('proj', 'prod', 'A') == '2'
+
+    def test_backfill_stage_index(self, manager):
+        manager.client.scan.return_value = {'Items': [{'PK': {'S': 'envvar#proj#prod#A'}}, {'PK': {'S': 'envvar#proj#mock#B'}}]}
+
+        assert manager.backfill_stage_index() == 2
+
+        updates = [c.kwargs['ExpressionAttributeValues'][':ps']['S'] for c in manager.client.update_item.call_args_list]
+        assert updates == ['envvar#proj#prod', 'envvar#proj#mock']
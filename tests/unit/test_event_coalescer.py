@@ -0,0 +1,97 @@
+import pytest
+
+from polysynergy_node_runner.execution_context.event_coalescer import EventCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _event(event, node_id='n1', order=0, status='running', run_id='run-1'):
+    return {'flow_id': 'flow-1', 'run_id': run_id, 'node_id': node_id, 'event': event, 'order': order, 'status': status}
+
+
+def _iteration(coalescer, node_id='n1', status='success'):
+    sent = coalescer.process(_event('start_node', node_id=node_id))
+    sent += coalescer.process(_event('end_node', node_id=node_id, status=status))
+    return sent
+
+
+@pytest.mark.unit
+class TestEventCoalescer:
+
+    def test_first_repeats_pass_through(self):
+        coalescer = EventCoalescer(coalesce_after=3, progress_interval=1, clock=FakeClock())
+
+        sent = [e for _ in range(3) for e in _iteration(coalescer)]
+
+        assert [e['event'] for e in sent] == ['start_node', 'end_node'] * 3
+
+    def test_repeats_are_collapsed_into_progress_summaries(self):
+        clock = FakeClock()
+        coalescer = EventCoalescer(coalesce_after=1, progress_interval=1, clock=clock)
+        _iteration(coalescer)
+
+        clock.now += 2
+        summaries = _iteration(coalescer)
+        assert [e['event'] for e in summaries] == ['node_progress']
+        assert summaries[0]['data'] == {'started': 2, 'finished': 1, 'statuses': {'success': 1}}
+
+        # Within the interval nothing is sent
+        assert [e for _ in range(100) for e in _iteration(coalescer, status='error')] == []
+
+    def test_finish_run_returns_pending_summaries(self):
+        coalescer = EventCoalescer(coalesce_after=1, progress_interval=60, clock=FakeClock())
+        for _ in range(10_000):
+            _iteration(coalescer)
+        _iteration(coalescer, node_id='n2')
+
+        summaries = coalescer.finish_run(_event('run_end', node_id=None))
+
+        assert len(summaries) == 1
+        assert summaries[0]['node_id'] == 'n1'
+        assert summaries[0]['status'] == 'success'
+        assert summaries[0]['data'] == {'started': 10_000, 'finished': 10_000, 'statuses': {'success': 10_000}}
+        assert coalescer.finish_run(_event('run_end', node_id=None)) == []
+
+    def test_lifecycle_events_are_never_limited(self):
+        coalescer = EventCoalescer(coalesce_after=0, max_rate=1, clock=FakeClock())
+
+        for _ in range(5):
+            assert coalescer.process(_event('run_start', node_id=None)) == [_event('run_start', node_id=None)]
+
+    def test_max_rate_per_run(self):
+        clock = FakeClock()
+        coalescer = EventCoalescer(coalesce_after=0, progress_interval=0, max_rate=10, clock=clock)
+
+        sent = [e for i in range(50) for e in coalescer.process(_event('start_node', node_id=f"n{i}", run_id='run-1'))]
+        other_run = coalescer.process(_event('start_node', node_id='n0', run_id='run-2'))
+
+        assert len(sent) == 10
+        assert len(other_run) == 1
+
+        clock.now += 1
+        sent = [e for i in range(50) for e in coalescer.process(_event('start_node', node_id=f"m{i}", run_id='run-1'))]
+        assert len(sent) == 10
+
+        # Everything that was held back is reported at the end of the run
+        summaries = coalescer.finish_run(_event('run_end', node_id=None, run_id='run-1'))
+        assert len(summaries) == 80
+
+    def test_disabled_by_default(self):
+        coalescer = EventCoalescer(clock=FakeClock())
+
+        sent = [e for _ in range(10) for e in _iteration(coalescer)]
+
+        assert [e['event'] for e in sent] == ['start_node', 'end_node'] * 10
+
+    def test_disabled(self):
+        coalescer = EventCoalescer(coalesce_after=0, max_rate=0, clock=FakeClock())
+
+        sent = [e for _ in range(100) for e in _iteration(coalescer)]
+
+        assert len(sent) == 200
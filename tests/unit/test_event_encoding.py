@@ -0,0 +1,122 @@
+import json
+import pytest
+
+from polysynergy_node_runner.execution_context import event_encoding
+from polysynergy_node_runner.execution_context.event_encoding import (
+    CompactEventDecoder,
+    CompactEventEncoder,
+    EVENT_CODES,
+    KIND_FLOW_EVENT,
+    KIND_HEADER,
+    encode_event,
+)
+
+
+def _flow_event(event, node_id=None, order=-1, status='running', run_id='run-1'):
+    return {'flow_id': 'flow-1', 'run_id': run_id, 'node_id': node_id, 'event': event, 'order': order, 'status': status}
+
+
+@pytest.mark.unit
+class TestEventEncoding:
+
+    def test_json_is_the_default(self, monkeypatch):
+        monkeypatch.delenv("FLOW_EVENTS_ENCODING", raising=False)
+        message = _flow_event('start_node', node_id='n1', order=0)
+
+        assert encode_event("execution_updates:flow-1", message) == [("execution_updates:flow-1", json.dumps(message))]
+
+    def test_compact_uses_versioned_channel_and_sends_header_once(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_ENCODING", "compact")
+        monkeypatch.setattr(event_encoding, "_encoder", CompactEventEncoder())
+
+        first = encode_event("execution_updates:flow-1", _flow_event('start_node', node_id='n1', order=0))
+        second = encode_event("execution_updates:flow-1", _flow_event('end_node', node_id='n1', order=0, status='success'))
+
+        assert [channel for channel, _ in first] == ["execution_updates:flow-1:c1"] * 2
+        header, event = (json.loads(payload) for _, payload in first)
+        assert header[0] == KIND_HEADER and header[3:] == ['flow-1', 'run-1']
+        assert event == [KIND_FLOW_EVENT, header[2], 'n1', EVENT_CODES['start_node'], 0, 0]
+        assert len(second) == 1
+
+    def test_header_is_repeated_for_late_subscribers(self, monkeypatch):
+        monkeypatch.setattr(event_encoding, "HEADER_REPEAT_INTERVAL", 3)
+        encoder = CompactEventEncoder()
+
+        counts = [len(encoder.encode("c", _flow_event('start_node', node_id=str(i)))) for i in range(7)]
+
+        assert counts == [2, 1, 1, 2, 1, 1, 2]
+
+    def test_round_trip(self):
+        encoder = CompactEventEncoder()
+        decoder = CompactEventDecoder()
+        messages = [
+            _flow_event('run_start'),
+            _flow_event('start_node', node_id='n1', order=0),
+            _flow_event('end_node', node_id='n1', order=0, status='error'),
+            _flow_event('end_node', node_id='n2', order=1, status='custom_status'),
+            _flow_event('run_end'),
+        ]
+
+        decoded = []
+        for message in messages:
+            for payload in encoder.encode("c", message):
+                event = decoder.decode(payload)
+                if event is not None:
+                    decoded.append(event)
+
+        assert decoded == messages
+
+    def test_interaction_event_round_trip(self):
+        encoder = CompactEventEncoder()
+        decoder = CompactEventDecoder()
+        message = {
+            'type': 'interaction_event', 'flow_id': 'flow-1', 'run_id': 'run-1', 'node_id': 'n1',
+            'interaction_type': 'oauth_authorization_required', 'data': {'auth_url': 'https://x'},
+            'tenant_id': 't1', 'user_id': 'u1',
+        }
+
+        decoded = [decoder.decode(p) for p in encoder.encode("interaction_events:flow-1", message)]
+
+        assert decoded[-1] == message
+
+    def test_events_of_unknown_runs_are_skipped(self):
+        encoder = CompactEventEncoder()
+        payloads = encoder.encode("c", _flow_event('start_node', node_id='n1'))
+
+        assert CompactEventDecoder().decode(payloads[-1]) is None
+
+    def test_run_state_is_released_at_run_end(self):
+        encoder = CompactEventEncoder()
+        encoder.encode("c", _flow_event('run_start'))
+        encoder.encode("c", _flow_event('run_end'))
+
+        assert encoder._runs == {}
+
+    def test_runs_of_different_processes_do_not_collide(self):
+        # Two containers running the same flow publish on the same channel
+        first, second = CompactEventEncoder(), CompactEventEncoder()
+        decoder = CompactEventDecoder()
+        messages = [
+            (first, _flow_event('start_node', node_id='n1', run_id='run-a')),
+            (second, _flow_event('start_node', node_id='n1', run_id='run-b')),
+            (first, _flow_event('end_node', node_id='n1', run_id='run-a', status='success')),
+            (second, _flow_event('end_node', node_id='n1', run_id='run-b', status='error')),
+        ]
+
+        decoded = []
+        for encoder, message in messages:
+            for payload in encoder.encode("execution_updates:flow-1", message):
+                event = decoder.decode(payload)
+                if event is not None:
+                    decoded.append(event)
+
+        assert decoded == [message for _, message in messages]
+
+    def test_headers_are_repeated_on_request(self):
+        encoder = CompactEventEncoder()
+        encoder.encode("c", _flow_event('start_node', node_id='n1'))
+
+        encoder.repeat_headers()
+        payloads = encoder.encode("c", _flow_event('end_node', node_id='n1'))
+
+        assert len(payloads) == 2 and json.loads(payloads[0])[0] == KIND_HEADER
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from polysynergy_node_runner.execution_context import event_encoding, send_flow_event
+from polysynergy_node_runner.execution_context.event_encoding import CompactEventDecoder, CompactEventEncoder
+from polysynergy_node_runner.execution_context.event_transport import (
+    add_event_to_pipeline,
+    get_transport,
+    publish_event,
+    publish_events_async,
+    read_stream_events,
+    stream_key,
+)
+
+
+@pytest.mark.unit
+class TestEventTransport:
+
+    def test_defaults_to_pubsub(self, monkeypatch):
+        monkeypatch.delenv("FLOW_EVENTS_TRANSPORT", raising=False)
+        assert get_transport() == "pubsub"
+
+        monkeypatch.setenv("FLOW_EVENTS_TRANSPORT", "carrier-pigeon")
+        assert get_transport() == "pubsub"
+
+    def test_pubsub_publishes_directly(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_TRANSPORT", "pubsub")
+        redis_conn = Mock()
+
+        publish_event(redis_conn, "execution_updates:flow", '{"event": "start_node"}')
+
+        redis_conn.publish.assert_called_once_with("execution_updates:flow", '{"event": "start_node"}')
+        redis_conn.pipeline.assert_not_called()
+
+    def test_streams_add_capped_entry_with_ttl(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_TRANSPORT", "streams")
+        monkeypatch.setenv("FLOW_EVENTS_STREAM_MAXLEN", "200")
+        monkeypatch.setenv("FLOW_EVENTS_STREAM_TTL", "60")
+        pipeline = Mock()
+
+        add_event_to_pipeline(pipeline, "execution_updates:flow", "{}")
+
+        pipeline.publish.assert_not_called()
+        pipeline.xadd.assert_called_once_with(
+            "execution_updates:flow:stream", {"data": "{}"}, maxlen=200, approximate=True
+        )
+        pipeline.expire.assert_called_once_with("execution_updates:flow:stream", 60)
+
+    def test_both_publishes_and_streams(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_TRANSPORT", "both")
+        redis_conn = Mock()
+
+        publish_event(redis_conn, "interaction_events:flow", "{}")
+
+        pipeline = redis_conn.pipeline.return_value
+        pipeline.publish.assert_called_once_with("interaction_events:flow", "{}")
+        pipeline.xadd.assert_called_once()
+        pipeline.execute.assert_called_once()
+
+    def test_read_stream_events_from_offset(self):
+        redis_conn = Mock()
+        redis_conn.xrange.return_value = [
+            ("1-1", {"data": json.dumps({"event": "start_node"})}),
+            ("1-2", {"data": json.dumps({"event": "end_node"})}),
+        ]
+
+        events = read_stream_events(redis_conn, "execution_updates:flow", last_id="1-0", count=10)
+
+        assert events == [("1-1", {"event": "start_node"}), ("1-2", {"event": "end_node"})]
+        redis_conn.xrange.assert_called_once_with(stream_key("execution_updates:flow"), min="(1-0", max="+", count=10)
+
+    def test_read_stream_events_decodes_compact_channels(self):
+        encoder = CompactEventEncoder()
+        message = {'flow_id': 'flow', 'run_id': 'run-1', 'node_id': 'n1', 'event': 'start_node', 'order': 0, 'status': 'running'}
+        payloads = encoder.encode("execution_updates:flow", message)
+        redis_conn = Mock()
+        redis_conn.xrange.return_value = [(f"1-{i}", {"data": payload}) for i, payload in enumerate(payloads)]
+
+        events = read_stream_events(redis_conn, "execution_updates:flow:c1")
+
+        assert events == [("1-1", message)]
+        redis_conn.xrange.assert_called_once_with(stream_key("execution_updates:flow:c1"), min="(0-0", max="+", count=500)
+
+    def test_compact_decoder_carries_headers_across_reads(self):
+        encoder = CompactEventEncoder()
+        header, event = encoder.encode("c", {'flow_id': 'flow', 'run_id': 'run-1', 'event': 'run_start'})
+        decoder = CompactEventDecoder()
+        redis_conn = Mock()
+
+        redis_conn.xrange.return_value = [("1-0", {"data": header})]
+        assert read_stream_events(redis_conn, "c:c1", decoder=decoder) == []
+        redis_conn.xrange.return_value = [("1-1", {"data": event})]
+        assert read_stream_events(redis_conn, "c:c1", last_id="1-0", decoder=decoder)[0][1]['run_id'] == 'run-1'
+
+    def test_read_flow_events_reads_the_compact_stream(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_ENCODING", "compact")
+        redis_conn = Mock()
+        redis_conn.xrange.return_value = []
+        monkeypatch.setattr(send_flow_event, "get_redis", lambda: redis_conn)
+
+        send_flow_event.read_flow_events("flow-1")
+
+        assert redis_conn.xrange.call_args.args[0] == stream_key("execution_updates:flow-1:c1")
+
+    def test_async_compact_header_and_event_are_sent_in_order(self, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_ENCODING", "compact")
+        monkeypatch.setenv("FLOW_EVENTS_TRANSPORT", "pubsub")
+        monkeypatch.setenv("FLOW_EVENTS_BATCHING", "false")
+        monkeypatch.setattr(event_encoding, "_encoder", CompactEventEncoder())
+        pipeline = Mock()
+        pipeline.execute = AsyncMock()
+        redis_conn = Mock()
+        redis_conn.pipeline.return_value = pipeline
+        monkeypatch.setattr(send_flow_event, "get_async_redis", AsyncMock(return_value=redis_conn))
+
+        async def send():
+            await send_flow_event.send_flow_event_async("flow-1", "run-1", None, "run_start")
+            await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}))
+
+        asyncio.run(send())
+
+        channels = [c.args[0] for c in pipeline.publish.call_args_list]
+        kinds = [json.loads(c.args[1])[0] for c in pipeline.publish.call_args_list]
+        assert channels == ["execution_updates:flow-1:c1"] * 2
+        assert kinds == [event_encoding.KIND_HEADER, event_encoding.KIND_FLOW_EVENT]
+        pipeline.execute.assert_awaited_once()
+
+    def test_failed_async_publish_repeats_the_headers(self, monkeypatch):
+        monkeypatch.setattr(event_encoding, "_encoder", CompactEventEncoder())
+        payloads = event_encoding._encoder.encode("c", {'flow_id': 'flow', 'run_id': 'run-1', 'event': 'run_start'})
+        redis_conn = Mock()
+        redis_conn.pipeline.return_value.execute = AsyncMock(side_effect=ConnectionError("down"))
+
+        asyncio.run(publish_events_async(redis_conn, [("c:c1", p) for p in payloads]))
+
+        assert len(event_encoding._encoder.encode("c", {'flow_id': 'flow', 'run_id': 'run-1', 'event': 'start_node'})) == 2
@@ -0,0 +1,114 @@
+import json
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from polysynergy_node_runner.execution_context import flow_event_publisher, send_flow_event as send_flow_event_module
+from polysynergy_node_runner.execution_context.flow_event_publisher import FlowEventPublisher
+
+
+@pytest.fixture
+def redis_conn():
+    conn = Mock()
+    conn.published = []
+    pipeline = Mock()
+    pipeline.publish.side_effect = lambda channel, data: conn.published.append((channel, json.loads(data)))
+    conn.pipeline.return_value = pipeline
+    return conn
+
+
+@pytest.mark.unit
+class TestFlowEventPublisher:
+
+    def test_flush_publishes_queued_events_in_one_pipeline(self, redis_conn):
+        publisher = FlowEventPublisher(redis_factory=lambda: redis_conn, batch_size=100, flush_interval=60)
+        with patch.object(publisher, "_ensure_thread"):
+            for i in range(3):
+                publisher.publish("channel", {"order": i})
+
+        assert publisher.flush() == 3
+        assert redis_conn.published == [("channel", {"order": 0}), ("channel", {"order": 1}), ("channel", {"order": 2})]
+        redis_conn.pipeline.assert_called_once_with(transaction=False)
+        redis_conn.pipeline.return_value.execute.assert_called_once()
+        assert publisher.pending() == 0
+
+    def test_full_queue_drops_oldest_events(self, redis_conn):
+        publisher = FlowEventPublisher(redis_factory=lambda: redis_conn, batch_size=100, flush_interval=60, max_queue_size=2)
+        with patch.object(publisher, "_ensure_thread"):
+            for i in range(4):
+                publisher.publish("channel", {"order": i})
+
+        publisher.flush()
+
+        assert [m["order"] for _, m in redis_conn.published] == [2, 3]
+
+    def test_redis_errors_are_ignored(self):
+        failing = Mock()
+        failing.pipeline.side_effect = ConnectionError("down")
+        publisher = FlowEventPublisher(redis_factory=lambda: failing)
+        with patch.object(publisher, "_ensure_thread"):
+            publisher.publish("channel", {"order": 0})
+
+        assert publisher.flush() == 0
+
+    def test_failed_publish_repeats_compact_headers(self):
+        failing = Mock()
+        failing.pipeline.side_effect = ConnectionError("down")
+        publisher = FlowEventPublisher(redis_factory=lambda: failing)
+        with patch.object(publisher, "_ensure_thread"), \
+                patch.object(flow_event_publisher, "repeat_compact_headers") as repeat_compact_headers:
+            publisher.publish("channel", {"order": 0})
+            publisher.flush()
+
+        repeat_compact_headers.assert_called_once()
+
+    def test_background_thread_flushes_full_batch(self, redis_conn):
+        flushed = threading.Event()
+        redis_conn.pipeline.return_value.execute.side_effect = lambda: flushed.set()
+        publisher = FlowEventPublisher(redis_factory=lambda: redis_conn, batch_size=2, flush_interval=60)
+
+        publisher.publish("channel", {"order": 0})
+        publisher.publish("channel", {"order": 1})
+
+        assert flushed.wait(timeout=5)
+        assert len(redis_conn.published) == 2
+
+
+@pytest.mark.unit
+class TestSendFlowEventBatching:
+
+    @pytest.fixture
+    def publisher(self, monkeypatch, redis_conn):
+        monkeypatch.setenv("FLOW_EVENTS_BATCHING", "true")
+        publisher = FlowEventPublisher(redis_factory=lambda: redis_conn, batch_size=100, flush_interval=60)
+        monkeypatch.setattr(flow_event_publisher, "_publisher", publisher)
+        monkeypatch.setattr(send_flow_event_module, "get_redis", lambda: redis_conn)
+        monkeypatch.setattr(publisher, "_ensure_thread", lambda: None)
+        return publisher
+
+    def test_node_events_are_queued(self, publisher, redis_conn):
+        send_flow_event_module.send_flow_event("flow", "run", "node", "start_node", order=0)
+
+        assert publisher.pending() == 1
+        redis_conn.publish.assert_not_called()
+
+    def test_run_end_flushes_queue_before_publishing(self, publisher, redis_conn):
+        order = []
+        redis_conn.pipeline.return_value.execute.side_effect = lambda: order.append("batch")
+        redis_conn.publish.side_effect = lambda channel, data: order.append(json.loads(data)["event"])
+
+        send_flow_event_module.send_flow_event("flow", "run", "node", "start_node", order=0)
+        send_flow_event_module.send_flow_event("flow", "run", "node", "end_node", order=0, status="success")
+        send_flow_event_module.send_flow_event("flow", "run", None, "run_end")
+
+        assert order == ["batch", "run_end"]
+        assert [m["event"] for _, m in redis_conn.published] == ["start_node", "end_node"]
+        assert publisher.pending() == 0
+
+    def test_batching_can_be_disabled(self, publisher, redis_conn, monkeypatch):
+        monkeypatch.setenv("FLOW_EVENTS_BATCHING", "false")
+
+        send_flow_event_module.send_flow_event("flow", "run", "node", "start_node", order=0)
+
+        assert publisher.pending() == 0
+        redis_conn.publish.assert_called_once()
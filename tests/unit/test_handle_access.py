@@ -0,0 +1,77 @@
+import types
+
+import pytest
+
+from polysynergy_node_runner.execution_context.connection import Connection
+from polysynergy_node_runner.execution_context.execution_state import ExecutionState
+from polysynergy_node_runner.execution_context.mixins.apply_from_connection_mixin import ApplyFromConnectionMixin
+from polysynergy_node_runner.execution_context.utils.handle_access import get_handle_getter, get_handle_setter
+
+
+class TargetNode(ApplyFromConnectionMixin):
+    def __init__(self, context):
+        self.context = context
+        self.value = None
+        self.headers = {}
+        self.label = "text"
+
+
+def source_node(**attributes):
+    return types.SimpleNamespace(id="source", handle="source", **attributes)
+
+
+@pytest.mark.unit
+class TestHandleAccess:
+
+    @pytest.mark.parametrize("handle, expected", [
+        ("value", 1),
+        ("missing", None),
+        ("data.key", "v"),
+        ("data.missing", None),
+        ("data.nested.deep", 3),
+        ("data.nested.missing.deep", None),
+        ("obj.attr", "a"),
+        ("empty.key", None),
+    ])
+    def test_getter_walks_attributes_and_dict_keys(self, handle, expected):
+        node = source_node(
+            value=1,
+            data={"key": "v", "nested": {"deep": 3}},
+            obj=types.SimpleNamespace(attr="a"),
+            empty=None,
+        )
+
+        assert get_handle_getter(handle)(node) == expected
+
+    def test_getter_of_missing_node_is_none(self):
+        assert get_handle_getter("value")(None) is None
+        assert get_handle_getter("data.key")(None) is None
+
+    def test_setter_sets_attributes_and_dict_keys(self):
+        node = TargetNode(None)
+
+        get_handle_setter("value")(node, 5)
+        get_handle_setter("headers.x.y")(node, "v")
+
+        assert node.value == 5
+        assert node.headers == {"x.y": "v"}
+
+    def test_setter_refuses_keys_of_non_dicts(self):
+        with pytest.raises(TypeError, match="'label' existing type is: str"):
+            get_handle_setter("label.key")(TargetNode(None), 1)
+
+    def test_accessors_are_built_once_per_handle(self):
+        assert get_handle_getter("data.key") is get_handle_getter("data.key")
+        assert get_handle_setter("headers.a") is get_handle_setter("headers.a")
+
+    def test_connection_applies_through_its_accessors(self):
+        state = ExecutionState()
+        state.register_node(source_node(data={"token": "abc"}))
+        context = types.SimpleNamespace(state=state)
+        target = TargetNode(context)
+
+        connection = Connection("c1", "source", "data.token", "target", "headers.auth", context=None)
+        target.apply_from_incoming_connection(connection)
+
+        assert state.get_connection_source_variable(connection) == "abc"
+        assert target.headers == {"auth": "abc"}
@@ -0,0 +1,121 @@
+import tracemalloc
+
+import pytest
+from unittest.mock import Mock, patch
+
+from polysynergy_node_runner.execution_context.instrumentation import Instrumentation, NodeTimings
+from polysynergy_node_runner.execution_context.mixins.flow_execution_mixin import FlowExecutionMixin
+
+
+class TimedNode(FlowExecutionMixin):
+    def __init__(self, context):
+        self.context = context
+        self.id = "node-1"
+        self.handle = "timed"
+
+    def _resolve_placeholders(self):
+        pass
+
+    def execute(self):
+        self.total = sum(range(10000))
+
+
+def _context(instrumentation: Instrumentation, has_listener: bool = True):
+    context = Mock()
+    context.instrumentation = instrumentation
+    context.has_listener = has_listener
+    context.execution_flow = {"nodes_order": []}
+    context.storage.store_node_result.return_value = 512
+    return context
+
+
+@pytest.mark.unit
+class TestInstrumentation:
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("NODE_RUNNER_INSTRUMENTATION", raising=False)
+        monkeypatch.delenv("NODE_RUNNER_TRACE_ALLOCATIONS", raising=False)
+
+        instrumentation = Instrumentation()
+
+        assert instrumentation.start_node("n", "h", 0) is None
+
+    def test_hook_enables_and_removal_disables(self):
+        instrumentation = Instrumentation(enabled=False, trace_allocations=False)
+        hook = Mock()
+
+        instrumentation.add_hook(hook)
+        assert instrumentation.start_node("n", "h", 0) is not None
+
+        instrumentation.remove_hook(hook)
+        assert instrumentation.start_node("n", "h", 0) is None
+
+    def test_failing_hook_is_ignored(self):
+        instrumentation = Instrumentation(enabled=False, trace_allocations=False)
+        instrumentation.add_hook(Mock(side_effect=RuntimeError("boom")))
+        seen = []
+        instrumentation.add_hook(seen.append)
+
+        timings = instrumentation.start_node("n", "h", 0).finish()
+
+        assert seen == [timings]
+
+    def test_partial_dict_leaves_out_persist_fields(self):
+        timings = NodeTimings("n", "h", 0)
+
+        assert set(timings.to_dict(complete=False)) == {"resolve_ms", "execute_ms", "cpu_ms"}
+        assert {"persist_ms", "wall_ms", "bytes_written"} <= set(timings.to_dict())
+
+
+@pytest.mark.unit
+class TestStateExecuteInstrumentation:
+
+    @pytest.mark.asyncio
+    async def test_phases_reach_hooks_results_and_events(self):
+        seen = []
+        instrumentation = Instrumentation(enabled=False, trace_allocations=False)
+        instrumentation.add_hook(seen.append)
+        context = _context(instrumentation)
+
+        with patch("polysynergy_node_runner.execution_context.mixins.flow_execution_mixin.send_flow_event") as send:
+            await TimedNode(context).state_execute()
+
+        assert len(seen) == 1
+        timings = seen[0]
+        assert timings.node_id == "node-1"
+        assert timings.execute_ms > 0
+        assert timings.cpu_ms >= 0
+        assert timings.bytes_written == 512
+        assert timings.wall_ms >= timings.resolve_ms + timings.execute_ms + timings.persist_ms
+        assert timings.allocated_bytes is None
+
+        stored = context.storage.store_node_result.call_args.kwargs["timings"]
+        assert "execute_ms" in stored and "persist_ms" not in stored
+
+        end_event = send.call_args_list[-1].kwargs
+        assert end_event["event_type"] == "end_node"
+        assert end_event["data"]["timings"]["bytes_written"] == 512
+
+    @pytest.mark.asyncio
+    async def test_allocations_are_opt_in(self):
+        seen = []
+        instrumentation = Instrumentation(enabled=False, trace_allocations=True)
+        instrumentation.add_hook(seen.append)
+
+        try:
+            with patch("polysynergy_node_runner.execution_context.mixins.flow_execution_mixin.send_flow_event"):
+                await TimedNode(_context(instrumentation)).state_execute()
+        finally:
+            tracemalloc.stop()
+
+        assert seen[0].peak_allocated_bytes is not None
+
+    @pytest.mark.asyncio
+    async def test_uninstrumented_run_sends_no_timings(self):
+        context = _context(Instrumentation(enabled=False, trace_allocations=False))
+
+        with patch("polysynergy_node_runner.execution_context.mixins.flow_execution_mixin.send_flow_event") as send:
+            await TimedNode(context).state_execute()
+
+        assert context.storage.store_node_result.call_args.kwargs["timings"] is None
+        assert send.call_args_list[-1].kwargs["data"] is None
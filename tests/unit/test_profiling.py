@@ -0,0 +1,140 @@
+import asyncio
+import json
+import time
+
+import pytest
+from unittest.mock import Mock
+
+from polysynergy_node_runner.execution_context.flow import Flow
+from polysynergy_node_runner.services.execution_storage_service import DynamoDbExecutionStorageService
+from polysynergy_node_runner.utils import profiling
+from polysynergy_node_runner.utils.profiling import (
+    ENGINE_LABEL,
+    SamplingProfiler,
+    enter_node,
+    exit_node,
+    is_profiling_requested,
+    profiled,
+    save_profile,
+)
+
+
+class SlowNode:
+    def __init__(self, node_id: str, handle: str):
+        self.id = node_id
+        self.handle = handle
+        self._found_by = []
+
+    def is_blocking(self):
+        return False
+
+    def is_pending(self):
+        return False
+
+    def is_killed(self):
+        return False
+
+    def is_processed(self):
+        return False
+
+    def is_driven(self):
+        return False
+
+    def has_in_connections(self):
+        return False
+
+    def get_driving_connections(self):
+        return []
+
+    def get_in_connections(self):
+        return []
+
+    def get_alive_in_connections(self):
+        return []
+
+    def get_out_connections(self):
+        return []
+
+    async def state_execute(self):
+        busy_until = time.perf_counter() + 0.05
+        while time.perf_counter() < busy_until:
+            pass
+
+
+@pytest.mark.unit
+class TestSamplingProfiler:
+
+    def test_requested_by_event_or_environment(self, monkeypatch):
+        monkeypatch.delenv("NODE_RUNNER_PROFILE", raising=False)
+        assert is_profiling_requested({"profile": True})
+        assert not is_profiling_requested({})
+
+        monkeypatch.setenv("NODE_RUNNER_PROFILE", "true")
+        assert is_profiling_requested({})
+
+    def test_nodes_are_only_tracked_while_profiling(self):
+        assert enter_node(Mock(handle="node")) is None
+        assert profiling._node_stacks == {}
+
+    def test_exit_node_truncates_to_the_entered_depth(self, monkeypatch):
+        monkeypatch.setattr(profiling, "_active_profilers", 1)
+        monkeypatch.setattr(profiling, "_node_stacks", {})
+
+        outer = enter_node(SlowNode("node-1", "outer"))
+        first = enter_node(SlowNode("node-2", "first"))
+        enter_node(SlowNode("node-3", "second"))
+        # `first` exits while `second` is still on the stack
+        exit_node(first)
+        assert list(profiling._node_stacks.values()) == [["outer (SlowNode)"]]
+
+        exit_node(outer)
+        assert list(profiling._node_stacks.values()) == [[]]
+
+    def test_samples_are_attributed_to_the_running_node(self):
+        profiler = SamplingProfiler(interval_ms=1)
+
+        asyncio.run(profiled(Flow().execute_node(SlowNode("node-1", "slow")), profiler))
+
+        nodes = profiler.node_samples()
+        assert nodes["slow (SlowNode)"] > 0
+        # Frames above the node's state_execute are left out of its stacks
+        stack, _ = next(s for s in profiler.collapsed() if s[0].startswith("node:slow (SlowNode)"))
+        assert stack.split(";")[1].startswith("SlowNode.state_execute")
+        assert profiling._active_profilers == 0
+        assert profiling._node_stacks == {}
+
+    def test_profile_is_stored_and_truncated_to_the_heaviest_stacks(self):
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.samples[((), (SlowNode.state_execute.__code__,))] = 5
+        profiler.samples[(("slow (SlowNode)",), (SlowNode.state_execute.__code__, SlowNode.is_killed.__code__))] = 1
+
+        data = profiler.to_dict(max_bytes=100)
+        assert data["samples"] == 6
+        assert data["nodes"][ENGINE_LABEL] == {"samples": 5, "ms": 5.0}
+        assert data["truncated"] is True
+        assert data["collapsed"].startswith(f"{ENGINE_LABEL};SlowNode.state_execute")
+        assert data["collapsed"].endswith(" 5")
+
+        storage = DynamoDbExecutionStorageService.__new__(DynamoDbExecutionStorageService)
+        storage.table_name = "execution_storage"
+        storage.table = Mock()
+        save_profile(profiler, storage, "flow-1", "run-1")
+
+        item = storage.table.put_item.call_args.kwargs["Item"]
+        assert item["SK"] == "run-1#profile"
+        assert json.loads(item["data"])["samples"] == 6
+
+    def test_failing_storage_does_not_fail_the_run(self):
+        storage = Mock()
+        storage.store_profile_result.side_effect = ConnectionError("down")
+
+        save_profile(SamplingProfiler(interval_ms=1), storage, "flow-1", "run-1")
+
+    def test_profile_file_is_written(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NODE_RUNNER_PROFILE_DIR", str(tmp_path))
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.samples[((), (SlowNode.state_execute.__code__,))] = 2
+
+        save_profile(profiler, Mock(), "flow-1", "run-1")
+
+        assert (tmp_path / "flow-1-run-1.folded").read_text().strip().endswith(" 2")
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import Mock
+
+from polysynergy_node_runner.execution_context.mixins.resolve_environment_variable_mixin import ResolveEnvironmentVariableMixin
+from polysynergy_node_runner.execution_context.mixins.resolve_placeholders_mixin import ResolvePlaceholdersMixin
+from polysynergy_node_runner.execution_context.mixins.resolve_secret_mixin import ResolveSecretMixin
+from polysynergy_node_runner.execution_context.utils.resolvable_attributes import (
+    get_public_attributes,
+    get_template_attributes,
+)
+
+
+class ResolvingNode(ResolveEnvironmentVariableMixin, ResolveSecretMixin, ResolvePlaceholdersMixin):
+    pass
+
+
+@pytest.fixture
+def mock_context(monkeypatch):
+    monkeypatch.setenv("PROJECT_ID", "test-project")
+
+    context = Mock()
+    context.get_effective_stage.return_value = "development"
+    context.secrets_map = {}
+    context.secrets.get_secret_by_key.side_effect = lambda key, project_id, stage: {"key": key, "value": f"secret-{key}"}
+    context.env_vars.get_var.side_effect = lambda project_id, stage, key: f"env-{key}"
+    return context
+
+
+@pytest.mark.unit
+class TestResolvableAttributes:
+
+    def test_public_attributes_are_computed_once_per_class(self):
+        class Node:
+            url: str
+            headers: dict
+            _private: str
+
+        attributes = get_public_attributes(Node)
+
+        assert attributes == ("url", "headers")
+        assert get_public_attributes(Node) is attributes
+
+    def test_template_attributes_skip_paths_and_skip_template(self):
+        class Node:
+            body: str
+            raw: str
+            true_path: str
+            false_path: str
+            _private: str
+            __node_variable_settings__ = {"raw": {"skip_template": True}}
+
+        assert get_template_attributes(Node) == ("body",)
+
+
+@pytest.mark.unit
+class TestResolvePlaceholders:
+
+    def test_resolves_secrets_and_environment_variables_in_one_pass(self, mock_context):
+        class Node(ResolvingNode):
+            url: str
+            token: str
+            headers: dict
+            plain: str
+
+            def __init__(self):
+                self.context = mock_context
+                self.url = "<env:API_URL>/users"
+                self.token = "Bearer <secret:api_key>"
+                self.headers = {"Authorization": "<sec:auth>", "X-Env": "<env:NOT_IN_DICTS>"}
+                self.plain = "nothing to resolve"
+
+        node = Node()
+        node._resolve_placeholders()
+
+        assert node.url == "env-API_URL/users"
+        assert node.token == "Bearer secret-api_key"
+        assert node.headers == {"Authorization": "secret-auth", "X-Env": "<env:NOT_IN_DICTS>"}
+        assert node.plain == "nothing to resolve"
+        assert set(mock_context.secrets_map) == {"api_key", "auth"}
+
+    def test_matches_separate_resolution(self, mock_context):
+        class Node(ResolvingNode):
+            value: str
+
+            def __init__(self):
+                self.context = mock_context
+                self.value = "<secret:a> and <environment:b>"
+
+        combined = Node()
+        combined._resolve_placeholders()
+
+        separate = Node()
+        separate._resolve_secret()
+        separate._resolve_environment_variable()
+
+        assert combined.value == separate.value == "secret-a and env-b"
+
+    def test_resolves_variable_nodes(self, mock_context):
+        class VariableEnvironmentNode(ResolvingNode):
+            def __init__(self):
+                self.context = mock_context
+                self.true_path = "BASE_URL"
+
+        node = VariableEnvironmentNode()
+        node._resolve_placeholders()
+
+        assert node.true_path == "env-BASE_URL"
@@ -0,0 +1,105 @@
+import io
+import json
+import logging
+import pytest
+from unittest.mock import Mock
+
+from polysynergy_node_runner.execution_context.connection import Connection
+from polysynergy_node_runner.utils import run_logging
+from polysynergy_node_runner.utils.run_logging import (
+    PACKAGE_LOGGER,
+    bind_run_context,
+    configure_run_logging,
+    current_node_id,
+    get_log_level,
+)
+
+
+@pytest.fixture
+def package_logger():
+    logger = logging.getLogger(PACKAGE_LOGGER)
+    saved = (logger.level, list(logger.handlers), logger.propagate)
+    yield logger
+    logger.setLevel(saved[0])
+    logger.handlers[:] = saved[1]
+    logger.propagate = saved[2]
+
+
+@pytest.mark.unit
+class TestRunLogging:
+
+    def test_log_levels(self, monkeypatch):
+        assert get_log_level("quiet") == logging.WARNING
+        assert get_log_level("debug") == logging.DEBUG
+        assert get_log_level("nonsense") == logging.INFO
+
+        monkeypatch.setenv("NODE_RUNNER_LOG_LEVEL", "QUIET")
+        assert get_log_level() == logging.WARNING
+
+    def test_json_records_carry_correlation_fields(self, package_logger):
+        stream = io.StringIO()
+        configure_run_logging(level="debug", log_format="json", stream=stream)
+
+        def run():
+            bind_run_context(run_id="run-1", flow_id="flow-1")
+            current_node_id.set("node-1")
+            logging.getLogger("polysynergy_node_runner.execution_context.flow").debug("Executing: %s", "node-1", extra={"order": 3})
+
+        # In a copied context, like a task started by asyncio.run
+        run_logging.contextvars.copy_context().run(run)
+
+        entry = json.loads(stream.getvalue())
+        assert entry["message"] == "Executing: node-1"
+        assert entry["level"] == "DEBUG"
+        assert entry["run_id"] == "run-1"
+        assert entry["flow_id"] == "flow-1"
+        assert entry["node_id"] == "node-1"
+        assert entry["order"] == 3
+        assert "request_id" not in entry
+        assert current_node_id.get() is None
+
+    def test_configure_twice_keeps_one_handler(self, package_logger):
+        configure_run_logging(level="info", stream=io.StringIO())
+        configure_run_logging(level="info", stream=io.StringIO())
+
+        assert sum(1 for h in package_logger.handlers if getattr(h, "_run_logging", False)) == 1
+        assert package_logger.propagate is False
+
+    def test_quiet_level_skips_formatting(self, package_logger):
+        stream = io.StringIO()
+        configure_run_logging(level="quiet", stream=stream)
+
+        formatted = []
+
+        class Message:
+            def __str__(self):
+                formatted.append(True)
+                return "node"
+
+        message = Message()
+        logging.getLogger("polysynergy_node_runner.execution_context.flow").debug("Executing: %s", message)
+        logging.getLogger("polysynergy_node_runner.execution_context.flow").info("Executing: %s", message)
+
+        assert stream.getvalue() == ""
+        assert formatted == []
+
+    def test_make_killer_skips_node_lookups_when_quiet(self, package_logger):
+        configure_run_logging(level="quiet", stream=io.StringIO())
+        context = Mock()
+        connection = Connection("c-1", "a", "out", "b", "in", context)
+
+        connection.make_killer()
+
+        assert connection.is_killer()
+        context.state.get_node_by_id.assert_not_called()
+
+    def test_make_killer_logs_handles_when_debugging(self, package_logger):
+        stream = io.StringIO()
+        configure_run_logging(level="debug", log_format="text", stream=stream)
+        context = Mock()
+        context.state.get_node_by_id.side_effect = lambda node_id: Mock(handle=f"{node_id}_handle")
+        connection = Connection("c-1", "a", "out", "b", "in", context)
+
+        connection.make_killer()
+
+        assert "Making killer c-1: a_handle.out -> b_handle.in" in stream.getvalue()
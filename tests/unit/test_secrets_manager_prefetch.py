@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from polysynergy_node_runner.services.secrets_manager import SecretsManager
+
+
+@pytest.fixture
+def secrets_manager():
+    with patch('boto3.client') as mock_boto_client, \
+            patch('polysynergy_node_runner.services.secrets_manager.get_encryption_service', side_effect=ValueError("no key")):
+        mock_boto_client.return_value = Mock()
+        manager = SecretsManager(region="eu-central-1")
+    manager.dynamodb = Mock()
+    return manager
+
+
+def _item(name, value):
+    return {'secret_key': {'S': name}, 'secret_value': {'S': value}, 'encrypted': {'BOOL': False}}
+
+
+@pytest.mark.unit
+class TestSecretsManagerPrefetch:
+
+    def test_prefetch_uses_single_batch_request(self, secrets_manager):
+        secrets_manager.dynamodb.batch_get_item.return_value = {
+            'Responses': {'project_secrets': [
+                _item('proj@mock@api_key', 'abc'),
+                _item('proj@mock@token', 'xyz'),
+            ]}
+        }
+
+        result = secrets_manager.prefetch_secrets_by_keys(['api_key', 'token'], 'proj', 'mock')
+
+        assert result == {
+            'api_key': {'key': 'mock@api_key', 'value': 'abc'},
+            'token': {'key': 'mock@token', 'value': 'xyz'},
+        }
+        secrets_manager.dynamodb.batch_get_item.assert_called_once()
+
+    def test_prefetched_secrets_are_served_from_memory(self, secrets_manager):
+        secrets_manager.dynamodb.batch_get_item.return_value = {
+            'Responses': {'project_secrets': [_item('proj@mock@api_key', 'abc')]}
+        }
+        secrets_manager.prefetch_secrets_by_keys(['api_key'], 'proj', 'mock')
+
+        for _ in range(3):
+            assert secrets_manager.get_secret_by_key('api_key', 'proj', 'mock')['value'] == 'abc'
+
+        secrets_manager.dynamodb.get_item.assert_not_called()
+
+    def test_unprocessed_keys_are_retried(self, secrets_manager):
+        unprocessed = {'project_secrets': {'Keys': [{'secret_key': {'S': 'proj@mock@token'}}]}}
+        secrets_manager.dynamodb.batch_get_item.side_effect = [
+            {'Responses': {'project_secrets': [_item('proj@mock@api_key', 'abc')]}, 'UnprocessedKeys': unprocessed},
+            {'Responses': {'project_secrets': [_item('proj@mock@token', 'xyz')]}},
+        ]
+
+        result = secrets_manager.prefetch_secrets_by_keys(['api_key', 'token'], 'proj', 'mock')
+
+        assert set(result) == {'api_key', 'token'}
+        assert secrets_manager.dynamodb.batch_get_item.call_count == 2
+        assert secrets_manager.dynamodb.batch_get_item.call_args.kwargs['RequestItems'] == unprocessed
+
+    def test_requests_are_chunked(self, secrets_manager):
+        secrets_manager.dynamodb.batch_get_item.return_value = {'Responses': {'project_secrets': []}}
+
+        secrets_manager.prefetch_secrets_by_keys([f"key_{i}" for i in range(250)], 'proj', 'mock')
+
+        assert secrets_manager.dynamodb.batch_get_item.call_count == 3
+
+    def test_missing_secrets_fall_back_to_get_item(self, secrets_manager):
+        secrets_manager.dynamodb.batch_get_item.return_value = {'Responses': {'project_secrets': []}}
+        secrets_manager.dynamodb.get_item.return_value = {'Item': _item('proj@mock@late', 'value')}
+
+        assert secrets_manager.prefetch_secrets_by_keys(['late'], 'proj', 'mock') == {}
+        assert secrets_manager.get_secret_by_key('late', 'proj', 'mock')['value'] == 'value'
+        secrets_manager.dynamodb.get_item.assert_called_once()
@@ -0,0 +1,153 @@
+import json
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+
+from polysynergy_node_runner.execution_context.flow import Flow
+from polysynergy_node_runner.services.execution_storage_service import DynamoDbExecutionStorageService
+from polysynergy_node_runner.utils.tracing import (
+    KIND_CLIENT,
+    NOOP_SPAN,
+    STATUS_ERROR,
+    InMemorySpanExporter,
+    JsonFileSpanExporter,
+    OtlpHttpSpanExporter,
+    Tracer,
+    current_span,
+    flush_traces,
+    inject_traceparent,
+    parse_traceparent,
+    set_tracer,
+)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    set_tracer(tracer)
+    yield exporter
+    set_tracer(None)
+
+
+@pytest.mark.unit
+class TestTracer:
+
+    def test_disabled_tracer_returns_noop_span(self):
+        tracer = Tracer(None)
+
+        assert tracer.span("anything") is NOOP_SPAN
+        assert tracer.start_span("anything") is NOOP_SPAN
+        with tracer.span("anything") as span:
+            span.set_attribute("key", "value")
+        assert current_span.get() is None
+
+    def test_nested_spans_share_trace_and_link_parents(self, exporter):
+        tracer = Tracer(exporter)
+
+        with tracer.span("run") as run:
+            with tracer.span("storage", KIND_CLIENT) as storage:
+                pass
+        tracer.flush()
+
+        assert [span.name for span in exporter.spans] == ["storage", "run"]
+        assert storage.context.trace_id == run.context.trace_id
+        assert storage.parent_span_id == run.context.span_id
+        assert run.parent_span_id is None
+        assert current_span.get() is None
+
+    def test_exception_marks_span_as_error(self, exporter):
+        tracer = Tracer(exporter)
+
+        with pytest.raises(RuntimeError):
+            with tracer.span("failing"):
+                raise RuntimeError("boom")
+        tracer.flush()
+
+        span = exporter.spans[0]
+        assert span.status_code == STATUS_ERROR
+        assert span.attributes["exception.type"] == "RuntimeError"
+
+    def test_traceparent_round_trip(self, exporter):
+        tracer = Tracer(exporter)
+        parent = parse_traceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01")
+
+        with tracer.start_span("run", parent=parent).activate() as span:
+            headers = inject_traceparent({})
+
+        assert span.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert span.parent_span_id == "b7ad6b7169203331"
+        assert headers["traceparent"] == span.context.to_traceparent()
+        assert parse_traceparent("garbage") is None
+
+    def test_file_exporter_writes_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(JsonFileSpanExporter(str(path), service_name="runner"))
+
+        with tracer.span("run", attributes={"run.id": "run-1", "count": 3}):
+            pass
+        tracer.flush()
+
+        request = json.loads(path.read_text().splitlines()[0])
+        resource_spans = request["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0]["value"]["stringValue"] == "runner"
+        span = resource_spans["scopeSpans"][0]["spans"][0]
+        assert span["name"] == "run"
+        assert {"key": "count", "value": {"intValue": "3"}} in span["attributes"]
+
+    def test_otlp_exporter_posts_to_endpoint(self):
+        tracer = Tracer(OtlpHttpSpanExporter("http://collector:4318/v1/traces"))
+
+        with tracer.span("run"):
+            pass
+        with patch("polysynergy_node_runner.utils.tracing.urllib.request.urlopen", MagicMock()) as urlopen:
+            tracer.flush()
+
+        request = urlopen.call_args[0][0]
+        assert request.full_url == "http://collector:4318/v1/traces"
+        assert json.loads(request.data)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "run"
+
+    def test_failed_export_is_ignored(self):
+        failing = Mock()
+        failing.export.side_effect = ConnectionError("down")
+        tracer = Tracer(failing)
+
+        with tracer.span("run"):
+            pass
+        tracer.flush()
+
+
+@pytest.mark.unit
+class TestTracingInstrumentation:
+
+    def test_node_spans_follow_the_flow_graph(self, exporter):
+        source = Mock()
+        source._trace_span = Tracer(exporter).start_span("node source")
+        connection = Mock(uuid="conn-1")
+        connection.get_source_node.return_value = source
+
+        target = Mock(id="target", handle="target", _found_by=["conn-1"])
+        target.get_driving_connections.return_value = []
+        target.get_in_connections.return_value = [connection]
+        target.is_killed.return_value = False
+        target.get_exception.return_value = None
+
+        flow = Flow()
+        span = flow._start_node_span(target)
+        flow._end_node_span(span, target)
+
+        assert span.parent_span_id == source._trace_span.context.span_id
+        assert span.attributes["node.handle"] == "target"
+        assert current_span.get() is None
+
+    def test_storage_writes_are_client_spans(self, exporter):
+        storage = DynamoDbExecutionStorageService.__new__(DynamoDbExecutionStorageService)
+        storage.table_name = "execution_storage"
+        storage.table = Mock()
+
+        storage.store_connections_result("flow-1", "run-1", [])
+        flush_traces()
+
+        span = exporter.spans[0]
+        assert span.name == "storage.store_connections_result"
+        assert span.kind == KIND_CLIENT
+        assert span.attributes["db.system"] == "dynamodb"
@@ -0,0 +1,179 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from polysynergy_node_runner.services import ttl_cache
+from polysynergy_node_runner.services.ttl_cache import TTLCache, get_ttl_cache, handle_invalidation_message
+
+
+@pytest.fixture(autouse=True)
+def reset_caches(monkeypatch):
+    monkeypatch.setattr(ttl_cache, "_caches", {})
+    monkeypatch.delenv("CACHE_INVALIDATION_CHANNEL", raising=False)
+    yield
+
+
+@pytest.mark.unit
+class TestTTLCache:
+
+    def test_get_and_set(self):
+        cache = TTLCache(ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_entries_expire(self):
+        cache = TTLCache(ttl=10)
+        with patch.object(ttl_cache.time, "monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch.object(ttl_cache.time, "monotonic", return_value=109.0):
+            assert cache.get("a") == 1
+        with patch.object(ttl_cache.time, "monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_invalidate_and_invalidate_prefix(self):
+        cache = TTLCache(ttl=60)
+        cache.set("envvar#p#mock#a", 1)
+        cache.set("envvar#p#mock#b", 2)
+        cache.set("envvar#p#prod#a", 3)
+
+        cache.invalidate("envvar#p#prod#a")
+        assert cache.get("envvar#p#prod#a") is None
+
+        cache.invalidate_prefix("envvar#p#mock#")
+        assert len(cache) == 0
+
+    def test_cache_is_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("TEST_CACHE_TTL", raising=False)
+        assert get_ttl_cache("test", "TEST_CACHE_TTL", "TEST_CACHE_MAX_SIZE") is None
+
+    def test_cache_is_shared_per_name(self, monkeypatch):
+        monkeypatch.setenv("TEST_CACHE_TTL", "30")
+        monkeypatch.setenv("TEST_CACHE_MAX_SIZE", "5")
+
+        cache = get_ttl_cache("test", "TEST_CACHE_TTL", "TEST_CACHE_MAX_SIZE")
+
+        assert cache is get_ttl_cache("test", "TEST_CACHE_TTL", "TEST_CACHE_MAX_SIZE")
+        assert cache.ttl == 30
+        assert cache.maxsize == 5
+
+    @pytest.mark.parametrize("max_size", ["many", "0"])
+    def test_invalid_max_size_falls_back_to_the_default(self, monkeypatch, max_size):
+        monkeypatch.setenv("TEST_CACHE_TTL", "30")
+        monkeypatch.setenv("TEST_CACHE_MAX_SIZE", max_size)
+
+        cache = get_ttl_cache("test", "TEST_CACHE_TTL", "TEST_CACHE_MAX_SIZE")
+
+        assert cache.maxsize == ttl_cache.DEFAULT_MAX_SIZE
+
+    def test_invalidation_message(self, monkeypatch):
+        monkeypatch.setenv("TEST_CACHE_TTL", "30")
+        cache = get_ttl_cache("test", "TEST_CACHE_TTL", "TEST_CACHE_MAX_SIZE")
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        handle_invalidation_message(json.dumps({"cache": "test", "key": "a"}))
+        handle_invalidation_message("not json")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+@pytest.mark.unit
+class TestEnvVarManagerCache:
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        monkeypatch.setenv("ENV_VARS_CACHE_TTL", "60")
+        with patch('boto3.client') as mock_boto_client, \
+                patch('polysynergy_node_runner.services.env_var_manager.get_encryption_service', side_effect=ValueError("no key")):
+            mock_boto_client.return_value = Mock()
+            from polysynergy_node_runner.services.env_var_manager import EnvVarManager
+            manager = EnvVarManager(region="eu-central-1")
+        manager.client.get_item.return_value = {'Item': {'value': {'S': 'cached'}, 'encrypted': {'BOOL': False}}}
+        return manager
+
+    def test_repeated_reads_hit_dynamodb_once(self, manager):
+        for _ in range(5):
+            assert manager.get_var("proj", "mock", "API_URL") == "cached"
+
+        manager.client.get_item.assert_called_once()
+
+    def test_set_var_invalidates(self, manager):
+        manager.get_var("proj", "mock", "API_URL")
+        manager.set_var("proj", "mock", "API_URL", "new")
+        manager.get_var("proj", "mock", "API_URL")
+
+        assert manager.client.get_item.call_count == 2
+
+    def test_delete_var_invalidates(self, manager):
+        manager.get_var("proj", "mock", "API_URL")
+        manager.delete_var("proj", "mock", "API_URL")
+        manager.get_var("proj", "mock", "API_URL")
+
+        assert manager.client.get_item.call_count == 2
+
+    def test_missing_values_are_not_cached(self, manager):
+        manager.client.get_item.return_value = {}
+
+        assert manager.get_var("proj", "mock", "MISSING") is None
+        assert manager.get_var("proj", "mock", "MISSING") is None
+        assert manager.client.get_item.call_count == 2
+
+
+@pytest.mark.unit
+class TestSecretsManagerCache:
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        monkeypatch.setenv("SECRETS_CACHE_TTL", "60")
+        with patch('boto3.client') as mock_boto_client, \
+                patch('polysynergy_node_runner.services.secrets_manager.get_encryption_service', side_effect=ValueError("no key")):
+            mock_boto_client.return_value = Mock()
+            from polysynergy_node_runner.services.secrets_manager import SecretsManager
+            manager = SecretsManager(region="eu-central-1")
+        manager.dynamodb = Mock()
+        manager.dynamodb.get_item.return_value = {
+            'Item': {'secret_value': {'S': 'cached'}, 'encrypted': {'BOOL': False}}
+        }
+        return manager
+
+    def test_repeated_reads_hit_dynamodb_once(self, manager):
+        for _ in range(5):
+            assert manager.get_secret("proj@mock@API_KEY")["value"] == "cached"
+
+        manager.dynamodb.get_item.assert_called_once()
+
+    def test_update_secret_invalidates(self, manager):
+        manager.get_secret("proj@mock@API_KEY")
+        manager.update_secret("proj@mock@API_KEY", "new")
+        manager.get_secret("proj@mock@API_KEY")
+
+        assert manager.dynamodb.get_item.call_count == 2
+
+    def test_delete_secret_invalidates(self, manager):
+        manager.get_secret("proj@mock@API_KEY")
+        manager.delete_secret("proj@mock@API_KEY")
+        manager.get_secret("proj@mock@API_KEY")
+
+        assert manager.dynamodb.get_item.call_count == 2
+
+    def test_invalidation_is_published(self, manager):
+        with patch('polysynergy_node_runner.services.secrets_manager.publish_invalidation') as publish:
+            manager.update_secret("proj@mock@API_KEY", "new")
+
+        publish.assert_called_once_with("secrets", "proj@mock@API_KEY")